@@ -1,6 +1,9 @@
 import os
 import datetime
 
+import reference
+from model import StreamError
+
 # -----------------------------------------------------------------------------
 # UTILITIES & INPUT HANDLING
 # -----------------------------------------------------------------------------
@@ -28,6 +31,30 @@ def get_int(prompt_text):
         except ValueError:
             print("!! Error: Please enter a valid number (integer).")
 
+# table -> (snapshot tuple, snapshot lookup by id, field shown next to the id)
+REFERENCE_CHOICES = {
+    'location': ('locations', 'location_by_id', 'address'),
+    'category': ('categories', 'category_by_id', 'name'),
+    'plan': ('insurance_plans', 'plan_by_id', 'name'),
+}
+
+def get_ref_id(model, prompt_text, table):
+    """
+    get_int for a location, category or insurance plan id: lists the choices
+    from the shared reference data and only accepts one that exists.
+    """
+    success, snap = reference.shared(model).current()
+    if not success:
+        print(f"!! Error: {snap}")
+        return get_int(prompt_text)
+    rows, by_id, label = REFERENCE_CHOICES[table]
+    print("   " + ", ".join(f"{r.id}={getattr(r, label)}" for r in getattr(snap, rows)))
+    while True:
+        val = get_int(prompt_text)
+        if val is None or val in getattr(snap, by_id):
+            return val
+        print(f"!! Error: No {table} with ID {val}.")
+
 def print_result(success, result):
     """
     Displays the outcome of a database operation.
@@ -40,17 +67,85 @@ def print_result(success, result):
     else:
         print(f"!! Error: {result}")
 
+def print_stream(rows, header, format_row, chunk=200):
+    """
+    Prints rows as they are streamed from the database, a chunk at a time,
+    so large tables are never held in memory. The header is only printed
+    when there is at least one row. Returns the number of rows printed.
+    If the stream fails part-way, the rows so far are printed followed by
+    an error saying the listing is incomplete.
+    """
+    rows = iter(rows)
+    count = 0
+    lines = []
+    try:
+        first = next(rows, None)
+        if first is None:
+            return 0
+
+        print(header)
+        lines = [format_row(first)]
+        count = 1
+        for r in rows:
+            lines.append(format_row(r))
+            count += 1
+            if len(lines) >= chunk:
+                print("\n".join(lines))
+                lines = []
+    except StreamError as e:
+        if lines:
+            print("\n".join(lines))
+        print(f"!! Error: Listing incomplete, stopped after {count} row(s): {e}")
+        return count
+    if lines:
+        print("\n".join(lines))
+    return count
+
+def browse_pages(fetch_page, key, header, format_row, stream_all=None, page_size=20):
+    """
+    Interactive keyset pager over a model *_page method.
+    n = next page, p = previous page, j = jump to an ID,
+    a = stream the whole list, q = back.
+    Returns False if there was nothing to show.
+    """
+    success, rows = fetch_page(page_size=page_size)
+    if not success or not rows:
+        return False
+
+    while True:
+        print(header)
+        print("\n".join(format_row(r) for r in rows))
+        cmd = input("\n[n] Next  [p] Prev  [j] Jump to ID  [a] Show All  [q] Back: ").strip().lower()
+
+        if cmd == 'n':
+            s, page = fetch_page(after_id=rows[-1][key], page_size=page_size)
+        elif cmd == 'p':
+            s, page = fetch_page(before_id=rows[0][key], page_size=page_size)
+        elif cmd == 'j':
+            target = get_int("Jump to ID")
+            if target is None: continue
+            s, page = fetch_page(after_id=target - 1, page_size=page_size)
+        elif cmd == 'a' and stream_all:
+            s, all_rows = stream_all()
+            if s: print_stream(all_rows, header, format_row)
+            input("\nPress Enter...")
+            continue
+        elif cmd == 'q':
+            return True
+        else:
+            continue
+
+        if s and page:
+            rows = page
+        else:
+            print(">> No more records in that direction.")
+
 
 # -----------------------------------------------------------------------------
 # MAIN APPLICATION LOGIC
 # -----------------------------------------------------------------------------
 
 def run_admin_interface(model):
-    try:
-        model.create_indexes()
-    except Exception:
-        pass 
-
     while True:
         clear_screen()
         print("                  ADMINISTRATIVE CONSOLE      ")
@@ -103,21 +198,20 @@ def menu_customers(model):
         sel = input("\nSelect Action: ").strip()
 
         if sel == '1':
-            success, rows = model.get_all_customers()
-            if success and rows:
-                print(f"\n{'ID':<5} {'NAME':<25} {'EMAIL':<30} {'PHONE'}")
-                print("-" * 75)
-                for r in rows:
-                    cid = str(r.get('customer_id', 'N/A'))
-                    name = r.get('full_name', r.get('name', 'N/A'))
-                    email = r.get('email', 'N/A')
-                    phone = r.get('phone', r.get('phone_number', 'N/A'))
-                    
-                    # Truncate fields to ensure alignment
-                    print(f"{cid:<5} {name[:24]:<25} {email[:29]:<30} {phone}")
-            else:
+            def fmt(r):
+                cid = str(r.get('customer_id', 'N/A'))
+                name = r.get('full_name', r.get('name', 'N/A'))
+                email = r.get('email', 'N/A')
+                phone = r.get('phone', r.get('phone_number', 'N/A'))
+                
+                # Truncate fields to ensure alignment
+                return f"{cid:<5} {name[:24]:<25} {email[:29]:<30} {phone}"
+
+            header = f"\n{'ID':<5} {'NAME':<25} {'EMAIL':<30} {'PHONE'}\n" + "-" * 75
+            if not browse_pages(model.get_customers_page, 'customer_id', header, fmt,
+                                stream_all=lambda: model.get_all_customers(stream=True)):
                 print("\nNo customers found or database error.")
-            input("\nPress Enter to return...")
+                input("\nPress Enter to return...")
 
         elif sel == '2':
             print("\n>> ADDING NEW CUSTOMER")
@@ -188,31 +282,31 @@ def menu_cars(model):
         print("4. Retire Car (Make Unavailable)")
         print("5. Reactivate Car (Make Available)")
         print("6. Update Mileage")  
-        print("7. < BACK")
+        print("7. Vehicle Classes")
+        print("8. < BACK")
 
         sel = input("\nSelect Action: ").strip()
 
         if sel == '1':
-            success, rows = model.get_all_cars()
-            if success and rows:
-                print(f"\n{'ID':<5} {'MODEL':<20} {'PLATE':<10} {'PRICE':<8} {'MIL':<8} {'STATUS'}")
-                print("-" * 65)
-                for r in rows:
-                    status = "Active" if r.get('availability', 1) == 1 else "Retired"
-                    cid = str(r.get('car_id', 'N/A'))
-                    
-                    brand = r.get('brand', '')
-                    model_n = r.get('model', '')
-                    full_model = f"{brand} {model_n}"
-
-                    plate = r.get('plate', r.get('plate_id', 'N/A'))
-                    price = str(r.get('price_per_day', 'N/A'))
-                    mil = str(r.get('mileage', '0'))
-                    
-                    print(f"{cid:<5} {full_model[:19]:<20} {plate:<10} {price:<8} {mil:<8} {status}")
-            else:
+            def fmt(r):
+                status = "Active" if r.get('availability', 1) == 1 else "Retired"
+                cid = str(r.get('car_id', 'N/A'))
+                
+                brand = r.get('brand', '')
+                model_n = r.get('model', '')
+                full_model = f"{brand} {model_n}"
+
+                plate = r.get('plate', r.get('plate_id', 'N/A'))
+                price = str(r.get('price_per_day', 'N/A'))
+                mil = str(r.get('mileage', '0'))
+                
+                return f"{cid:<5} {full_model[:19]:<20} {plate:<10} {price:<8} {mil:<8} {status}"
+
+            header = f"\n{'ID':<5} {'MODEL':<20} {'PLATE':<10} {'PRICE':<8} {'MIL':<8} {'STATUS'}\n" + "-" * 65
+            if not browse_pages(model.get_cars_page, 'car_id', header, fmt,
+                                stream_all=lambda: model.get_all_cars(stream=True, compact=True)):
                 print("No cars found.")
-            input("\nPress Enter...")
+                input("\nPress Enter...")
 
         elif sel == '2':
             print("\n>> ADD NEW CAR")
@@ -231,8 +325,8 @@ def menu_cars(model):
             color = get_input("Color")
             gear = get_input("Gearbox (Manual/Automatic)")
             mil = get_int("Current Mileage (km)")
-            loc_id = get_int("Location ID")
-            cat_id = get_int("Category ID")
+            loc_id = get_ref_id(model, "Location ID", 'location')
+            cat_id = get_ref_id(model, "Category ID", 'category')
             
             if not all([color, gear, mil, loc_id, cat_id]): continue
             
@@ -272,7 +366,77 @@ def menu_cars(model):
             if new_mil: print_result(*model.update_car_mileage(cid, new_mil))
             input("Press Enter...")
 
-        elif sel == '7' or sel.lower() == 'q':
+        elif sel == '7':
+            menu_vehicle_classes(model)
+
+        elif sel == '8' or sel.lower() == 'q':
+            return
+
+
+def menu_vehicle_classes(model):
+    """
+    Edits the classes shown on the kiosk (Subcategory tables). A car is in the
+    first class of its category that lists its model or brand; cars are
+    re-classified as soon as a list changes.
+    """
+    registry = reference.shared(model)
+
+    def edited(success, result):
+        print_result(success, result)
+        if success:
+            # Kiosk screens pick the new classes up on their next version check
+            registry.refresh()
+
+    while True:
+        clear_screen()
+        print("--- VEHICLE CLASSES ---")
+        print("1. View Classes")
+        print("2. Add Class")
+        print("3. Add Model/Brand to Class")
+        print("4. Remove Model/Brand from Class")
+        print("5. Delete Class")
+        print("6. < BACK")
+
+        sel = input("\nSelect Action: ").strip()
+
+        if sel == '1':
+            success, snap = registry.refresh_if_changed()
+            if not success:
+                print(f"!! Error: {snap}")
+            elif not snap.subcategories:
+                print("No classes defined.")
+            else:
+                print(f"\n{'ID':<5} {'CATEGORY':<14} {'CLASS':<18} {'MODELS / BRANDS'}\n" + "-" * 70)
+                for c in snap.subcategories:
+                    cat = snap.category_by_id.get(c.category_id)
+                    cat_name = cat.name if cat else str(c.category_id)
+                    print(f"{c.id:<5} {cat_name[:13]:<14} {c.name[:17]:<18} {', '.join(c.models)}")
+            input("\nPress Enter...")
+
+        elif sel == '2':
+            cat_id = get_ref_id(model, "Category ID", 'category')
+            if not cat_id: continue
+            name = get_input("Class Name")
+            if name: edited(*model.add_subcategory(cat_id, name))
+            input("Press Enter...")
+
+        elif sel in ('3', '4'):
+            sub_id = get_int("Class ID")
+            if not sub_id: continue
+            name = get_input("Model or Brand")
+            if not name: continue
+            if sel == '3':
+                edited(*model.add_subcategory_model(sub_id, name))
+            else:
+                edited(*model.remove_subcategory_model(sub_id, name))
+            input("Press Enter...")
+
+        elif sel == '5':
+            sub_id = get_int("Class ID to Delete")
+            if sub_id: edited(*model.remove_subcategory(sub_id))
+            input("Press Enter...")
+
+        elif sel == '6' or sel.lower() == 'q':
             return
 
 
@@ -288,31 +452,33 @@ def menu_reservations(model):
         print("2. View Active / Future Only")
         print("3. Create New Reservation")
         print("4. Cancel Reservation (Soft Delete)")
-        print("5. < BACK")
+        print("5. Verify Availability Index")
+        print("6. Rebuild Availability Index")
+        print("7. < BACK")
 
         sel = input("\nSelect Action: ").strip()
 
         if sel == '1':
-            s, rows = model.get_all_reservations()
-            if s and rows:
-                print(f"\n{'ID':<5} {'CUSTOMER':<20} {'CAR':<20} {'STATUS':<12} {'DATES'}")
-                print("-" * 80)
-                for r in rows:
-                    rid = str(r.get('reservation_id', 'N/A'))
-                    name = r.get('full_name', 'N/A')
-                    car = f"{r.get('brand','')} {r.get('model','')}"
-                    p_date = str(r.get('pick_up_date', ''))
-                    d_date = str(r.get('drop_off_date', ''))
-                    dates = f"{p_date} -> {d_date}"
-                    status = r.get('status', 'Confirmed') 
-                    
-                    print(f"#{rid:<4} {name[:19]:<20} {car[:19]:<20} {status:<12} {dates}")
-            else:
+            def fmt(r):
+                rid = str(r.get('reservation_id', 'N/A'))
+                name = r.get('full_name', 'N/A')
+                car = f"{r.get('brand','')} {r.get('model','')}"
+                p_date = str(r.get('pick_up_date', ''))
+                d_date = str(r.get('drop_off_date', ''))
+                dates = f"{p_date} -> {d_date}"
+                status = r.get('status', 'Confirmed') 
+                
+                return f"#{rid:<4} {name[:19]:<20} {car[:19]:<20} {status:<12} {dates}"
+
+            header = f"\n{'ID':<5} {'CUSTOMER':<20} {'CAR':<20} {'STATUS':<12} {'DATES'}\n" + "-" * 80
+            if not browse_pages(model.get_reservations_page, 'reservation_id', header, fmt,
+                                stream_all=lambda: model.get_all_reservations(stream=True, compact=True)):
+                s, rows = model.get_reservations_page(page_size=1)
                 if not s:
                     print(f"\n❌ DATABASE ERROR: {rows}")
                 else:
                     print("\nNo reservations found (List is empty).")
-            input("\nPress Enter...")
+                input("\nPress Enter...")
         
         elif sel == '2':
             s, rows = model.get_active_future_reservations()
@@ -339,10 +505,10 @@ def menu_reservations(model):
             
             p_date = get_input("Pickup (YYYY-MM-DD)")
             d_date = get_input("Dropoff (YYYY-MM-DD)")
-            p_loc = get_int("Pickup Loc ID")
-            d_loc = get_int("Dropoff Loc ID")
-            ins_id = get_int("Ins ID (0/1)")
-            cat_id = get_int("Cat ID")
+            p_loc = get_ref_id(model, "Pickup Loc ID", 'location')
+            d_loc = get_ref_id(model, "Dropoff Loc ID", 'location')
+            ins_id = get_ref_id(model, "Ins ID", 'plan')
+            cat_id = get_ref_id(model, "Cat ID", 'category')
             
             if all([p_date, d_date, p_loc, d_loc]):
                 data = {
@@ -363,7 +529,30 @@ def menu_reservations(model):
                     print("Operation cancelled.")
             input("Press Enter...")
 
-        elif sel == '5' or sel.lower() == 'q':
+        elif sel == '5':
+            s, report = model.verify_reservation_index()
+            if s:
+                print(f"\nChecked {report['checked']} confirmed reservations.")
+                if report['consistent']:
+                    print(">> Index is consistent with the Reservation table.")
+                else:
+                    print(f"!! Missing from index: {report['missing'][:20]}")
+                    print(f"!! Stale in index:     {report['stale'][:20]}")
+                    print(f"!! Mismatched:         {report['mismatched'][:20]}")
+                    print("Use option 6 to rebuild.")
+            else:
+                print(f"!! Error: {report}")
+            input("Press Enter...")
+
+        elif sel == '6':
+            s, count = model.rebuild_reservation_index()
+            if s:
+                print(f">> Success: Index rebuilt ({count} active reservations).")
+            else:
+                print(f"!! Error: {count}")
+            input("Press Enter...")
+
+        elif sel == '7' or sel.lower() == 'q':
             return
 
 
@@ -451,18 +640,17 @@ def menu_reports(model):
         sel = input("\nSelect: ").strip()
 
         if sel == '1':
-            s, rows = model.get_all_payments()
-            if s and rows:
-                print(f"\n{'ID':<10} {'AMOUNT':<10} {'CUSTOMER'}")
-                print("-" * 50)
-                for r in rows:
-                    pid = str(r.get('payment_id', r.get('payment_number', 'N/A')))
-                    amt = str(r.get('amount', r.get('total_amount', '0')))
-                    name = r.get('full_name', 'N/A')
-                    print(f"{pid:<10} {amt:<10} {name}")
-            else:
+            def fmt(r):
+                pid = str(r.get('payment_id', r.get('payment_number', 'N/A')))
+                amt = str(r.get('amount', r.get('total_amount', '0')))
+                name = r.get('full_name', 'N/A')
+                return f"{pid:<10} {amt:<10} {name}"
+
+            header = f"\n{'ID':<10} {'AMOUNT':<10} {'CUSTOMER'}\n" + "-" * 50
+            if not browse_pages(model.get_payments_page, 'payment_number', header, fmt,
+                                stream_all=lambda: model.get_all_payments(stream=True, compact=True)):
                 print("No payments found.")
-            input("\nPress Enter...")
+                input("\nPress Enter...")
         
         elif sel == '2':
             try:
@@ -554,7 +742,7 @@ def menu_operations(model):
             if not res_id: continue
             
             emp_id = get_int("Employee ID")
-            loc_id = get_int("Location ID")
+            loc_id = get_ref_id(model, "Location ID", 'location')
             state = get_input("Condition (e.g. Good, Scratched)")
             date_val = get_input("Date (YYYY-MM-DD)")
             
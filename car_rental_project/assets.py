@@ -0,0 +1,182 @@
+"""
+Decoded, pre-scaled image assets for the kiosk screens.
+
+Every screen switch used to reopen its background JPEG and LANCZOS-resize it
+to the window size. ImageCache does that once per (image, size): scaled
+images stay in memory (least recently used first out, bounded by
+max_bytes) and, with a cache_dir, are also written to disk so the next
+start only has to decode the small pre-scaled file. warm() fills the
+cache on a background thread while the first screen is showing.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from PIL import Image, ImageTk
+
+BACKGROUNDS = ("bmw_login.jpg", "blurry_car_bg.jpg")
+CARD_FILES = {
+    "City Car": "city_car.png", "Compact Hatch": "compact.png", "Crossover": "crossover.png", "Full SUV": "suv.png",
+    "Luxury Compact": "luxury_compact.png", "Executive": "executive.png", "MPV": "mpv.png", "Passenger Van": "van.png",
+}
+GENERIC_CARD = None  # no image: the screens show their placeholder instead
+CARD_SIZE = (220, 140)          # subcategory cards
+SUMMARY_CARD_SIZE = (180, 110)  # booking overview
+IMAGE_CACHE_BYTES = 96 * 1024 * 1024
+
+
+@lru_cache(maxsize=256)
+def card_file(class_name, resolve):
+    """
+    The card image for a vehicle class. Classes are edited from the admin
+    console, so a name missing from CARD_FILES uses <slug>.png when that file
+    exists ("Sports Car" -> sports_car.png) and GENERIC_CARD otherwise.
+    """
+    known = CARD_FILES.get(class_name)
+    if known:
+        return known
+    slug = re.sub(r"[^a-z0-9]+", "_", class_name.lower()).strip("_") + ".png"
+    return slug if os.path.exists(resolve(slug)) else GENERIC_CARD
+
+class ImageCache:
+    def __init__(self, resolve, max_bytes=IMAGE_CACHE_BYTES, cache_dir=None):
+        """
+        resolve: callable mapping an asset name to its file path.
+        cache_dir: folder for pre-scaled copies; None keeps the cache in memory only.
+        """
+        self._resolve = resolve
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # (name, size) -> {'image', 'photo', 'bytes'}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = self.misses = 0
+
+    def scaled(self, name, size):
+        """The PIL image for name resized to size; decoded and resampled only on the first call."""
+        key = (name, tuple(size))
+        with self._lock:
+            entry = self._touch(key)
+            if entry:
+                return entry['image']
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One decode per key, even when the warm-up thread and the UI ask at the same time
+        with key_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry:
+                    return entry['image']
+            try:
+                image = self._load(name, key[1])
+                with self._lock:
+                    self.misses += 1
+                    self._store(key, image)
+            finally:
+                # Also after a failed decode, or every missing file would leave its lock behind
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return image
+
+    def photo(self, name, size):
+        """A Tk PhotoImage of the scaled image. Tk thread only; callers keep a reference while it is shown."""
+        image = self.scaled(name, size)
+        key = (name, tuple(size))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['photo'] is not None:
+                return entry['photo']
+        photo = ImageTk.PhotoImage(image)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['photo'] is None:
+                # Tk keeps its own copy of the pixels
+                extra = entry['bytes']
+                entry['photo'] = photo
+                entry['bytes'] += extra
+                self._bytes += extra
+                self._evict()
+        return photo
+
+    def warm(self, items):
+        """Scales every (name, size) pair on a background thread; missing files are skipped."""
+        def run():
+            for name, size in items:
+                try:
+                    self.scaled(name, size)
+                except (OSError, ValueError):
+                    pass
+        thread = threading.Thread(target=run, name="image-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    # -------------------------------------------------------------------------
+    # INTERNALS (call with self._lock held)
+    # -------------------------------------------------------------------------
+    def _touch(self, key):
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def _store(self, key, image):
+        size = image.width * image.height * len(image.getbands())
+        self._entries[key] = {'image': image, 'photo': None, 'bytes': size}
+        self._bytes += size
+        self._evict()
+
+    def _evict(self):
+        # The newest entry always stays, even if it alone is over the limit
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry['bytes']
+
+    # -------------------------------------------------------------------------
+    # DECODING AND DISK CACHE
+    # -------------------------------------------------------------------------
+    def _cached_path(self, name, size):
+        if not self.cache_dir:
+            return None
+        stem, ext = os.path.splitext(os.path.basename(name))
+        return os.path.join(self.cache_dir, f"{stem}@{size[0]}x{size[1]}{ext}")
+
+    def _load(self, name, size):
+        source = self._resolve(name)
+        cached = self._cached_path(name, size)
+        if cached and os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(source):
+            try:
+                with Image.open(cached) as img:
+                    img.load()
+                    return img.copy()
+            except OSError:
+                pass  # unreadable copy: rebuild it below
+
+        with Image.open(source) as img:
+            # JPEGs can decode straight at a reduced scale, far cheaper than full size + resample
+            img.draft(img.mode, size)
+            scaled = img.resize(size, Image.Resampling.LANCZOS)
+        if cached:
+            self._save(scaled, cached)
+        return scaled
+
+    def _save(self, image, path):
+        """Writes the pre-scaled copy atomically; a read-only install just skips it."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fmt = "JPEG" if path.lower().endswith((".jpg", ".jpeg")) else "PNG"
+            image.save(tmp, format=fmt, **({"quality": 92} if fmt == "JPEG" else {}))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
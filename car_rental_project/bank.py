@@ -0,0 +1,181 @@
+"""
+Mock bank for the payment channel.
+
+Requests are accepted on the caller's thread (e.g. the MQTT network
+callback) and handed to a pool of worker threads, so N concurrent payments
+take about one latency period instead of N. Latency and decline behaviour
+come from configurable distributions, and the bank keeps throughput and
+latency statistics for load tests:
+
+    python bank.py --requests 500 --workers 64 --latency lognormal:1.5:0.4 --decline 0.05
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# -------------------------------------------------------------------------
+# DISTRIBUTIONS
+# -------------------------------------------------------------------------
+def parse_latency(spec):
+    """
+    Builds a latency sampler (rnd -> seconds) from a spec string:
+      fixed:S              always S seconds
+      uniform:LO:HI        uniformly between LO and HI
+      lognormal:MEDIAN:SIGMA  long-tailed, like a real card processor
+    """
+    kind, *args = spec.split(":")
+    try:
+        args = [float(a) for a in args]
+        if kind == "fixed" and len(args) == 1:
+            return lambda rnd: args[0]
+        if kind == "uniform" and len(args) == 2:
+            return lambda rnd: rnd.uniform(args[0], args[1])
+        if kind == "lognormal" and len(args) == 2:
+            mu = math.log(args[0])
+            return lambda rnd: rnd.lognormvariate(mu, args[1])
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec '{spec}' (use fixed:S, uniform:LO:HI or lognormal:MEDIAN:SIGMA)")
+
+
+def decline_policy(rate=0.0, high_amount=None, high_rate=None):
+    """
+    Builds a decline sampler (rnd, request -> bool): requests decline with
+    probability rate, or high_rate when the amount exceeds high_amount.
+    """
+    def declines(rnd, request):
+        p = rate
+        if high_amount is not None and (request.get('amount') or 0) > high_amount:
+            p = high_rate if high_rate is not None else rate
+        return rnd.random() < p
+    return declines
+
+
+# -------------------------------------------------------------------------
+# BANK
+# -------------------------------------------------------------------------
+class MockBank:
+    def __init__(self, publish, workers=16, latency="fixed:2", declines=None, seed=None):
+        """
+        publish: callable taking the JSON response string.
+        latency: spec string (see parse_latency) or a sampler rnd -> seconds.
+        declines: sampler (rnd, request) -> bool; by default everything is approved.
+        """
+        self._publish = publish
+        self._latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self._declines = declines or decline_policy(0.0)
+        self._rnd = random.Random(seed)
+        self._rnd_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bank")
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def submit(self, payload):
+        """Queues one payment request (bytes or str); returns immediately."""
+        received = time.perf_counter()
+        try:
+            request = json.loads(payload)
+        except (TypeError, ValueError):
+            with self._stats_lock:
+                self._malformed += 1
+            return
+        with self._stats_lock:
+            self._first = self._first or received
+        self._pool.submit(self._process, request, received)
+
+    def _process(self, request, received):
+        with self._rnd_lock:
+            delay = self._latency(self._rnd)
+            declined = self._declines(self._rnd, request)
+        time.sleep(max(0.0, delay))
+
+        response = {
+            "correlation_id": request.get('correlation_id'),
+            "status": "DECLINED" if declined else "APPROVED",
+            "transaction_id": f"VISA-{int(time.time())}-{threading.get_ident() % 10000:04d}",
+            "amount": request.get('amount'),
+        }
+        try:
+            self._publish(json.dumps(response))
+        except Exception:
+            with self._stats_lock:
+                self._publish_errors += 1
+            return
+
+        done = time.perf_counter()
+        with self._stats_lock:
+            self._latencies.append(done - received)
+            self._last = done
+            if declined:
+                self._declined += 1
+            else:
+                self._approved += 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._latencies = []
+            self._approved = self._declined = self._malformed = self._publish_errors = 0
+            self._first = self._last = None
+
+    def stats(self):
+        """Throughput and latency (queue wait + processing) of the requests answered so far."""
+        with self._stats_lock:
+            lat = sorted(self._latencies)
+            span = (self._last - self._first) if self._first and self._last else 0.0
+            report = {
+                "answered": len(lat), "approved": self._approved, "declined": self._declined,
+                "malformed": self._malformed, "publish_errors": self._publish_errors,
+                "throughput_per_s": len(lat) / span if span else 0.0,
+            }
+        if len(lat) >= 2:
+            q = statistics.quantiles(lat, n=100, method="inclusive")
+            report.update(p50_ms=q[49] * 1000, p95_ms=q[94] * 1000, p99_ms=q[98] * 1000, max_ms=lat[-1] * 1000)
+        elif lat:
+            report.update(p50_ms=lat[0] * 1000, p95_ms=lat[0] * 1000, p99_ms=lat[0] * 1000, max_ms=lat[0] * 1000)
+        return report
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def main():
+    from payments import PaymentClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="concurrent payments to send")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", default="lognormal:1.5:0.4")
+    parser.add_argument("--decline", type=float, default=0.05, help="decline probability")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # The bank answers straight into the client: no broker, no network
+    client = None
+    bank = MockBank(lambda resp: client.handle_response(resp), workers=args.workers,
+                    latency=args.latency, declines=decline_policy(args.decline), seed=args.seed)
+    client = PaymentClient(bank.submit, timeout=60)
+
+    t0 = time.perf_counter()
+    futures = [client.request(100 + i, "4242") for i in range(args.requests)]
+    results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+    bank.shutdown()
+    client.close()
+
+    s = bank.stats()
+    approved = sum(r['status'] == 'APPROVED' for r in results)
+    print(f"{args.requests} payments, {args.workers} workers, latency {args.latency}")
+    print(f"  wall time     {elapsed:.2f}s ({args.requests / elapsed:.1f} payments/s)")
+    print(f"  approved      {approved}  declined {args.requests - approved}")
+    print(f"  latency ms    p50 {s.get('p50_ms', 0):.0f}  p95 {s.get('p95_ms', 0):.0f}  "
+          f"p99 {s.get('p99_ms', 0):.0f}  max {s.get('max_ms', 0):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Checkout throughput benchmark.
+
+Compares the old four-step finalize (get_customer_by_email, add_customer,
+add_reservation, add_payment, each with its own commit) with
+RentalModel.book, which does the same work in one transaction. Every
+booking is for a new customer, the worst case for the old path.
+
+    python benchmarks/bench_checkout.py --bookings 500
+"""
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import make_bench_db, percentile
+from model import RentalModel
+
+
+def legacy_checkout(model, cust, res, pay):
+    s, existing = model.get_customer_by_email(cust['email'])
+    cust_id = existing['customer_id'] if s and existing else model.add_customer(cust)[1]
+    s, res_id = model.add_reservation(dict(res, cust_id=cust_id))
+    if s:
+        s, _ = model.add_payment(res_id, pay['amount'], cust_id)
+    return s
+
+
+def unit_of_work_checkout(model, cust, res, pay):
+    return model.book(cust, res, pay)[0]
+
+
+def run(model, checkout, bookings, tag, year):
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    for i in range(bookings):
+        cust = {
+            'license': f"{i:09d}", 'name': "Checkout Bench", 'dob': "1990-01-01",
+            'address': "Bench St", 'phone': "6900000000", 'email': f"{tag}{i}@example.com",
+        }
+        # Every booking gets its own car and window, so none is refused as taken
+        start = date(year, 1, 1) + timedelta(days=3 * (i // 500))
+        res = {'p_date': start.isoformat(), 'd_date': (start + timedelta(days=2)).isoformat(), 'car_id': 1 + i % 500,
+               'p_loc': 1, 'd_loc': 1, 'ins_id': 1, 'cat_id': 1}
+        t0 = time.perf_counter()
+        ok = checkout(model, cust, res, {'amount': 150, 'deposit': 50, 'car_price': 100})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        failures += 0 if ok else 1
+    elapsed = time.perf_counter() - started
+    return bookings / elapsed, percentile(latencies, 50), percentile(latencies, 95), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--wal", action="store_true", help="run with WAL journaling")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RentalModel(db_path=make_bench_db(tmp, reservations=20000), wal=args.wal)
+        print(f"\n{'CHECKOUT':<18} {'BOOK/S':>8} {'P50 ms':>8} {'P95 ms':>8} {'FAILED':>7}")
+        print("-" * 53)
+        for year, (name, checkout) in enumerate((("four commits", legacy_checkout), ("book()", unit_of_work_checkout)), 2030):
+            rate, p50, p95, failed = run(model, checkout, args.bookings, name.split()[0].strip("()"), year)
+            print(f"{name:<18} {rate:>8.1f} {p50:>8.2f} {p95:>8.2f} {failed:>7}")
+        model.close()
+
+
+if __name__ == "__main__":
+    main()
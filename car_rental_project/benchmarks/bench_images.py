@@ -0,0 +1,73 @@
+"""
+Screen image cost: uncached resize vs ImageCache.
+
+Times what a screen switch pays for its background and card images:
+decoding + LANCZOS resampling on every switch (the old set_background), a
+cold start that reads the pre-scaled copies from the disk cache, and an
+in-memory cache hit. PhotoImage conversion needs a display and is left out.
+
+    python benchmarks/bench_images.py --width 1280 --height 918
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+
+from common import PROJECT_DIR
+from assets import ImageCache, CARD_FILES, CARD_SIZE
+
+
+def resolve(name):
+    return os.path.join(PROJECT_DIR, name)
+
+
+def timed(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=918)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    items = [("blurry_car_bg.jpg", (args.width, args.height))] + [(f, CARD_SIZE) for f in CARD_FILES.values()]
+
+    def uncached():
+        for name, size in items:
+            Image.open(resolve(name)).resize(size, Image.Resampling.LANCZOS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ImageCache(resolve, cache_dir=tmp).warm(items).join()  # writes the pre-scaled copies
+
+        def cold_from_disk():
+            cache = ImageCache(resolve, cache_dir=tmp)
+            for name, size in items:
+                cache.scaled(name, size)
+
+        warm_cache = ImageCache(resolve)
+        for name, size in items:
+            warm_cache.scaled(name, size)
+
+        def memory_hit():
+            for name, size in items:
+                warm_cache.scaled(name, size)
+
+        print(f"Background {args.width}x{args.height} + {len(CARD_FILES)} cards per screen switch (median of {args.repeat})")
+        print(f"  decode + resize every time   {timed(uncached, args.repeat):9.2f} ms")
+        print(f"  cold start, disk cache       {timed(cold_from_disk, args.repeat):9.2f} ms")
+        print(f"  memory cache hit             {timed(memory_hit, args.repeat):9.4f} ms")
+        print(f"  cache footprint              {warm_cache.stats()['bytes'] / 1e6:9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
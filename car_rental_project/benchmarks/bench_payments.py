@@ -0,0 +1,120 @@
+"""
+Payment channel benchmark.
+
+Sends concurrent payments through PaymentClient -> transport -> MockBank and
+back over each transport, with a fixed bank latency and no declines, so runs
+are repeatable and need no network. "direct" wires the bank straight into
+the client and shows the floor; the gap to it is the transport's overhead.
+
+    python benchmarks/bench_payments.py --requests 500 --latency fixed:0.05
+    python benchmarks/bench_payments.py --transports inprocess,local,paho --broker localhost
+"""
+import argparse
+import threading
+import time
+
+import common  # noqa: F401 - puts the project on sys.path
+from common import percentile
+from bank import MockBank
+from payments import PaymentClient
+from transports import (InProcessHub, InProcessTransport, LocalBroker, LocalBrokerTransport, PahoTransport,
+                        TransportError)
+
+TOPIC_REQUEST = "bench/payment/request"
+TOPIC_RESPONSE = "bench/payment/response"
+
+
+def channel(kind, args):
+    """Returns (bank_transport, app_transport, cleanup) for one transport kind."""
+    if kind == "inprocess":
+        hub = InProcessHub()
+        return InProcessTransport(hub), InProcessTransport(hub), lambda: None
+    if kind == "local":
+        broker = LocalBroker(port=0).start()
+        return (LocalBrokerTransport(port=broker.port), LocalBrokerTransport(port=broker.port), broker.stop)
+    if kind == "paho":
+        return PahoTransport(args.broker, args.port), PahoTransport(args.broker, args.port), lambda: None
+    raise ValueError(f"Unknown transport '{kind}'")
+
+
+def run(kind, args):
+    latencies = []
+    lock = threading.Lock()
+    client = None
+
+    if kind == "direct":
+        bank = MockBank(lambda resp: client.handle_response(resp), workers=args.workers, latency=args.latency, seed=1)
+        client = PaymentClient(bank.submit, timeout=args.timeout)
+        transports, cleanup = [], lambda: None
+    else:
+        bank_t, app_t, cleanup = channel(kind, args)
+        bank = MockBank(lambda resp: bank_t.publish(TOPIC_RESPONSE, resp),
+                        workers=args.workers, latency=args.latency, seed=1)
+        bank_t.subscribe(TOPIC_REQUEST, bank.submit)
+        client = PaymentClient(lambda req: app_t.publish(TOPIC_REQUEST, req), timeout=args.timeout)
+        app_t.subscribe(TOPIC_RESPONSE, client.handle_response)
+        transports = [bank_t, app_t]
+        for t in transports:
+            t.connect()
+        time.sleep(args.settle)  # let subscriptions reach the broker
+
+    def timed(future, t0):
+        def done(f):
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+        future.add_done_callback(done)
+
+    t_start = time.perf_counter()
+    futures = []
+    for i in range(args.requests):
+        t0 = time.perf_counter()
+        future = client.request(100 + i, "4242")
+        timed(future, t0)
+        futures.append(future)
+
+    approved = timeouts = 0
+    for f in futures:
+        try:
+            approved += f.result().get('status') == 'APPROVED'
+        except Exception:
+            timeouts += 1
+    elapsed = time.perf_counter() - t_start
+
+    client.close()
+    bank.shutdown()
+    for t in transports:
+        t.close()
+    cleanup()
+    return {
+        "transport": kind, "approved": approved, "failed": timeouts, "wall_s": elapsed,
+        "per_s": args.requests / elapsed,
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "max": max(latencies, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transports", default="direct,inprocess,local", help="comma-separated: direct, inprocess, local, paho")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--latency", default="fixed:0.05", help="bank latency spec (see bank.parse_latency)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--settle", type=float, default=0.2, help="seconds to wait after subscribing")
+    parser.add_argument("--broker", default="localhost", help="MQTT broker for the paho transport")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+
+    print(f"{args.requests} payments, {args.workers} bank workers, latency {args.latency}\n")
+    print(f"{'TRANSPORT':<10} {'OK':>5} {'FAIL':>5} {'WALL s':>8} {'PAY/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for kind in args.transports.split(","):
+        try:
+            r = run(kind.strip(), args)
+        except TransportError as e:
+            print(f"{kind:<10} skipped: {e}")
+            continue
+        print(f"{r['transport']:<10} {r['approved']:>5} {r['failed']:>5} {r['wall_s']:>8.2f} {r['per_s']:>8.1f} "
+              f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['max']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
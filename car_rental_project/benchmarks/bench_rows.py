@@ -0,0 +1,55 @@
+"""
+Row representation benchmark.
+
+Fetches get_all_reservations as dicts and as compact rows and reports wall
+time and peak Python memory for each.
+
+    python benchmarks/bench_rows.py --reservations 1000000
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from common import make_bench_db
+from model import RentalModel
+
+
+def measure(fetch):
+    gc.collect()
+    t0 = time.perf_counter()
+    _, rows = fetch()
+    elapsed = time.perf_counter() - t0
+    count = len(rows)
+    del rows
+
+    # Memory is measured in a second run; tracemalloc itself slows allocation down
+    gc.collect()
+    tracemalloc.start()
+    _, rows = fetch()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_bench_db(tmp, reservations=args.reservations)
+        model = RentalModel(db_path=db_path)
+
+        print(f"\n{'ROW MODE':<10} {'ROWS':>9} {'TIME s':>8} {'PEAK MB':>9}")
+        print("-" * 40)
+        for name, compact in (("dict", False), ("compact", True)):
+            count, elapsed, peak = measure(lambda: model.get_all_reservations(compact=compact))
+            print(f"{name:<10} {count:>9} {elapsed:>8.2f} {peak / 1e6:>9.1f}")
+        model.close()
+
+
+if __name__ == "__main__":
+    main()
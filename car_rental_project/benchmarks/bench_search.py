@@ -0,0 +1,140 @@
+"""
+Availability search benchmark.
+
+Compares the old two-query search (candidate cars + global conflict scan,
+subtracted in Python) with RentalModel.search_available_cars, then filtered
+searches three ways: fetch everything and filter in Python, push the filter
+spec into SQL, and narrow a cached wider result (NarrowingCache).
+
+    python benchmarks/bench_search.py --cars 10000 --reservations 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import make_bench_db, percentile
+from model import RentalModel
+from search_index import NarrowingCache, car_matches
+
+FILTER_SPECS = [
+    {'gearbox': 'Automatic'},
+    {'fuel': ['Diesel']},
+    {'gearbox': 'Automatic', 'fuel': ['Hybrid', 'Electric']},
+    {'min_seats': 7, 'min_bags': 3},
+    {'max_price': 60, 'min_seats': 5},
+]
+
+
+# The search the kiosk ran before search_available_cars, kept here as the baseline
+LEGACY_CARS_SQL = """
+    SELECT car_id, brand, model, price_per_day, gearbox, fuel, seats, bags 
+    FROM Car 
+    WHERE category_id = ? AND location_id = ? AND availability = 1
+"""
+LEGACY_CONFLICTS_SQL = """
+    SELECT car_id FROM Reservation 
+    WHERE (pick_up_date <= ? AND drop_off_date >= ?) 
+    AND status = 'Confirmed'
+"""
+
+
+def legacy_search(model, cat_id, loc_id, s_str, e_str):
+    success, cars = model.execute_query(LEGACY_CARS_SQL, (cat_id, loc_id), fetch_all=True)
+    if not success: cars = []
+    s2, busy = model.execute_query(LEGACY_CONFLICTS_SQL, (e_str, s_str), fetch_all=True)
+    busy_ids = {r['car_id'] for r in busy} if s2 and busy else set()
+    return [c for c in cars if c['car_id'] not in busy_ids]
+
+
+def anti_join_search(model, cat_id, loc_id, s_str, e_str):
+    return model.search_available_cars(cat_id, loc_id, s_str, e_str)[1]
+
+
+def python_filtered(model, spec, cat_id, loc_id, s_str, e_str):
+    rows = model.search_available_cars(cat_id, loc_id, s_str, e_str)[1]
+    return [c for c in rows if car_matches(spec, c)]
+
+
+def pushed_down(model, spec, cat_id, loc_id, s_str, e_str):
+    return model.search_available_cars(cat_id, loc_id, s_str, e_str, filters=spec)[1]
+
+
+def time_filtered(model, windows):
+    """Per-search latency of each filter strategy over every window x spec."""
+    for w in windows[:20]:
+        for spec in FILTER_SPECS:
+            a = sorted(c['car_id'] for c in python_filtered(model, spec, *w))
+            b = sorted(c['car_id'] for c in pushed_down(model, spec, *w))
+            assert a == b, f"Filter mismatch for {spec} {w}"
+
+    results = {}
+    for name, fn in (("filter in Python", python_filtered), ("pushed into SQL", pushed_down)):
+        samples = []
+        for w in windows:
+            for spec in FILTER_SPECS:
+                t0 = time.perf_counter()
+                fn(model, spec, *w)
+                samples.append((time.perf_counter() - t0) * 1000)
+        results[name] = samples
+
+    # A kiosk session: one broad search, then every spec narrows it in memory
+    samples = []
+    for w in windows:
+        cache = NarrowingCache(lambda spec, w=w: model.search_available_cars(*w, filters=spec))
+        cache.get({})
+        for spec in FILTER_SPECS:
+            t0 = time.perf_counter()
+            cache.get(spec)
+            samples.append((time.perf_counter() - t0) * 1000)
+    results["narrowed from cache"] = samples
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--reservations", type=int, default=1000000)
+    parser.add_argument("--searches", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.cars} cars / {args.reservations} reservations...")
+        db_path = make_bench_db(tmp, cars=args.cars, reservations=args.reservations)
+        model = RentalModel(db_path=db_path)
+
+        rnd = random.Random(7)
+        windows = []
+        for _ in range(args.searches):
+            start = date(2020, 1, 1) + timedelta(days=rnd.randint(0, 2500))
+            end = start + timedelta(days=rnd.randint(1, 10))
+            windows.append((rnd.randint(1, 4), rnd.randint(1, 6), start.isoformat(), end.isoformat()))
+
+        # Both implementations must agree before timing means anything
+        for w in windows[:20]:
+            a = sorted(c['car_id'] for c in legacy_search(model, *w))
+            b = sorted(c['car_id'] for c in anti_join_search(model, *w))
+            assert a == b, f"Result mismatch for {w}"
+
+        print(f"\n{'METHOD':<22} {'P50 ms':>8} {'P95 ms':>8} {'MEAN ms':>8}")
+        print("-" * 50)
+        for name, fn in (("legacy two-query", legacy_search), ("search_available_cars", anti_join_search)):
+            samples = []
+            for w in windows:
+                t0 = time.perf_counter()
+                fn(model, *w)
+                samples.append((time.perf_counter() - t0) * 1000)
+            print(f"{name:<22} {percentile(samples, 50):>8.2f} {percentile(samples, 95):>8.2f} "
+                  f"{sum(samples) / len(samples):>8.2f}")
+
+        print(f"\n{'FILTERED SEARCH':<22} {'P50 ms':>8} {'P95 ms':>8} {'MEAN ms':>8}")
+        print("-" * 50)
+        for name, samples in time_filtered(model, windows).items():
+            print(f"{name:<22} {percentile(samples, 50):>8.2f} {percentile(samples, 95):>8.2f} "
+                  f"{sum(samples) / len(samples):>8.2f}")
+        model.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+Benchmark suite for RentalModel and the kiosk booking path.
+
+Times every public RentalModel method (the calls listed in
+query_audit.AUDIT_REGISTRY) and the headless booking flow
+perform_search -> refresh_subcategory_view -> select_subcategory ->
+calculate_invoice -> finalize_booking, on generated databases at one or
+more scales. Writes get fresh inputs on every run (see FRESH_CALLS), and
+runs whose call reports a failure are counted instead of timed. Results are
+written as a JSON baseline; compare flags any timing that got slower than
+the threshold.
+
+    python benchmarks/bench_suite.py run --scales small,medium --out baseline.json
+    python benchmarks/bench_suite.py run --scales small,medium --out current.json
+    python benchmarks/bench_suite.py compare baseline.json current.json --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from common import make_bench_db
+from model import RentalModel
+from controller import RentalController
+from workers import InlineWorker
+from search_index import SearchIndex
+from query_audit import AUDIT_REGISTRY
+
+SCALES = {
+    "small": {"cars": 200, "customers": 1000, "reservations": 10000},
+    "medium": {"cars": 2000, "customers": 10000, "reservations": 100000},
+    "large": {"cars": 10000, "customers": 50000, "reservations": 1000000},
+}
+
+# Differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+
+# -------------------------------------------------------------------------
+# HEADLESS CONTROLLER
+# -------------------------------------------------------------------------
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class HeadlessView:
+    """Stands in for RentalView: holds the widget values the controller reads and records what it shows."""
+
+    def __init__(self, category, location):
+        self.combos = {
+            'car_type': _Var(category), 'pickup_loc': _Var(location),
+            'pickup_time': _Var("10:00"), 'dropoff_time': _Var("10:00"),
+        }
+        self.calendar_selection = {'start': None, 'end': None}
+        self.filter_vars = {}
+        self.insurance_var = _Var(1)
+        self.subcats = {}
+        self.invoice = None
+        self.error = None
+
+    def show_subcategory_screen(self, subcats_status, **_):
+        self.subcats = subcats_status
+
+    def show_booking_overview(self, **_):
+        pass
+
+    def show_invoice_screen(self, invoice_data, **_):
+        self.invoice = invoice_data
+
+    def show_info(self, title, message):
+        pass
+
+    def show_error(self, message):
+        self.error = message
+
+    def show_loading(self, message=""):
+        pass
+
+    def hide_loading(self):
+        pass
+
+    def after(self, ms, func=None):
+        pass
+
+    def after_cancel(self, timer_id):
+        pass
+
+
+def headless_controller(model):
+    """A RentalController wired to model and a HeadlessView, without Tk, MQTT or the bank thread."""
+    ctl = RentalController.__new__(RentalController)
+    ctl.model = model
+    # Model calls run synchronously so each step's timing includes its queries
+    ctl.worker = InlineWorker()
+    ctl._load_init_data()
+    ctl.view = HeadlessView(ctl.categories[0], ctl.locations[0])
+    ctl.current_booking = {}
+    ctl.search_results = []
+    ctl.search_index = SearchIndex()
+    ctl.current_cat_id = 1
+    return ctl
+
+
+def bench_booking_path(model, bookings, seed=7):
+    """Runs the kiosk flow end to end and returns per-step and total latencies in ms."""
+    rnd = random.Random(seed)
+    ctl = headless_controller(model)
+    steps = {name: [] for name in (
+        "perform_search", "refresh_subcategory_view", "select_subcategory",
+        "calculate_invoice", "finalize_booking", "total")}
+    failed = 0
+
+    for i in range(bookings):
+        start = date(2029, 1, 1) + timedelta(days=rnd.randint(0, 700))
+        ctl.view.calendar_selection = {'start': start, 'end': start + timedelta(days=rnd.randint(1, 10))}
+        ctl.view.error = None
+        ctl.current_booking = {'customer': {
+            'license': f"{rnd.randrange(10**9):09d}", 'name': "Bench Kiosk", 'dob': "01/01/1990",
+            'address': "Bench St", 'phone': "6900000000", 'email': f"kiosk{seed}-{i}@example.com",
+        }}
+        t_total = time.perf_counter()
+
+        t0 = time.perf_counter()
+        ctl.perform_search()
+        steps["perform_search"].append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        ctl.refresh_subcategory_view()
+        steps["refresh_subcategory_view"].append((time.perf_counter() - t0) * 1000)
+
+        available = [name for name, info in ctl.view.subcats.items() if info['available']]
+        if not available:
+            failed += 1
+            continue
+        t0 = time.perf_counter()
+        ctl.select_subcategory(available[0])
+        steps["select_subcategory"].append((time.perf_counter() - t0) * 1000)
+        if 'car' not in ctl.current_booking:
+            failed += 1
+            continue
+
+        t0 = time.perf_counter()
+        ctl.calculate_invoice()
+        steps["calculate_invoice"].append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        ctl.finalize_booking(ctl.view.invoice)
+        steps["finalize_booking"].append((time.perf_counter() - t0) * 1000)
+        steps["total"].append((time.perf_counter() - t_total) * 1000)
+        if ctl.view.error:
+            failed += 1
+
+    return {name: summarize(values) for name, values in steps.items()}, failed
+
+
+# -------------------------------------------------------------------------
+# FRESH INPUTS FOR WRITES
+# -------------------------------------------------------------------------
+# The audit calls use fixed arguments. Repeated, every write after the first
+# would time a rejection instead: the car is taken, the email already exists,
+# the row is gone. Each entry here takes (model, i), does any setup for run i
+# untimed and returns the call to time.
+FRESH_FROM = date(2040, 1, 1)  # after every generated reservation
+
+
+def window(i):
+    """A two-day booking window that no other run of the same benchmark overlaps."""
+    start = FRESH_FROM + timedelta(days=3 * i)
+    return start.isoformat(), (start + timedelta(days=1)).isoformat()
+
+
+def customer(tag, i):
+    return {'license': f"{i:09d}", 'name': f"Bench {tag.title()} {i}", 'dob': '1990-01-01',
+            'address': 'Bench St', 'phone': '6900000000', 'email': f"bench.{tag}{i}@example.com"}
+
+
+def reservation(car_id, i, cust_id=1):
+    p_date, d_date = window(i)
+    return {'p_date': p_date, 'd_date': d_date, 'car_id': car_id, 'p_loc': 1, 'd_loc': 1,
+            'cust_id': cust_id, 'ins_id': 1, 'cat_id': 1}
+
+
+def car(tag, i):
+    return {'plate': f"BEN-{tag}{i:04d}", 'brand': 'Bench', 'model': 'Probe', 'price': 50, 'color': 'Grey',
+            'gear': 'Manual', 'mil': 0, 'loc_id': 1, 'cat_id': 1}
+
+
+def employee(tag, i):
+    return {'name': 'Bench', 'surname': f"{tag.title()} {i}", 'email': f"bench.{tag}{i}@example.com",
+            'phone': '6900000000', 'afm': f"{i:09d}"}
+
+
+def setup(outcome):
+    """The value of a successful setup call; a failed setup aborts the benchmark."""
+    success, value = outcome
+    if not success:
+        raise RuntimeError(f"benchmark setup failed: {value}")
+    return value
+
+
+def _renew_hold(m, i):
+    hold_id = setup(m.place_hold(4, *window(i)))
+    return lambda: m.renew_hold(hold_id)
+
+
+def _release_hold(m, i):
+    hold_id = setup(m.place_hold(7, *window(i)))
+    return lambda: m.release_hold(hold_id)
+
+
+def _delete_customer(m, i):
+    cust_id = setup(m.add_customer(customer("deleted", i)))
+    return lambda: m.delete_customer(cust_id)
+
+
+def _retire_car(m, i):
+    car_id = setup(m.add_car(car("R", i)))
+    return lambda: m.retire_car(car_id)
+
+
+def _activate_car(m, i):
+    car_id = setup(m.add_car(car("A", i)))
+    setup(m.retire_car(car_id))
+    return lambda: m.activate_car(car_id)
+
+
+def _cancel_reservation(m, i):
+    res_id = setup(m.add_reservation(reservation(6, i)))
+    return lambda: m.cancel_reservation(res_id)
+
+
+def _delete_employee(m, i):
+    emp_id = setup(m.add_employee(employee("deleted", i)))
+    return lambda: m.delete_employee(emp_id)
+
+
+def _add_pickup_dropoff(m, i):
+    res_id = setup(m.add_reservation(reservation(8, i)))
+    data = {'emp_id': 2, 'res_id': res_id, 'loc_id': 1, 'state': 'Good', 'date': f"{window(i)[0]} 10:00:00"}
+    return lambda: m.add_pickup_dropoff("PickUp", data)
+
+
+def _add_subcategory_model(m, i):
+    sub_id = setup(m.add_subcategory(1, f"Bench Models {i}"))
+    return lambda: m.add_subcategory_model(sub_id, "Probe")
+
+
+def _remove_subcategory_model(m, i):
+    sub_id = setup(m.add_subcategory(1, f"Bench Unlisted {i}"))
+    setup(m.add_subcategory_model(sub_id, "Probe"))
+    return lambda: m.remove_subcategory_model(sub_id, "Probe")
+
+
+def _remove_subcategory(m, i):
+    sub_id = setup(m.add_subcategory(1, f"Bench Removed {i}"))
+    return lambda: m.remove_subcategory(sub_id)
+
+
+# One car per hold/booking benchmark, so their windows never collide
+FRESH_CALLS = {
+    "add_customer": lambda m, i: lambda: m.add_customer(customer("customer", i)),
+    "place_hold": lambda m, i: lambda: m.place_hold(3, *window(i)),
+    "renew_hold": _renew_hold,
+    "add_reservation": lambda m, i: lambda: m.add_reservation(reservation(5, i)),
+    "release_hold": _release_hold,
+    "book": lambda m, i: lambda: m.book(
+        customer("booker", i), reservation(2, i, cust_id=None), {'amount': 150, 'deposit': 50, 'car_price': 100}),
+    "delete_customer": _delete_customer,
+    "add_car": lambda m, i: lambda: m.add_car(car("C", i)),
+    # Updates too: writing back the value a row already holds is not a real update
+    "update_customer": lambda m, i: lambda: m.update_customer(1, "phone", f"69{i:08d}"),
+    "update_car_price": lambda m, i: lambda: m.update_car_price(1, 60 + i),
+    "update_car_mileage": lambda m, i: lambda: m.update_car_mileage(1, 1000 + i),
+    "update_employee": lambda m, i: lambda: m.update_employee(1, "phone", f"69{i:08d}"),
+    "add_subcategory": lambda m, i: lambda: m.add_subcategory(1, f"Bench Class {i}"),
+    "add_subcategory_model": _add_subcategory_model,
+    "remove_subcategory_model": _remove_subcategory_model,
+    "remove_subcategory": _remove_subcategory,
+    "retire_car": _retire_car,
+    "activate_car": _activate_car,
+    "cancel_reservation": _cancel_reservation,
+    "add_employee": lambda m, i: lambda: m.add_employee(employee("added", i)),
+    "delete_employee": _delete_employee,
+    "add_pickup_dropoff": _add_pickup_dropoff,
+}
+
+
+# -------------------------------------------------------------------------
+# TIMING
+# -------------------------------------------------------------------------
+def summarize(samples, failed=0):
+    if not samples:
+        return {"runs": 0, "failed": failed, "min_ms": 0.0, "median_ms": 0.0, "mean_ms": 0.0}
+    return {
+        "runs": len(samples),
+        "failed": failed,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def succeeded(outcome):
+    """False when a model call, or any call in a tuple of them, returned (False, error)."""
+    if isinstance(outcome, tuple) and len(outcome) == 2 and isinstance(outcome[0], bool):
+        return outcome[0]
+    if isinstance(outcome, tuple):
+        return all(succeeded(o) for o in outcome)
+    return True
+
+
+def time_call(prepare, repeat, budget_s):
+    """
+    One warm-up run, then up to repeat timed runs or until budget_s runs out
+    (at least one). prepare(i) returns the call for run i; runs whose call
+    fails are counted in "failed" and left out of the timings.
+    """
+    prepare(0)()
+    samples, failed = [], 0
+    deadline = time.perf_counter() + budget_s
+    for i in range(1, repeat + 1):
+        call = prepare(i)
+        t0 = time.perf_counter()
+        outcome = call()
+        elapsed = (time.perf_counter() - t0) * 1000
+        if succeeded(outcome):
+            samples.append(elapsed)
+        else:
+            failed += 1
+        if time.perf_counter() > deadline:
+            break
+    return summarize(samples, failed)
+
+
+def run_scale(name, repeat, budget_s, bookings):
+    sizes = SCALES[name]
+    print(f"[{name}] building {sizes['cars']} cars / {sizes['reservations']} reservations...", file=sys.stderr)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RentalModel(db_path=make_bench_db(tmp, **sizes))
+        results = {}
+        for item in AUDIT_REGISTRY:
+            fresh = FRESH_CALLS.get(item["name"])
+            if fresh:
+                prepare = lambda i: fresh(model, i)
+            else:
+                prepare = lambda i: lambda: item["call"](model)
+            results[f"model.{item['name']}"] = time_call(prepare, repeat, budget_s)
+        booking, failed = bench_booking_path(model, bookings)
+        for step, stats in booking.items():
+            results[f"booking.{step}"] = stats
+        model.close()
+    return {"sizes": sizes, "booking_failures": failed, "results": results}
+
+
+def cmd_run(args):
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "scales": {},
+    }
+    for name in args.scales.split(","):
+        if name not in SCALES:
+            print(f"Unknown scale '{name}' (choose from {', '.join(SCALES)})", file=sys.stderr)
+            return 2
+        report["scales"][name] = run_scale(name, args.repeat, args.budget, args.bookings)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for name, scale in report["scales"].items():
+        print(f"\n[{name}]")
+        for bench, stats in scale["results"].items():
+            failures = f", {stats['failed']} FAILED" if stats.get("failed") else ""
+            print(f"  {bench:<45} {stats['median_ms']:>10.3f} ms  ({stats['runs']} runs{failures})")
+    print(f"\nSaved to {args.out}")
+    return 0
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        cur = json.load(f)
+
+    regressions = 0
+    print(f"{'BENCHMARK':<55} {'BASE ms':>10} {'NOW ms':>10} {'CHANGE':>8}")
+    print("-" * 86)
+    for scale, data in cur["scales"].items():
+        old = base["scales"].get(scale, {}).get("results", {})
+        for bench, stats in data["results"].items():
+            if bench not in old or not old[bench]["runs"] or not stats["runs"]:
+                continue
+            before, now = old[bench]["median_ms"], stats["median_ms"]
+            change = (now - before) / before if before else 0.0
+            flag = change > args.threshold and now - before > NOISE_FLOOR_MS
+            regressions += flag
+            if flag or args.verbose:
+                mark = "  REGRESSION" if flag else ""
+                print(f"{scale + ':' + bench:<55} {before:>10.3f} {now:>10.3f} {change:>+7.0%}{mark}")
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the suite and save a JSON baseline")
+    run.add_argument("--scales", default="small", help=f"comma-separated, from: {', '.join(SCALES)}")
+    run.add_argument("--repeat", type=int, default=20, help="timed calls per benchmark")
+    run.add_argument("--budget", type=float, default=2.0, help="seconds per benchmark before stopping early")
+    run.add_argument("--bookings", type=int, default=50, help="headless bookings per scale")
+    run.add_argument("--out", default="bench_results.json")
+
+    cmp_ = sub.add_parser("compare", help="flag benchmarks that got slower than a baseline")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction (0.2 = 20%%)")
+    cmp_.add_argument("-v", "--verbose", action="store_true", help="list every benchmark, not only regressions")
+
+    args = parser.parse_args()
+    sys.exit(cmd_run(args) if args.command == "run" else cmd_compare(args))
+
+
+if __name__ == "__main__":
+    main()
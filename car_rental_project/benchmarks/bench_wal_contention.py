@@ -0,0 +1,86 @@
+"""
+Checkout-vs-report contention benchmark.
+
+An "admin" thread keeps scanning get_all_reservations / get_all_payments while
+the "kiosk" thread books cars. Booking latency is reported for the default
+rollback-journal mode and for WAL mode.
+
+    python benchmarks/bench_wal_contention.py --reservations 200000 --bookings 200
+"""
+import argparse
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from common import make_bench_db, percentile
+from model import RentalModel
+
+
+def run_mode(db_path, wal, bookings):
+    model = RentalModel(db_path=db_path, wal=wal)
+    stop = threading.Event()
+    scans = [0]
+
+    def admin_reports():
+        while not stop.is_set():
+            model.get_all_reservations()
+            model.get_all_payments()
+            scans[0] += 1
+        model.pool.release()
+        if model.reader_pool:
+            model.reader_pool.release()
+
+    reporter = threading.Thread(target=admin_reports, daemon=True)
+    reporter.start()
+    time.sleep(0.2)  # let the first scan get going
+
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    for i in range(bookings):
+        # Back-to-back windows on one car, so no booking is refused as taken
+        start = date(2030, 1, 1) + timedelta(days=3 * i)
+        t0 = time.perf_counter()
+        ok, res_id = model.add_reservation({
+            'p_date': start.isoformat(), 'd_date': (start + timedelta(days=2)).isoformat(), 'car_id': 1, 'p_loc': 1,
+            'd_loc': 1, 'cust_id': 1, 'ins_id': 1, 'cat_id': 1
+        })
+        if ok:
+            ok, _ = model.add_payment(res_id, 100, 1)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        failures += 0 if ok else 1
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    reporter.join()
+    model.close()
+    return {
+        'mode': 'WAL' if wal else 'rollback',
+        'bookings_per_sec': bookings / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'max_ms': max(latencies),
+        'failed': failures,
+        'report_scans': scans[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=200000)
+    parser.add_argument("--bookings", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'MODE':<10} {'BOOK/S':>8} {'P50 ms':>8} {'P95 ms':>8} {'MAX ms':>8} {'FAILED':>7} {'SCANS':>6}")
+    print("-" * 62)
+    for wal in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = make_bench_db(tmp, reservations=args.reservations)
+            r = run_mode(db_path, wal, args.bookings)
+        print(f"{r['mode']:<10} {r['bookings_per_sec']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['max_ms']:>8.2f} {r['failed']:>7} {r['report_scans']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Shared helpers for the benchmark scripts.
+Benchmarks never touch the shipped database: they work on a scratch copy that
+is padded with synthetic rows.
+"""
+import os
+import sys
+import shutil
+import sqlite3
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from datagen import generate  # noqa: E402 - needs PROJECT_DIR on sys.path
+
+SOURCE_DB = os.path.join(PROJECT_DIR, "car_rental_db_attempt8.db")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def make_bench_db(target_dir, cars=1000, customers=5000, reservations=100000, seed=42):
+    """
+    Copies the shipped database into target_dir and pads it with datagen's
+    synthetic rows. Returns the new file path.
+    """
+    path = os.path.join(target_dir, "bench.db")
+    shutil.copyfile(SOURCE_DB, path)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous = OFF")
+    generate(conn, cars=cars, customers=customers, reservations=reservations, seed=seed)
+    conn.close()
+    return path
@@ -0,0 +1,286 @@
+"""
+Query-plan auditor for RentalModel.
+
+Every public RentalModel method that talks to the database is listed in
+AUDIT_REGISTRY. The auditor calls each one against a padded scratch
+database, captures the exact SQL it issues and runs EXPLAIN QUERY PLAN on
+it. Full scans and temp B-trees are flagged; on hot paths they fail the run,
+as does a missing expected index or any model method that is not in the
+registry. An entry can allow specific plan lines (e.g. the one sort a query
+is known to need); those are still reported, with status "allowed".
+
+    python benchmarks/query_audit.py --out plan_report.json
+    python benchmarks/query_audit.py --baseline plan_report.json
+
+The report is JSON. With --baseline, any query that gained a new issue
+since the baseline is reported as a regression.
+"""
+import argparse
+import inspect
+import json
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+from common import make_bench_db
+from model import RentalModel
+
+FUTURE = ("2031-01-01", "2031-01-05")
+
+# Methods that manage connections rather than issue model queries
+INFRASTRUCTURE = {
+    "connect", "connect_reader", "checkpoint", "close", "execute_query", "migrate", "is_car_free",
+}
+
+
+def entry(name, call, hot=False, expect=(), allow=()):
+    """allow: exact EXPLAIN QUERY PLAN lines that are accepted, each once per statement."""
+    return {"name": name, "call": call, "hot": hot, "expect": list(expect), "allow": list(allow)}
+
+
+# Order matters: writes run after the reads that use the same rows
+AUDIT_REGISTRY = [
+    # Booking flow (kiosk hot path)
+    entry("get_locations", lambda m: m.get_locations(), allow=["SCAN Location"]),
+    entry("get_categories", lambda m: m.get_categories(), allow=["SCAN Category"]),
+    entry("get_insurance_plans", lambda m: m.get_insurance_plans(),
+          allow=["SCAN InsurancePlan", "USE TEMP B-TREE FOR ORDER BY"]),
+    entry("get_reference_version", lambda m: m.get_reference_version()),
+    entry("search_available_cars", lambda m: (
+        m.search_available_cars(1, 1, *FUTURE),
+        m.search_available_cars(1, 1, *FUTURE, filters={'subcategory_id': 1, 'gearbox': 'Automatic'}),
+        m.search_available_cars(1, 1, *FUTURE, filters={'fuel': ['Diesel'], 'min_seats': 5, 'max_price': 60})),
+          hot=True, expect=["idx_car_search", "idx_car_filters", "idx_res_car_window", "idx_hold_car"]),
+    entry("get_taxonomy", lambda m: m.get_taxonomy(), allow=["SCAN s USING INDEX idx_subcategory_order"]),
+    # Class cards: one row per class, gearbox and fuel; the GROUP BY sorts that handful of rows
+    entry("search_cheapest_by_subcategory", lambda m: m.search_cheapest_by_subcategory(1, 1, *FUTURE, variants=True),
+          hot=True, expect=["idx_car_search", "idx_res_car_window", "idx_hold_car"], allow=["USE TEMP B-TREE FOR GROUP BY"]),
+    entry("get_customer_by_email", lambda m: m.get_customer_by_email("a.papageorgiou@example.com"),
+          hot=True, expect=["idx_customer_email"]),
+    entry("add_customer", lambda m: m.add_customer({
+        'license': '123456789', 'name': 'Audit Customer', 'dob': '1990-01-01',
+        'address': 'Audit St', 'phone': '6900000000', 'email': 'audit@example.com'}), hot=True),
+    entry("place_hold", lambda m: m.place_hold(3, *FUTURE), hot=True,
+          expect=["idx_hold_expiry", "idx_res_car_window", "idx_hold_car"]),
+    entry("renew_hold", lambda m: m.renew_hold(1), hot=True),
+    entry("add_reservation", lambda m: m.add_reservation({
+        'p_date': FUTURE[0], 'd_date': FUTURE[1], 'car_id': 1, 'p_loc': 1, 'd_loc': 1,
+        'cust_id': 1, 'ins_id': 1, 'cat_id': 1}), hot=True, expect=["idx_res_car_window"]),
+    entry("add_payment", lambda m: m.add_payment(1, 100, 1), hot=True),
+    entry("release_hold", lambda m: m.release_hold(1), hot=True),
+    entry("sweep_holds", lambda m: m.sweep_holds(), expect=["idx_hold_expiry"]),
+    entry("book", lambda m: m.book(
+        {'license': '987654321', 'name': 'Audit Booker', 'dob': '1990-01-01', 'address': 'Audit St',
+         'phone': '6900000000', 'email': 'audit.booker@example.com'},
+        {'p_date': '2031-02-01', 'd_date': '2031-02-03', 'car_id': 2, 'p_loc': 1, 'd_loc': 1, 'ins_id': 1, 'cat_id': 1},
+        {'amount': 150, 'deposit': 50, 'car_price': 100}), hot=True, expect=["idx_customer_email", "idx_res_car_window"]),
+
+    # Admin intelligence (hot: run on every admin dashboard visit)
+    entry("get_active_future_reservations", lambda m: m.get_active_future_reservations(),
+          hot=True, expect=["idx_res_active_dropoff"], allow=["USE TEMP B-TREE FOR ORDER BY"]),
+    entry("get_employee_work_history", lambda m: m.get_employee_work_history(1),
+          hot=True, expect=["idx_pickup_employee", "idx_dropoff_employee"],
+          allow=["USE TEMP B-TREE FOR ORDER BY"] * 2),  # one sort per UNION ALL arm
+    entry("rebuild_reservation_index", lambda m: m.rebuild_reservation_index(),
+          expect=["idx_res_active_dropoff"]),
+    entry("verify_reservation_index", lambda m: m.verify_reservation_index(),
+          expect=["idx_res_active_dropoff"]),
+
+    # Paged admin lists
+    entry("get_customers_page", lambda m: m.get_customers_page(after_id=1000), hot=True),
+    entry("get_cars_page", lambda m: m.get_cars_page(after_id=100), hot=True),
+    entry("get_reservations_page", lambda m: m.get_reservations_page(after_id=10000), hot=True),
+    entry("get_payments_page", lambda m: m.get_payments_page(before_id=10000), hot=True),
+
+    # Full listings and reports (scans are expected)
+    entry("get_all_customers", lambda m: m.get_all_customers()),
+    entry("get_all_cars", lambda m: m.get_all_cars()),
+    entry("get_all_reservations", lambda m: m.get_all_reservations()),
+    entry("get_all_payments", lambda m: m.get_all_payments()),
+    entry("get_all_employees", lambda m: m.get_all_employees()),
+    entry("get_pickups_dropoffs", lambda m: (m.get_pickups_dropoffs("PickUp"), m.get_pickups_dropoffs("DropOff"))),
+    entry("get_stats", lambda m: m.get_stats()),
+    entry("get_top_customers", lambda m: m.get_top_customers()),
+    entry("get_avg_duration", lambda m: m.get_avg_duration()),
+    entry("get_most_popular_store", lambda m: m.get_most_popular_store()),
+
+    # Admin writes
+    entry("update_customer", lambda m: m.update_customer(1, "phone", "6911111111")),
+    entry("delete_customer", lambda m: m.delete_customer(1), expect=["idx_res_customer"]),
+    entry("add_car", lambda m: m.add_car({
+        'plate': 'AUD-0001', 'brand': 'Audit', 'model': 'Probe', 'price': 50, 'color': 'Grey',
+        'gear': 'Manual', 'mil': 0, 'loc_id': 1, 'cat_id': 1})),
+    # Class edits on the car added above (model 'Probe', category 1)
+    entry("add_subcategory", lambda m: m.add_subcategory(1, "Audit Class")),
+    entry("add_subcategory_model", lambda m: m.add_subcategory_model(9, "Probe"), expect=["idx_car_search"]),
+    entry("remove_subcategory_model", lambda m: m.remove_subcategory_model(9, "Probe"), expect=["idx_car_search"]),
+    entry("remove_subcategory", lambda m: m.remove_subcategory(9), expect=["idx_car_search"]),
+    entry("update_car_price", lambda m: m.update_car_price(1, 60)),
+    entry("update_car_mileage", lambda m: m.update_car_mileage(1, 1000)),
+    entry("retire_car", lambda m: m.retire_car(1), expect=["idx_res_car_window"]),
+    entry("activate_car", lambda m: m.activate_car(1)),
+    entry("cancel_reservation", lambda m: m.cancel_reservation(1)),
+    entry("add_employee", lambda m: m.add_employee({
+        'name': 'Audit', 'surname': 'Probe', 'email': 'audit.probe@example.com',
+        'phone': '6900000000', 'afm': '000000000'})),
+    entry("update_employee", lambda m: m.update_employee(1, "phone", "6922222222")),
+    # An id with no logged actions, so both history checks run
+    entry("delete_employee", lambda m: m.delete_employee(999999),
+          expect=["idx_pickup_employee", "idx_dropoff_employee"]),
+    entry("add_pickup_dropoff", lambda m: m.add_pickup_dropoff("PickUp", {
+        'emp_id': 2, 'res_id': 1, 'loc_id': 1, 'state': 'Good', 'date': '2031-01-01 10:00:00'})),
+]
+
+
+def plan_issues(plan, allow):
+    """
+    (issues, allowed) for one statement. Each allowed line excuses a single
+    occurrence, so a second sort or a different scan is still an issue.
+    """
+    issues, allowed = [], []
+    spare = list(allow)
+    for line in plan:
+        # SCAN CONSTANT ROW is the VALUES row of an INSERT ... SELECT, not a table
+        if line.startswith("SCAN ") and line != "SCAN CONSTANT ROW":
+            finding = f"full scan: {line}"
+        elif "TEMP B-TREE" in line:
+            finding = f"temp b-tree: {line}"
+        else:
+            continue
+        if line in spare:
+            spare.remove(line)
+            allowed.append(finding)
+        else:
+            issues.append(finding)
+    return issues, allowed
+
+
+def audit_call(model, item):
+    conn = model.pool.acquire()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        item["call"](model)
+    finally:
+        conn.set_trace_callback(None)
+
+    audited = []
+    for sql in statements:
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if head not in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+            continue  # BEGIN / COMMIT / PRAGMA
+        try:
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        except sqlite3.Error as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        issues, allowed = plan_issues(plan, item["allow"])
+        audited.append({
+            "sql": " ".join(sql.split()),
+            "plan": plan,
+            "issues": issues,
+            "allowed": allowed,
+        })
+
+    all_plan = [line for s in audited for line in s["plan"]]
+    missing = [ix for ix in item["expect"] if not any(ix in line for line in all_plan)]
+    issues = [i for s in audited for i in s["issues"]]
+    allowed = [a for s in audited for a in s["allowed"]]
+    failed = bool(missing) or (item["hot"] and bool(issues)) or not audited
+    if failed:
+        status = "fail"
+    elif issues:
+        status = "warn"
+    else:
+        status = "allowed" if allowed else "ok"
+    return {
+        "name": item["name"],
+        "hot": item["hot"],
+        "statements": audited,
+        "missing_indexes": missing,
+        "issues": issues,
+        "allowed": allowed,
+        "status": status,
+    }
+
+
+def unaudited_methods():
+    public = {
+        name for name, fn in inspect.getmembers(RentalModel, inspect.isfunction)
+        if not name.startswith("_")
+    }
+    return sorted(public - INFRASTRUCTURE - {item["name"] for item in AUDIT_REGISTRY})
+
+
+def compare(report, baseline):
+    """Returns queries that gained issues or lost expected indexes since the baseline."""
+    old = {q["name"]: q for q in baseline.get("queries", [])}
+    regressions = []
+    for q in report["queries"]:
+        prev = old.get(q["name"])
+        if prev is None:
+            continue
+        new_issues = sorted(set(q["issues"]) - set(prev["issues"]))
+        new_missing = sorted(set(q["missing_indexes"]) - set(prev["missing_indexes"]))
+        if new_issues or new_missing:
+            regressions.append({"name": q["name"], "new_issues": new_issues, "new_missing_indexes": new_missing})
+    return regressions
+
+
+def run_audit(cars, reservations):
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RentalModel(db_path=make_bench_db(tmp, cars=cars, reservations=reservations))
+        results = [audit_call(model, item) for item in AUDIT_REGISTRY]
+        model.close()
+
+    missing_methods = unaudited_methods()
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "sqlite_version": sqlite3.sqlite_version,
+        "dataset": {"cars": cars, "reservations": reservations},
+        "queries": results,
+        "unaudited_methods": missing_methods,
+        "summary": {
+            "ok": sum(r["status"] == "ok" for r in results),
+            "allowed": sum(r["status"] == "allowed" for r in results),
+            "warn": sum(r["status"] == "warn" for r in results),
+            "fail": sum(r["status"] == "fail" for r in results) + len(missing_methods),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, default=5000)
+    parser.add_argument("--reservations", type=int, default=200000)
+    parser.add_argument("--out", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON report to check for plan regressions")
+    args = parser.parse_args()
+
+    report = run_audit(args.cars, args.reservations)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f))
+        report["summary"]["fail"] += len(report["regressions"])
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    for r in report["queries"]:
+        if r["status"] == "allowed":
+            print(f"[ALLOWED] {r['name']}: {r['allowed']}", file=sys.stderr)
+        elif r["status"] != "ok":
+            print(f"[{r['status'].upper()}] {r['name']}: {r['issues'] + r['missing_indexes']}", file=sys.stderr)
+    for name in report["unaudited_methods"]:
+        print(f"[FAIL] {name}: not in AUDIT_REGISTRY", file=sys.stderr)
+    for r in report.get("regressions", []):
+        print(f"[REGRESSION] {r['name']}: {r['new_issues'] + r['new_missing_indexes']}", file=sys.stderr)
+    sys.exit(1 if report["summary"]["fail"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Screen transition soak test for RentalView.
+
+Drives the real Tk kiosk through the full booking flow (role selection ->
+customer -> reservation -> classes -> overview -> invoice -> payment ->
+booking) many times on a scratch database, timing every screen switch
+until Tk has laid it out, and sampling the window's widget count as the
+run goes on. A kiosk that leaks widgets shows a count that keeps climbing;
+a healthy one stays flat after the first booking.
+
+Needs a display (use xvfb-run on a headless machine):
+
+    xvfb-run python benchmarks/soak_screens.py --bookings 1000 --sample-every 100
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import make_bench_db, percentile
+from model import RentalModel
+from controller import RentalController
+from view import RentalView
+from workers import InlineWorker
+from search_index import SearchIndex
+
+
+def soak_controller(model):
+    """A RentalController on a real RentalView, with model calls inline and no payment channel."""
+    ctl = RentalController.__new__(RentalController)
+    ctl.model = model
+    ctl.view = RentalView()
+    ctl.worker = InlineWorker()
+    ctl.payments = None
+    ctl._load_init_data()
+    ctl.current_booking = {}
+    ctl.search_results = []
+    ctl.search_index = SearchIndex()
+    ctl.current_cat_id = 1
+    # Popups would block the run; collect their messages instead
+    ctl.view.messages = []
+    ctl.view.show_info = lambda title, message: ctl.view.messages.append(message)
+    ctl.view.show_error = lambda message: ctl.view.messages.append(message)
+    # Short delays (offline payment, next screen) run at once; hold renewals never come due
+    ctl.view.after = lambda ms, func=None, *args: func(*args) if func and ms <= 2000 else None
+    return ctl
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--sample-every", type=int, default=100, help="bookings between widget-count samples")
+    parser.add_argument("--cars", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    transitions = {}
+    samples = []
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RentalModel(db_path=make_bench_db(tmp, cars=args.cars, customers=1000, reservations=5000))
+        ctl = soak_controller(model)
+        view = ctl.view
+
+        def step(name, call):
+            t0 = time.perf_counter()
+            call()
+            view.update_idletasks()
+            transitions.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+
+        step("role_selection", ctl.show_role_selector)
+        samples.append((0, view.widget_count()))
+        for i in range(1, args.bookings + 1):
+            step("main", ctl.handle_user)
+            step("customer", ctl.goto_customer_details)
+            customer = {
+                "name": "Soak Kiosk", "phone": "6900000000", "email": f"soak{i}@example.com",
+                "address": "Soak St", "license": f"{rnd.randrange(10**9):09d}",
+                "dob": "01/01/1990", "issue_date": "01/01/2015",
+            }
+            for key, value in customer.items():
+                view.entries[key].delete(0, "end")
+                view.entries[key].insert(0, value)
+            step("reservation", ctl.save_customer_and_next)
+
+            start = date(2029, 1, 1) + timedelta(days=rnd.randint(0, 700))
+            view.calendar_selection.update(start=start, end=start + timedelta(days=rnd.randint(1, 10)))
+            step("subcategory", ctl.perform_search)
+            available = [card['sub_name'] for card in view.screens["subcategory"]['cards'] if card['available']]
+            if not available:
+                failed += 1
+                continue
+            step("overview", lambda: ctl.select_subcategory(rnd.choice(available)))
+            if 'car' not in ctl.current_booking:
+                failed += 1
+                continue
+            step("invoice", ctl.calculate_invoice)
+            step("payment", view.screens["invoice"]['commands']['checkout'])
+            view.payment_vars["card_num"].set("4242 4242 4242 4242")
+            view.payment_vars["cvv"].set("123")
+            step("book", view.screens["payment"]['commands']['pay'])
+
+            if i % args.sample_every == 0:
+                view.update()
+                samples.append((i, view.widget_count()))
+                print(f"[{i}/{args.bookings}] widgets {samples[-1][1]}", file=sys.stderr)
+
+        view.destroy()
+        model.close()
+
+    print(f"{args.bookings} bookings, {failed} without a car\n")
+    print(f"{'TRANSITION':<16} {'RUNS':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, values in transitions.items():
+        print(f"{name:<16} {len(values):>6} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} {max(values):>8.2f}")
+    print(f"\n{'BOOKINGS':>8} {'WIDGETS':>8}")
+    for n, count in samples:
+        print(f"{n:>8} {count:>8}")
+    growth = samples[-1][1] - samples[1][1] if len(samples) > 2 else 0
+    print(f"\nwidget growth after the first sample: {growth:+d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Double-booking stress test.
+
+Starts several processes, each with its own RentalModel (like separate
+kiosks), and has them all book the same car for overlapping date windows at
+once. Afterwards the database must hold no two confirmed reservations for
+that car with overlapping dates. Every attempt must either win or get
+RentalModel.CAR_TAKEN; anything else counts as an error.
+
+    python benchmarks/stress_double_booking.py --workers 8 --attempts 200
+"""
+import argparse
+import multiprocessing as mp
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import make_bench_db
+
+CAR_ID = 1
+
+
+def kiosk(db_path, worker, attempts, wal, barrier, results):
+    from model import RentalModel
+    model = RentalModel(db_path=db_path, wal=wal)
+    rnd = random.Random(worker)
+    won = taken = errors = 0
+
+    barrier.wait()
+    for i in range(attempts):
+        # A narrow range of dates so nearly every attempt collides with another kiosk
+        start = date(2031, 1, 1) + timedelta(days=rnd.randint(0, 60))
+        end = start + timedelta(days=rnd.randint(1, 5))
+        ok, result = model.book(
+            {'license': f"{worker:03d}{i:06d}", 'name': f"Kiosk {worker}", 'dob': "1990-01-01",
+             'address': "Stress St", 'phone': "6900000000", 'email': f"kiosk{worker}-{i}@example.com"},
+            {'p_date': start.isoformat(), 'd_date': end.isoformat(), 'car_id': CAR_ID,
+             'p_loc': 1, 'd_loc': 1, 'ins_id': 1, 'cat_id': 1},
+            {'amount': 100, 'deposit': 50, 'car_price': 50}
+        )
+        if ok:
+            won += 1
+        elif result == RentalModel.CAR_TAKEN:
+            taken += 1
+        else:
+            errors += 1
+    model.close()
+    results.put((worker, won, taken, errors))
+
+
+def count_overlaps(db_path):
+    conn = sqlite3.connect(db_path)
+    overlaps = conn.execute("""
+        SELECT COUNT(*) FROM Reservation a
+        JOIN Reservation b ON a.car_id = b.car_id AND a.reservation_id < b.reservation_id
+        WHERE a.car_id = ? AND a.status = 'Confirmed' AND b.status = 'Confirmed'
+        AND a.pick_up_date <= b.drop_off_date AND a.drop_off_date >= b.pick_up_date
+    """, (CAR_ID,)).fetchone()[0]
+    orphans = conn.execute("""
+        SELECT COUNT(*) FROM Reservation r
+        WHERE r.car_id = ? AND r.pick_up_date >= '2031-01-01'
+        AND NOT EXISTS (SELECT 1 FROM Payment p WHERE p.reservation_id = r.reservation_id)
+    """, (CAR_ID,)).fetchone()[0]
+    conn.close()
+    return overlaps, orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=200, help="bookings tried per worker")
+    parser.add_argument("--wal", action="store_true", help="run with WAL journaling")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_bench_db(tmp, cars=50, customers=100, reservations=1000)
+        barrier = mp.Barrier(args.workers)
+        results = mp.Queue()
+        procs = [mp.Process(target=kiosk, args=(db_path, w, args.attempts, args.wal, barrier, results))
+                 for w in range(args.workers)]
+        started = time.perf_counter()
+        for p in procs:
+            p.start()
+        rows = sorted(results.get() for _ in procs)
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+
+        print(f"\n{'WORKER':<8} {'WON':>6} {'TAKEN':>7} {'ERRORS':>7}")
+        print("-" * 31)
+        for worker, won, taken, errors in rows:
+            print(f"{worker:<8} {won:>6} {taken:>7} {errors:>7}")
+        overlaps, orphans = count_overlaps(db_path)
+
+    total_errors = sum(r[3] for r in rows)
+    print(f"\n{args.workers * args.attempts} attempts in {elapsed:.1f}s, "
+          f"{sum(r[1] for r in rows)} booked, {sum(r[2] for r in rows)} refused as taken")
+    print(f"Overlapping confirmed reservations: {overlaps}")
+    print(f"Reservations without a payment:     {orphans}")
+    sys.exit(1 if overlaps or orphans or total_errors else 0)
+
+
+if __name__ == "__main__":
+    main()
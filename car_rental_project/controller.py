@@ -13,6 +13,11 @@ from difflib import get_close_matches
 # LOCAL MODULES
 # -----------------------------------------------------------------------------
 from model import RentalModel
+from payments import PaymentClient, PaymentTimeout, CircuitBreaker, CircuitOpen
+from bank import MockBank
+from workers import ModelWorker
+from search_index import FILTERS, NarrowingCache, SearchIndex, sql_filters
+import reference
 try:
     from view import RentalView, PseudoConsole
 except ImportError:
@@ -21,127 +26,167 @@ except ImportError:
 import admin
 
 # -----------------------------------------------------------------------------
-# MQTT CONFIGURATION
+# PAYMENT CHANNEL CONFIGURATION
 # -----------------------------------------------------------------------------
-try:
-    import paho.mqtt.client as mqtt
-    MQTT_AVAILABLE = True
-except ImportError:
-    MQTT_AVAILABLE = False
+from transports import MQTT_AVAILABLE, ConnectionSupervisor, create_transport, start_local_broker
 
+# "paho" talks to the MQTT broker below, "local" to a LocalBroker on this
+# machine, "inprocess" keeps the bank inside the app (no network at all)
+PAYMENT_TRANSPORT = os.environ.get("RENTAL_PAYMENT_TRANSPORT", "paho" if MQTT_AVAILABLE else "inprocess")
 BROKER = "test.mosquitto.org"
+LOCAL_BROKER_PORT = 18830
 TOPIC_REQUEST = "car_rental/payment/request"
 TOPIC_RESPONSE = "car_rental/payment/response"
 
+# Mock bank: approvals take about two seconds each, processed concurrently
+BANK_WORKERS = 16
+BANK_LATENCY = "fixed:2"
+
+
+def make_payment_transport():
+    if PAYMENT_TRANSPORT == "local":
+        return create_transport("local", port=LOCAL_BROKER_PORT)
+    return create_transport(PAYMENT_TRANSPORT, host=BROKER)
+
 
 # -----------------------------------------------------------------------------
 # BACKGROUND BANK AGENT (MOCKED)
 # -----------------------------------------------------------------------------
-def run_bank_listener():
-    if not MQTT_AVAILABLE: return
-    try:
-        def on_connect(client, userdata, flags, rc, properties=None): 
-            client.subscribe(TOPIC_REQUEST)
-            
-        def on_message(client, userdata, msg):
-            try:
-                payload = json.loads(msg.payload.decode())
-                amount = payload.get('amount')
-                
-                time.sleep(2) 
-                response = {
-                    "status": "APPROVED", 
-                    "transaction_id": f"VISA-{int(time.time())}", 
-                    "amount": amount
-                }
-                client.publish(TOPIC_RESPONSE, json.dumps(response))
-            except: 
-                pass 
-
-        bank_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-        bank_client.on_connect = on_connect
-        bank_client.on_message = on_message
-        bank_client.connect(BROKER, 1883, 60)
-        bank_client.loop_forever()
-    except: 
-        pass
+def run_bank_listener(transport):
+    """Starts the mock bank on transport; connects (and reconnects) in the background."""
+    # Approvals run on the bank's worker pool; the delivery thread only queues them
+    bank = MockBank(
+        publish=lambda response: transport.publish(TOPIC_RESPONSE, response), 
+        workers=BANK_WORKERS, latency=BANK_LATENCY
+    )
+    transport.subscribe(TOPIC_REQUEST, bank.submit)
+    return ConnectionSupervisor(transport).start()
 
 
 # -----------------------------------------------------------------------------
 # MAIN CONTROLLER
 # -----------------------------------------------------------------------------
 class RentalController:
+    # How long a checkout waits for the bank before approving locally
+    PAYMENT_TIMEOUT_S = 10
+    # Timeouts in a row before payments skip the bank, and how long until it is retried
+    BREAKER_FAILURES = 3
+    BREAKER_RESET_S = 30
+    # Checkout holds are renewed this often (well inside the model's hold TTL)
+    HOLD_RENEW_MS = 30000
+    # Expired holds (abandoned checkouts) are deleted this often, booked or not
+    HOLD_SWEEP_MS = 60000
+
     def __init__(self):
-        global MQTT_AVAILABLE 
-        
         self.model = RentalModel()
         self.view = RentalView()
+        # Model calls run here, never on the Tk thread
+        self.worker = ModelWorker(self.view.after, on_error=self._on_worker_error)
         
-        # Background bank thread
-        self.bank_thread = threading.Thread(target=run_bank_listener, daemon=True)
-        self.bank_thread.start()
-        
-        self.payment_status = None 
-        self.payment_timeout_counter = 0
-
-        if MQTT_AVAILABLE:
-            self.app_mqtt = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            self.app_mqtt.on_message = self.on_bank_response
-            try:
-                self.app_mqtt.connect(BROKER, 1883, 60)
-                self.app_mqtt.subscribe(TOPIC_RESPONSE)
-                self.app_mqtt.loop_start()
-            except: 
-                print("Warning: MQTT Connection Failed. Running in offline mode.")
-                MQTT_AVAILABLE = False 
-
-        self._load_init_data()
+        self.local_broker = None
+        if PAYMENT_TRANSPORT == "local":
+            self.local_broker = start_local_broker(port=LOCAL_BROKER_PORT)
+
+        # Payment channel: nothing here waits for the broker, both sides
+        # connect in the background and the breaker stays open until they do
+        self.payments = None
+        self.supervisors = []
+        try:
+            self.supervisors.append(run_bank_listener(make_payment_transport()))
+            self.transport = make_payment_transport()
+            self.breaker = CircuitBreaker(failure_threshold=self.BREAKER_FAILURES, reset_timeout=self.BREAKER_RESET_S)
+            self.breaker.trip()
+            self.payments = PaymentClient(
+                publish=lambda payload: self.transport.publish(TOPIC_REQUEST, payload), 
+                timeout=self.PAYMENT_TIMEOUT_S, breaker=self.breaker
+            )
+            self.transport.subscribe(TOPIC_RESPONSE, self.on_bank_response)
+            self.supervisors.append(ConnectionSupervisor(self.transport, on_change=self.on_channel_change).start())
+        except Exception: 
+            print(f"Warning: Payment channel ({PAYMENT_TRANSPORT}) unavailable. Running in offline mode.")
+            self.payments = None
+
         self.current_booking = {}
         self.search_results = []
+        self.search_index = SearchIndex()
+        self.candidates = None
         self.current_cat_id = 1
         
-        self.HIERARCHY = {
-            1: ["City Car", "Compact Hatch"], 
-            2: ["Crossover", "Full SUV"], 
-            3: ["Luxury Compact", "Executive"], 
-            4: ["MPV", "Passenger Van"]
-        }
-        self.SUBCAT_MAPPING = {
-            "City Car": ["Yaris", "Panda", "Micra", "i10", "Aygo", "Picanto", "500"], 
-            "Compact Hatch": ["Clio", "Polo", "Corsa", "i20", "Fiesta", "Astra", "Tipo", "Series 1", "A3", "A-Class"], 
-            "Crossover": ["C-HR", "Vitara", "T-Roc", "Duster", "Captur", "Qashqai", "Tucson", "3008"], 
-            "Full SUV": ["X5", "Q8", "Tiguan", "S90"], 
-            "Luxury Compact": ["A-Class", "Series 1", "A3"], 
-            "Executive": ["Octavia", "S90", "Model 3", "C-Class", "Corolla"], 
-            "MPV": ["C4 Grand", "Zafira"], 
-            "Passenger Van": ["Vito", "Transporter", "Transit"]
-        }
-        self.INSURANCE_PLANS = [
-            {"id": 0, "name": "Basic", "price": 0, "desc": "Standard Liability"}, 
-            {"id": 1, "name": "Full", "price": 15, "desc": "Zero Excess"}
-        ]
-        
+        # The worker hands results back through view.after(), which Tk only
+        # accepts from another thread once the main loop is running
+        self.view.after(0, self._load_init_data)
+        self.view.after(self.HOLD_SWEEP_MS, self._sweep_holds)
         self.show_role_selector()
         self.view.mainloop()
+        self.worker.shutdown()
+        for supervisor in self.supervisors:
+            supervisor.stop()
+            supervisor.transport.close()
+        if self.payments:
+            self.payments.close()
+        if self.local_broker:
+            self.local_broker.stop()
+        self.model.close()
+
+    def on_channel_change(self, connected):
+        # Runs on the supervisor thread; a lost connection opens the breaker right away
+        if connected:
+            self.breaker.reset()
+        else:
+            self.breaker.trip()
+
+    def on_bank_response(self, payload):
+        # Runs on the transport's delivery thread; the matching checkout is notified via its Future
+        self.payments.handle_response(payload)
 
-    def on_bank_response(self, client, userdata, msg):
-        try: 
-            self.payment_status = json.loads(msg.payload.decode())
-        except: 
-            pass
+    def _on_worker_error(self, error):
+        self.view.hide_loading()
+        self.view.show_error(f"Database Error: {error}")
 
     def _load_init_data(self):
-        try:
-            s1, locs = self.model.get_locations()
-            s2, cats = self.model.get_categories()
-            
-            self.loc_map = {r['address']: r['id'] for r in locs} if s1 and locs else {}
-            self.locations = list(self.loc_map.keys())
-            
-            self.cat_map = {r['category_name']: r['id'] for r in cats} if s2 and cats else {}
-            self.categories = list(self.cat_map.keys())
-        except: 
-            pass
+        self.loc_map, self.locations = {}, []
+        self.cat_map, self.categories = {}, []
+        self.taxonomy = {}
+        self.insurance_plans, self.plan_by_id = [], {}
+        self.ref_version = None
+        # Shared with the admin console; one load per process
+        self.reference = reference.shared(self.model)
+        self.worker.submit(self.reference.current, on_done=self._apply_init_data, on_error=self._on_reference_error)
+
+    def _refresh_reference(self):
+        # Cheap version check; the maps are only rebuilt when an admin changed something
+        self.worker.submit(self.reference.refresh_if_changed, on_done=self._apply_init_data, on_error=self._on_reference_error)
+
+    def _on_reference_error(self, error):
+        if self.ref_version is None:
+            # Nothing loaded yet: the kiosk has no locations, categories or plans to offer
+            self.view.show_error(f"Could not load locations, categories and insurance plans:\n{error}")
+        else:
+            print(f"Warning: Reference data refresh failed, keeping version {self.ref_version}: {error}")
+
+    def _apply_init_data(self, outcome):
+        success, snap = outcome
+        if not success:
+            self._on_reference_error(snap)
+            return
+        if snap.version == self.ref_version:
+            return
+        self.ref_version = snap.version
+
+        self.loc_map = {l.address: l.id for l in snap.locations}
+        self.locations = list(self.loc_map.keys())
+
+        self.cat_map = {c.name: c.id for c in snap.categories}
+        self.categories = list(self.cat_map.keys())
+
+        # category_id -> {class name: subcategory_id}, in display order
+        self.taxonomy = {cat: {name: sub.id for name, sub in subs.items()}
+                         for cat, subs in snap.classes_by_category.items()}
+
+        self.insurance_plans = [
+            {"id": p.id, "name": p.name, "price": p.price, "desc": p.desc} for p in snap.offered_plans
+        ]
+        self.plan_by_id = snap.plan_by_id
 
     def show_role_selector(self):
         self.view.show_role_selection(
@@ -168,6 +213,7 @@ class RentalController:
                 except Exception as e: 
                     print(f"CRITICAL ERROR INSIDE THREAD: {e}")
                 finally: 
+                    self.model.pool.release()
                     self.view.after(0, self.view.destroy)
 
             t = threading.Thread(target=run_admin_thread, daemon=True)
@@ -177,9 +223,11 @@ class RentalController:
             self.view.deiconify() 
 
     def show_home(self): 
+        self.release_hold()
         self.view.show_main_screen(rent_command=self.goto_customer_details)
 
     def goto_customer_details(self): 
+        self._refresh_reference()
         self.view.show_customer_screen(submit_command=self.save_customer_and_next)
     
     # -------------------------------------------------------------------------
@@ -259,6 +307,7 @@ class RentalController:
     # -------------------------------------------------------------------------
 
     def back_to_reservation(self):
+        self.release_hold()
         slots = [f"{h:02d}:{m:02d}" for h in range(7, 23) for m in (0, 30)]
         self.view.show_reservation_screen(
             search_command=self.perform_search, 
@@ -274,6 +323,12 @@ class RentalController:
         if not cal['start'] or not cal['end']: 
             self.view.show_error("Please select a date range!")
             return
+
+        if self.ref_version is None:
+            # The reference snapshot is applied from the worker; until then there is nothing to search
+            self.view.show_error("Locations and categories are still loading. Please try again in a moment.")
+            self._refresh_reference()
+            return
             
         self.current_booking['dates'] = {
             'start': cal['start'], 'end': cal['end'], 
@@ -284,37 +339,36 @@ class RentalController:
         loc_id = self.loc_map.get(c['pickup_loc'].get(), 1)
         self.current_booking['loc_id'] = loc_id
         
-        success, cars = self.model.get_available_cars_for_booking(cat_id, loc_id)
-        if not success: cars = []
-        
         s_str = cal['start'].strftime("%Y-%m-%d")
         e_str = cal['end'].strftime("%Y-%m-%d")
         
-        s2, busy = self.model.get_conflicting_reservations(s_str, e_str)
-        busy_ids = {r['car_id'] for r in busy} if s2 and busy else set()
-        
-        self.search_results = [c for c in cars if c['car_id'] not in busy_ids]
+        self.view.show_loading("Searching available cars...")
+        self.worker.submit(
+            lambda: self.model.search_cheapest_by_subcategory(cat_id, loc_id, s_str, e_str, variants=True),
+            on_done=lambda outcome: self._show_search_results(outcome, cat_id)
+        )
+
+    def _show_search_results(self, outcome, cat_id):
+        self.view.hide_loading()
+        success, cars = outcome
+        self.search_results = cars if success and cars else []
         self.current_cat_id = cat_id
+        # Bucketed by subcategory once; filter toggles only read the index
+        self.search_index = SearchIndex(self.search_results, self.taxonomy.get(cat_id, {}))
+        # Candidate cars behind the cards, fetched per class on the first click
+        dates, loc_id = self.current_booking['dates'], self.current_booking['loc_id']
+        s_str, e_str = dates['start'].strftime("%Y-%m-%d"), dates['end'].strftime("%Y-%m-%d")
+        self.candidates = NarrowingCache(
+            lambda spec: self.model.search_available_cars(cat_id, loc_id, s_str, e_str, filters=spec)
+        )
         self.refresh_subcategory_view()
 
     def refresh_subcategory_view(self):
-        vars = self.view.filter_vars
-        filtered = self.search_results[:]
-        
-        if vars.get("automatic_only") and vars["automatic_only"].get(): 
-            filtered = [c for c in filtered if c['gearbox'] == 'Automatic']
-        if vars.get("diesel_only") and vars["diesel_only"].get(): 
-            filtered = [c for c in filtered if c['fuel'] == 'Diesel']
-        if vars.get("hybrid_only") and vars["hybrid_only"].get(): 
-            filtered = [c for c in filtered if c['fuel'] in ['Hybrid', 'Electric']]
-        
-        hierarchy = self.HIERARCHY.get(self.current_cat_id, [])
+        active = self._active_filters()
         display_data = {}
         
-        for sub in hierarchy:
-            models = self.SUBCAT_MAPPING.get(sub, [])
-            matches = [c for c in filtered if c['model'] in models or c['brand'] in models]
-            best = min(matches, key=lambda x: x['price_per_day']) if matches else None
+        for sub in self.taxonomy.get(self.current_cat_id, {}):
+            best = self.search_index.cheapest(sub, active)
             
             if best: 
                 display_data[sub] = {
@@ -336,18 +390,92 @@ class RentalController:
             on_home_click=self.back_to_reservation
         )
 
+    def _active_filters(self):
+        vars = self.view.filter_vars
+        return [name for name in FILTERS if vars.get(name) and vars[name].get()]
+
     def select_subcategory(self, subcat_name):
-        filtered = self.search_results
-        models = self.SUBCAT_MAPPING.get(subcat_name, [])
-        matches = [c for c in filtered if c['model'] in models or c['brand'] in models]
+        sub_id = self.taxonomy.get(self.current_cat_id, {}).get(subcat_name)
+        # Same filters as the card that was clicked, so the held car is the one it advertised
+        spec = dict(sql_filters(self._active_filters()), subcategory_id=sub_id)
+        candidates = self.candidates
         
-        if not matches: return
+        dates = self.current_booking['dates']
+        s_str = dates['start'].strftime("%Y-%m-%d")
+        e_str = dates['end'].strftime("%Y-%m-%d")
+        
+        def hold_cheapest():
+            # This class's cars, cheapest first (a repeat click reuses the rows);
+            # hold the first one nobody else has booked or is checking out
+            s, matches = candidates.get(spec)
+            for car in (matches if s and sub_id is not None else []):
+                # Reused rows can predate bookings made since; the in-memory
+                # index skips those without taking the database write lock
+                if not self.model.is_car_free(car['car_id'], s_str, e_str):
+                    continue
+                s, hold_id = self.model.place_hold(car['car_id'], s_str, e_str)
+                if s:
+                    return car, hold_id
+            return None, None
+        
+        self.view.show_loading("Reserving your car...")
+        self.worker.submit(hold_cheapest, on_done=lambda held: self._on_car_held(held, subcat_name))
+
+    def _on_car_held(self, held, subcat_name):
+        self.view.hide_loading()
+        target_car, hold_id = held
+        if not target_car: 
+            self.view.show_error("Every car in this group was just taken. Please pick another.")
+            return
         
-        target_car = min(matches, key=lambda x: x['price_per_day'])
+        self.current_booking['hold_id'] = hold_id
+        self._schedule_hold_renewal()
         self.current_booking['car'] = target_car
         self.current_booking['subcat_name'] = subcat_name
         self.show_summary_screen()
 
+    # -------------------------------------------------------------------------
+    # CHECKOUT HOLD
+    # -------------------------------------------------------------------------
+    def _schedule_hold_renewal(self):
+        self._hold_timer = self.view.after(self.HOLD_RENEW_MS, self._renew_hold)
+
+    def _renew_hold(self):
+        self._hold_timer = None
+        hold_id = self.current_booking.get('hold_id')
+        if hold_id is None:
+            return
+        self.worker.submit(
+            lambda: self.model.renew_hold(hold_id),
+            on_done=lambda outcome: self._on_hold_renewed(outcome, hold_id)
+        )
+
+    def _on_hold_renewed(self, outcome, hold_id):
+        if self.current_booking.get('hold_id') != hold_id:
+            return  # released or booked while the renewal ran
+        if outcome[0]:
+            self._schedule_hold_renewal()
+        else:
+            # Lapsed; finalize_booking still re-checks the car when it books
+            self.current_booking.pop('hold_id', None)
+
+    def release_hold(self):
+        """Drops the current checkout's hold (customer left the booking flow)."""
+        if getattr(self, '_hold_timer', None):
+            self.view.after_cancel(self._hold_timer)
+            self._hold_timer = None
+        hold_id = self.current_booking.pop('hold_id', None)
+        if hold_id is not None:
+            self.worker.submit(lambda: self.model.release_hold(hold_id))
+
+    def _sweep_holds(self):
+        # Runs for the kiosk's whole life; place_hold only cleans up when someone books
+        self.worker.submit(
+            self.model.sweep_holds,
+            on_error=lambda e: print(f"Warning: Hold sweep failed: {e}")
+        )
+        self.view.after(self.HOLD_SWEEP_MS, self._sweep_holds)
+
     def show_summary_screen(self):
         car = self.current_booking['car']
         summary = {
@@ -360,7 +488,7 @@ class RentalController:
         }
         self.view.show_booking_overview(
             summary=summary, 
-            insurance_options=self.INSURANCE_PLANS, 
+            insurance_options=self.insurance_plans, 
             late_policy="A €50 Security Deposit is charged upfront...", 
             on_back_click=self.back_to_reservation, 
             on_next_click=self.calculate_invoice, 
@@ -378,7 +506,15 @@ class RentalController:
         rental_total = days * daily_rate
         
         ins_id = self.view.insurance_var.get()
-        ins_plan = next((p for p in self.INSURANCE_PLANS if p['id'] == ins_id), self.INSURANCE_PLANS[0])
+        if ins_id in self.plan_by_id:
+            plan = self.plan_by_id[ins_id]
+            ins_plan = {'name': plan.name, 'price': plan.price}
+        elif self.insurance_plans:
+            ins_plan = self.insurance_plans[0]
+        else:
+            self.view.show_error("Insurance plans could not be loaded. Please try again in a moment.")
+            self._refresh_reference()
+            return
         
         grand_total = rental_total + (days * ins_plan['price']) + 50.0
         
@@ -422,38 +558,37 @@ class RentalController:
         self.view.title("Processing Payment... Please Wait")
         self.view.update() 
 
-        self.payment_status = None
-        self.payment_timeout_counter = 0
-
-        # MQTT Logic
-        if MQTT_AVAILABLE:
-            req = {"amount": inv_data['grand_total'], "card": card_num[-4:]}
-            try: 
-                self.app_mqtt.publish(TOPIC_REQUEST, json.dumps(req))
-            except: 
-                self.fake_payment_success(inv_data)
-                return
-            self.view.after(500, lambda: self.check_payment_status(inv_data))
+        # Payment channel
+        if self.payments:
+            future = self.payments.request(inv_data['grand_total'], card_num[-4:])
+            # Hop back onto the Tk thread when the bank answers (or the request times out)
+            future.add_done_callback(
+                lambda f: self.view.after(0, lambda: self.on_payment_result(f, inv_data))
+            )
         else:
             self.view.after(2000, lambda: self.fake_payment_success(inv_data))
 
-    def check_payment_status(self, inv_data):
-        if self.payment_status:
-            self.reset_ui()
-            if self.payment_status.get('status') == 'APPROVED':
-                self.finalize_booking(inv_data)
-            else: 
-                messagebox.showerror("Failed", "Payment Declined by Bank.")
+    def on_payment_result(self, future, inv_data):
+        self.reset_ui()
+        try:
+            response = future.result()
+        except CircuitOpen:
+            messagebox.showinfo("Offline Approval", "Bank unreachable. Approving locally.")
+            self.finalize_booking(inv_data)
             return
-
-        self.payment_timeout_counter += 1
-        if self.payment_timeout_counter > 20: 
-            self.reset_ui()
+        except PaymentTimeout:
             messagebox.showinfo("Offline Approval", "Bank server slow. Approving locally.")
             self.finalize_booking(inv_data)
             return
+        except Exception:
+            # Publishing failed: same offline path as before
+            self.finalize_booking(inv_data)
+            return
 
-        self.view.after(500, lambda: self.check_payment_status(inv_data))
+        if response.get('status') == 'APPROVED':
+            self.finalize_booking(inv_data)
+        else: 
+            messagebox.showerror("Failed", "Payment Declined by Bank.")
 
     def reset_ui(self):
         self.view.config(cursor="")
@@ -468,33 +603,60 @@ class RentalController:
             d = self.current_booking
             cust_data = d['customer']
             
-            s, existing = self.model.get_customer_by_email(cust_data['email'])
-            cust_id = existing['customer_id'] if s and existing else self.model.add_customer(cust_data)[1]
-            
             res_data = {
                 'p_date': d['dates']['start'].strftime("%Y-%m-%d"), 
                 'd_date': d['dates']['end'].strftime("%Y-%m-%d"), 
                 'car_id': d['car']['car_id'], 
                 'p_loc': d['loc_id'], 
                 'd_loc': d['loc_id'], 
-                'cust_id': cust_id, 
                 'ins_id': self.view.insurance_var.get(), 
-                'cat_id': self.cat_map.get(d.get('subcat_name'), 1)
+                'cat_id': self.current_cat_id
             }
-            
-            s, res_id = self.model.add_reservation(res_data)
-            if s: 
-                self.model.add_payment(res_id, inv_data['grand_total'], cust_id)
-            
-            # Blocking Popup
-            self.view.show_info("Success!", f"Booking Confirmed!\nReservation ID: #{res_id}")
-            
+            pay_data = {
+                'amount': inv_data['grand_total'], 
+                'deposit': inv_data['deposit'], 
+                'car_price': inv_data['rental_total']
+            }
+            hold_id = d.get('hold_id')
         except Exception as e:
             self.view.show_error(f"Booking Error: {str(e)}")
-            
-        finally:
-            self.current_booking = {} 
-            self.view.after(100, self.show_role_selector)
+            self._end_booking(self.show_role_selector, {})
+            return
+        
+        # Customer, reservation and payment are stored together or not at all
+        self.view.show_loading("Confirming your booking...")
+        self.worker.submit(
+            lambda: self.model.book(cust_data, res_data, pay_data, hold_id),
+            on_done=lambda outcome: self._on_booked(outcome, cust_data),
+            on_error=self._on_book_error
+        )
+
+    def _on_booked(self, outcome, cust_data):
+        self.view.hide_loading()
+        next_screen = self.show_role_selector
+        kept = {}
+        s, result = outcome
+        if not s and result == self.model.CAR_TAKEN:
+            # Lost the race to another kiosk: keep the customer's details and search again
+            self.view.show_error(f"{result}\nPlease search again.")
+            next_screen = self.back_to_reservation
+            kept = {'customer': cust_data}
+        elif not s:
+            self.view.show_error(f"Booking Error: {result}")
+        else:
+            # Blocking Popup
+            self.view.show_info("Success!", f"Booking Confirmed!\nReservation ID: #{result['reservation_id']}")
+        self._end_booking(next_screen, kept)
+
+    def _on_book_error(self, error):
+        self.view.hide_loading()
+        self.view.show_error(f"Booking Error: {str(error)}")
+        self._end_booking(self.show_role_selector, {})
+
+    def _end_booking(self, next_screen, kept):
+        self.release_hold()
+        self.current_booking = kept 
+        self.view.after(100, next_screen)
 
 if __name__ == "__main__":
     app = RentalController()
\ No newline at end of file
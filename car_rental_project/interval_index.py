@@ -0,0 +1,119 @@
+import threading
+from bisect import bisect_right, insort
+
+
+class _CarIntervals:
+    """
+    Reservations of one car, sorted by pick-up date.
+    max_end[i] holds the latest drop-off among the first i+1 entries, so an
+    overlap test only needs one binary search even if intervals overlap.
+    """
+    __slots__ = ("entries", "starts", "max_end")
+
+    def __init__(self):
+        self.entries = []  # (start, end, res_id)
+        self.starts = []
+        self.max_end = []
+
+    def _refresh_from(self, pos):
+        running = self.max_end[pos - 1] if pos > 0 else ""
+        del self.max_end[pos:]
+        for _, end, _ in self.entries[pos:]:
+            running = end if end > running else running
+            self.max_end.append(running)
+
+    def add(self, start, end, res_id):
+        entry = (start, end, res_id)
+        pos = bisect_right(self.entries, entry)
+        self.entries.insert(pos, entry)
+        self.starts.insert(pos, start)
+        self._refresh_from(pos)
+
+    def remove(self, start, end, res_id):
+        pos = bisect_right(self.entries, (start, end, res_id)) - 1
+        if pos < 0 or self.entries[pos] != (start, end, res_id):
+            return False
+        del self.entries[pos]
+        del self.starts[pos]
+        self._refresh_from(pos)
+        return True
+
+    def overlaps(self, start, end):
+        # Entries [0, i) start on or before `end`; one of them overlaps
+        # if any ends on or after `start` (same inclusive rule as the SQL)
+        i = bisect_right(self.starts, end)
+        return i > 0 and self.max_end[i - 1] >= start
+
+
+class ReservationIntervalIndex:
+    """
+    In-process index of confirmed reservations answering "is car X free in
+    [start, end]" without a database round trip.
+    Dates are ISO strings ('YYYY-MM-DD'), compared the same way SQLite does.
+    Only reservations ending on or after `horizon` are tracked; older ones can
+    never conflict with a new booking.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cars = {}
+        self._by_res = {}  # res_id -> (car_id, start, end)
+        self.horizon = ""
+
+    def load(self, rows, horizon=""):
+        """Replaces the index content with (res_id, car_id, start, end) rows."""
+        cars, by_res = {}, {}
+        for res_id, car_id, start, end in rows:
+            if end < horizon:
+                continue
+            by_res[res_id] = (car_id, start, end)
+            cars.setdefault(car_id, []).append((start, end, res_id))
+
+        built = {}
+        for car_id, entries in cars.items():
+            entries.sort()
+            intervals = _CarIntervals()
+            intervals.entries = entries
+            intervals.starts = [e[0] for e in entries]
+            intervals._refresh_from(0)
+            built[car_id] = intervals
+
+        with self._lock:
+            self._cars = built
+            self._by_res = by_res
+            self.horizon = horizon
+        return len(by_res)
+
+    def add(self, res_id, car_id, start, end):
+        if end < self.horizon:
+            return
+        with self._lock:
+            if res_id in self._by_res:
+                self.remove(res_id)
+            self._by_res[res_id] = (car_id, start, end)
+            self._cars.setdefault(car_id, _CarIntervals()).add(start, end, res_id)
+
+    def remove(self, res_id):
+        with self._lock:
+            entry = self._by_res.pop(res_id, None)
+            if entry is None:
+                return False
+            car_id, start, end = entry
+            intervals = self._cars.get(car_id)
+            if intervals:
+                intervals.remove(start, end, res_id)
+                if not intervals.entries:
+                    del self._cars[car_id]
+            return True
+
+    def is_free(self, car_id, start, end):
+        with self._lock:
+            intervals = self._cars.get(car_id)
+            return intervals is None or not intervals.overlaps(start, end)
+
+    def snapshot(self):
+        """Returns {res_id: (car_id, start, end)} for consistency checks."""
+        with self._lock:
+            return dict(self._by_res)
+
+    def __len__(self):
+        return len(self._by_res)
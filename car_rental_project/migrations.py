@@ -0,0 +1,232 @@
+"""
+Versioned schema migrations.
+
+Each migration is (version, description, steps); a step is either a SQL
+string or a callable taking the connection. Applied versions are recorded in
+the schema_version table, so every migration runs exactly once per database.
+"""
+import sqlite3
+from datetime import datetime
+
+
+# A car belongs to the first class of its own category that names its model or brand
+SUBCATEGORY_OF_CAR = """
+    SELECT s.subcategory_id FROM Subcategory s
+    JOIN SubcategoryModel m ON m.subcategory_id = s.subcategory_id
+    WHERE s.category_id = {car}.category_id AND m.name IN ({car}.model, {car}.brand)
+    ORDER BY s.sort_order, s.subcategory_id LIMIT 1
+"""
+ASSIGN_SUBCATEGORY_SQL = f"UPDATE Car SET subcategory_id = ({SUBCATEGORY_OF_CAR.format(car='Car')})"
+
+# Initial classes per category_id: (class name, model/brand names)
+TAXONOMY_SEED = {
+    1: [("City Car", ["Yaris", "Panda", "Micra", "i10", "Aygo", "Picanto", "500"]),
+        ("Compact Hatch", ["Clio", "Polo", "Corsa", "i20", "Fiesta", "Astra", "Tipo", "Series 1", "A3", "A-Class"])],
+    2: [("Crossover", ["C-HR", "Vitara", "T-Roc", "Duster", "Captur", "Qashqai", "Tucson", "3008"]),
+        ("Full SUV", ["X5", "Q8", "Tiguan", "S90"])],
+    3: [("Luxury Compact", ["A-Class", "Series 1", "A3"]),
+        ("Executive", ["Octavia", "S90", "Model 3", "C-Class", "Corolla"])],
+    4: [("MPV", ["C4 Grand", "Zafira"]),
+        ("Passenger Van", ["Vito", "Transporter", "Transit"])],
+}
+
+# Tables held by the reference data registry (reference.py)
+REFERENCE_TABLES = ("Location", "Category", "InsurancePlan", "Subcategory", "SubcategoryModel")
+
+
+MIGRATIONS = [
+    (1, "Baseline lookup indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_customer_name ON Customer (full_name)",
+        "CREATE INDEX IF NOT EXISTS idx_car_plate ON Car (license_plate)",
+        "CREATE INDEX IF NOT EXISTS idx_res_customer ON Reservation (customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_res_car ON Reservation (car_id)",
+        "CREATE INDEX IF NOT EXISTS idx_res_dates ON Reservation (pick_up_date, drop_off_date)",
+        "CREATE INDEX IF NOT EXISTS idx_pickup_res ON PickUp (reservation_id)",
+        "CREATE INDEX IF NOT EXISTS idx_dropoff_res ON DropOff (reservation_id)",
+    ]),
+    (2, "Performance index pack for the booking and admin hot paths", [
+        # Availability search: candidate cars, then per-car overlap probe
+        "CREATE INDEX IF NOT EXISTS idx_car_search ON Car (category_id, location_id, availability)",
+        "CREATE INDEX IF NOT EXISTS idx_res_car_window ON Reservation (car_id, pick_up_date, drop_off_date, status) "
+        "WHERE status = 'Confirmed'",
+        # Active/future reservations report
+        "CREATE INDEX IF NOT EXISTS idx_res_active_dropoff ON Reservation (drop_off_date) "
+        "WHERE status = 'Confirmed'",
+        # Returning-customer lookup at checkout
+        "CREATE INDEX IF NOT EXISTS idx_customer_email ON Customer (email)",
+        # Employee work history and delete checks
+        "CREATE INDEX IF NOT EXISTS idx_pickup_employee ON PickUp (employee_id)",
+        "CREATE INDEX IF NOT EXISTS idx_dropoff_employee ON DropOff (employee_id)",
+    ]),
+    (3, "Payment deposit and rental price columns", [
+        lambda conn: _add_column(conn, "Payment", "security_deposit", "REAL DEFAULT 0"),
+        lambda conn: _add_column(conn, "Payment", "car_price", "REAL DEFAULT 0"),
+    ]),
+    (4, "Temporary car holds during checkout", [
+        """CREATE TABLE IF NOT EXISTS Hold (
+            hold_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            car_id INTEGER NOT NULL,
+            pick_up_date TEXT NOT NULL,
+            drop_off_date TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            FOREIGN KEY (car_id) REFERENCES Car(car_id) ON DELETE CASCADE ON UPDATE CASCADE
+        )""",
+        # Per-car overlap probe from searches and bookings
+        "CREATE INDEX IF NOT EXISTS idx_hold_car ON Hold (car_id, pick_up_date, drop_off_date, expires_at)",
+        # Sweeper deletes expired rows by range
+        "CREATE INDEX IF NOT EXISTS idx_hold_expiry ON Hold (expires_at)",
+    ]),
+    (5, "Vehicle class taxonomy and Car.subcategory_id", [
+        """CREATE TABLE IF NOT EXISTS Subcategory (
+            subcategory_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            sort_order INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (category_id, name),
+            FOREIGN KEY (category_id) REFERENCES Category(category_id) ON DELETE CASCADE ON UPDATE CASCADE
+        )""",
+        # Model or brand names that put a car into the class
+        """CREATE TABLE IF NOT EXISTS SubcategoryModel (
+            subcategory_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (subcategory_id, name),
+            FOREIGN KEY (subcategory_id) REFERENCES Subcategory(subcategory_id) ON DELETE CASCADE ON UPDATE CASCADE
+        )""",
+        # Classifying a car walks its category's classes in display order
+        "CREATE INDEX IF NOT EXISTS idx_subcategory_order ON Subcategory (category_id, sort_order, subcategory_id)",
+        lambda conn: _seed_taxonomy(conn),
+        lambda conn: _add_column(conn, "Car", "subcategory_id", "INTEGER REFERENCES Subcategory(subcategory_id)"),
+        # Search candidates come out grouped by class and cheapest first within one
+        "DROP INDEX IF EXISTS idx_car_search",
+        "CREATE INDEX IF NOT EXISTS idx_car_search ON Car (category_id, location_id, availability, subcategory_id, price_per_day)",
+        ASSIGN_SUBCATEGORY_SQL,
+        # Cars added or edited later are classified by the database itself
+        f"""CREATE TRIGGER IF NOT EXISTS trg_car_subcategory_insert AFTER INSERT ON Car
+            WHEN NEW.subcategory_id IS NULL
+            BEGIN
+                UPDATE Car SET subcategory_id = ({SUBCATEGORY_OF_CAR.format(car="NEW")}) WHERE car_id = NEW.car_id;
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_car_subcategory_update AFTER UPDATE OF model, brand, category_id ON Car
+            BEGIN
+                UPDATE Car SET subcategory_id = ({SUBCATEGORY_OF_CAR.format(car="NEW")}) WHERE car_id = NEW.car_id;
+            END""",
+    ]),
+    (6, "Composite index for filtered availability searches", [
+        # Fuel (the more selective filter) then gearbox seek inside a location's
+        # category; seats, bags and price are checked on the index entry before
+        # the row is read
+        "CREATE INDEX IF NOT EXISTS idx_car_filters ON Car "
+        "(category_id, location_id, availability, fuel, gearbox, seats, bags, price_per_day)",
+    ]),
+    (7, "Insurance plan details and reference data version", [
+        lambda conn: _add_column(conn, "InsurancePlan", "name", "TEXT"),
+        lambda conn: _add_column(conn, "InsurancePlan", "description", "TEXT"),
+        lambda conn: _add_column(conn, "InsurancePlan", "is_offered", "INTEGER NOT NULL DEFAULT 0"),
+        # The kiosk's two plans: "no extra cover" was id 0 in reservations but had no row
+        "INSERT OR IGNORE INTO InsurancePlan (plan_id, insurance_price, name, description, is_offered) "
+        "VALUES (0, 0, 'Basic', 'Standard Liability', 1)",
+        "UPDATE InsurancePlan SET name = 'Full', description = 'Zero Excess', is_offered = 1 "
+        "WHERE plan_id = 1 AND name IS NULL",
+        "UPDATE InsurancePlan SET name = 'Plan ' || plan_id WHERE name IS NULL",
+        # Bumped by every change to the reference tables, so a process can
+        # tell with one read whether its cached copy is stale
+        """CREATE TABLE IF NOT EXISTS ReferenceVersion (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )""",
+        "INSERT OR IGNORE INTO ReferenceVersion (id, version) VALUES (1, 1)",
+        lambda conn: _create_version_triggers(conn, REFERENCE_TABLES),
+    ]),
+]
+
+
+def _add_column(conn, table, column, decl):
+    """ALTER TABLE ADD COLUMN, skipped when an older script already added it."""
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _create_version_triggers(conn, tables):
+    for table in tables:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_refver_{table.lower()}_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    UPDATE ReferenceVersion SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+
+def _seed_taxonomy(conn):
+    """Inserts TAXONOMY_SEED for the categories that exist, unless classes were already set up."""
+    if conn.execute("SELECT 1 FROM Subcategory LIMIT 1").fetchone():
+        return
+    categories = {r[0] for r in conn.execute("SELECT category_id FROM Category")}
+    for cat_id, classes in TAXONOMY_SEED.items():
+        if cat_id not in categories:
+            continue
+        for order, (name, models) in enumerate(classes):
+            sub_id = conn.execute(
+                "INSERT INTO Subcategory (category_id, name, sort_order) VALUES (?, ?, ?)", (cat_id, name, order)
+            ).lastrowid
+            conn.executemany("INSERT INTO SubcategoryModel (subcategory_id, name) VALUES (?, ?)",
+                             ((sub_id, m) for m in models))
+
+
+def current_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """
+    Brings the database up to the latest version.
+    Each migration runs in its own BEGIN IMMEDIATE transaction, so two
+    processes starting at once cannot apply the same step twice.
+    Returns the list of versions applied.
+    """
+    applied = []
+    current_version(conn)
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, description, steps in migrations:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock in case another process got here first
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        print("Usage: python migrations.py <database.db>")
+        sys.exit(1)
+    db = sqlite3.connect(sys.argv[1])
+    done = apply_migrations(db)
+    print(f"Schema version {current_version(db)} (applied: {done or 'none'})")
+    db.close()
@@ -3,8 +3,14 @@ import os
 import glob
 import logging
 import sys
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime
 
+from interval_index import ReservationIntervalIndex
+from migrations import ASSIGN_SUBCATEGORY_SQL, apply_migrations
+
 # Configure logging to catch silent system errors without cluttering the console
 logging.basicConfig(
     filename='system_errors.log', 
@@ -12,11 +18,171 @@ logging.basicConfig(
     format='%(asctime)s %(message)s'
 )
 
+_ROW_CLASSES = {}
+_ROW_CLASSES_LOCK = threading.Lock()
+
+def compact_row_class(columns):
+    """
+    Returns a tuple-based record class for one result shape (column names).
+    Instances use no per-row dict but still support row['col'], row.get()
+    and keys(), so they can replace the dicts execute_query returns.
+    Classes are generated once per shape and cached.
+    """
+    columns = tuple(columns)
+    cls = _ROW_CLASSES.get(columns)
+    if cls is not None:
+        return cls
+
+    with _ROW_CLASSES_LOCK:
+        cls = _ROW_CLASSES.get(columns)
+        if cls is None:
+            index = {name: i for i, name in enumerate(columns)}
+            base = namedtuple("Row", columns, rename=True)
+
+            def __getitem__(self, key):
+                if isinstance(key, str):
+                    return tuple.__getitem__(self, index[key])
+                return tuple.__getitem__(self, key)
+
+            def get(self, key, default=None):
+                i = index.get(key)
+                return default if i is None else tuple.__getitem__(self, i)
+
+            cls = type("CompactRow", (base,), {
+                '__slots__': (),
+                '__getitem__': __getitem__,
+                'get': get,
+                'keys': lambda self: columns,
+            })
+            _ROW_CLASSES[columns] = cls
+    return cls
+
+
+class StreamError(Exception):
+    """A streamed listing (fetch_iter) failed part-way; the rows already yielded are incomplete."""
+
+
+class ConnectionPool:
+    """
+    Keeps one long-lived SQLite connection per thread (Tk main loop, admin
+    terminal, workers) instead of reconnecting for every statement.
+    The number of open connections is bounded by max_size; connections owned
+    by threads that have exited are reclaimed before a new one is opened.
+    """
+    def __init__(self, factory, max_size=8, timeout=10, health_interval=30):
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._conns = {}  # thread ident -> (thread, connection)
+        self._closed = False
+
+    def acquire(self):
+        """Returns the calling thread's connection, opening it if needed."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if time.monotonic() - self._local.checked < self.health_interval:
+                return conn
+            if self._is_healthy(conn):
+                self._local.checked = time.monotonic()
+                return conn
+            self.release()
+
+        self._reap_dead_threads()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Connection pool exhausted.")
+        try:
+            conn = self._factory()
+        except Exception:
+            self._slots.release()
+            raise
+
+        thread = threading.current_thread()
+        with self._lock:
+            self._conns[thread.ident] = (thread, conn)
+        self._local.conn = conn
+        self._local.checked = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._slots.release()
+
+    def release(self):
+        """Closes the calling thread's connection (e.g. when a worker exits)."""
+        with self._lock:
+            entry = self._conns.pop(threading.get_ident(), None)
+        self._local.conn = None
+        if entry:
+            self._discard(entry[1])
+
+    def _reap_dead_threads(self):
+        with self._lock:
+            dead = [k for k, (t, _) in self._conns.items() if not t.is_alive()]
+            entries = [self._conns.pop(k) for k in dead]
+        for _, conn in entries:
+            self._discard(conn)
+
+    def size(self):
+        with self._lock:
+            return len(self._conns)
+
+    def close_all(self):
+        """Closes every pooled connection. Safe to call more than once."""
+        self._closed = True
+        with self._lock:
+            entries = list(self._conns.values())
+            self._conns.clear()
+        for _, conn in entries:
+            self._discard(conn)
+
+
 class RentalModel:
-    def __init__(self):
-        self.db_path = self._get_db_path()
+    # Returned instead of an error when a booking or hold loses the race for a car
+    CAR_TAKEN = "This car was just taken by another customer for these dates."
+
+    def __init__(self, db_path=None, pool_size=8, wal=None, hold_ttl=120):
+        self.db_path = db_path or self._get_db_path()
+        self.hold_ttl = hold_ttl  # seconds a checkout hold lives without renewal
+
+        # WAL is opt-in (constructor flag or RENTAL_DB_WAL=1 in the environment)
+        if wal is None:
+            wal = os.environ.get("RENTAL_DB_WAL", "0").lower() in ("1", "true", "yes")
+        self.wal = wal
+
+        self.pool = ConnectionPool(self.connect, max_size=pool_size)
+        # Report scans get their own read-only connections so they never hold
+        # a lock that a checkout write has to wait for
+        self.reader_pool = ConnectionPool(self.connect_reader, max_size=pool_size) if wal else None
+        if wal:
+            self.pool.acquire()  # switches the file to WAL before any reader opens
         print(f"[SYSTEM] Database Connected: {self.db_path}")
 
+        success, applied = self.migrate()
+        if not success:
+            print(f"[SYSTEM] Schema migration failed: {applied}")
+        elif applied:
+            print(f"[SYSTEM] Applied schema migrations: {applied}")
+
+        self.reservation_index = ReservationIntervalIndex()
+        self.rebuild_reservation_index()
+
     def _get_db_path(self):
         """
         Locates the database file. 
@@ -37,10 +203,40 @@ class RentalModel:
         return max(valid_dbs, key=os.path.getsize)
 
     def connect(self):
-        conn = sqlite3.connect(self.db_path, timeout=10)
+        # Pooled connections may be closed by another thread on shutdown
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
         conn.row_factory = sqlite3.Row 
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is durable across application crashes in WAL mode and
+            # avoids an fsync on every commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA wal_autocheckpoint=1000")
+        return conn
+
+    def connect_reader(self):
+        """Opens a read-only connection for report queries (WAL mode only)."""
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
         return conn
 
+    def checkpoint(self, mode="PASSIVE"):
+        """Copies WAL content back into the main database file."""
+        if not self.wal:
+            return True, None
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            return False, "Invalid checkpoint mode."
+        return self.execute_query(f"PRAGMA wal_checkpoint({mode})", fetch_one=True)
+
+    def close(self):
+        """Releases all pooled connections (called on application exit)."""
+        if self.wal:
+            self.reader_pool.close_all()
+            self.checkpoint("TRUNCATE")
+        self.pool.close_all()
+
     def _sanitize_error(self, e):
         """
         Translates raw SQL errors into user-friendly messages.
@@ -57,19 +253,51 @@ class RentalModel:
         else:
             return "An unexpected system error occurred."
 
-    def execute_query(self, query, params=(), commit=False, fetch_one=False, fetch_all=False):
+    def _iter_rows(self, cursor, batch_size, compact=False):
+        """
+        Yields rows, pulling them from SQLite batch_size at a time. An error
+        mid-stream raises StreamError so a cut-off listing is never taken
+        for a complete one.
+        """
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                if compact:
+                    yield from batch
+                else:
+                    for row in batch:
+                        yield dict(row)
+        except sqlite3.Error as e:
+            raise StreamError(self._sanitize_error(e)) from e
+        finally:
+            cursor.close()
+
+    def execute_query(self, query, params=(), commit=False, fetch_one=False, fetch_all=False, 
+                      read_only=False, fetch_iter=False, batch_size=500, compact=False):
         conn = None
+        pool = self.reader_pool if read_only and self.reader_pool else self.pool
         try:
-            conn = self.connect()
+            conn = pool.acquire()
             cursor = conn.cursor()
             cursor.execute(query, params)
+
+            compact = compact and cursor.description is not None
+            if compact:
+                # Build rows straight from the raw tuples, skipping sqlite3.Row and dict
+                make = compact_row_class(d[0] for d in cursor.description)._make
+                cursor.row_factory = lambda _cursor, row: make(row)
             
             result = None
-            if fetch_one:
+            if fetch_iter:
+                # Rows are produced lazily; iterate on the calling thread
+                return True, self._iter_rows(cursor, batch_size, compact)
+            elif fetch_one:
                 row = cursor.fetchone()
-                result = dict(row) if row else None
+                result = (row if compact else dict(row)) if row else None
             elif fetch_all:
-                result = [dict(row) for row in cursor.fetchall()]
+                result = cursor.fetchall() if compact else [dict(row) for row in cursor.fetchall()]
             
             if commit:
                 conn.commit()
@@ -79,29 +307,56 @@ class RentalModel:
             return True, result
             
         except sqlite3.Error as e:
+            # The connection is reused, so never leave a half-done write open
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
             safe_msg = self._sanitize_error(e)
             return False, safe_msg
-            
-        finally:
-            if conn: conn.close()
-
-    def create_indexes(self):
-        """Optimizes query performance on frequently searched columns."""
-        queries = [
-            "CREATE INDEX IF NOT EXISTS idx_customer_name ON Customer (full_name);",
-            "CREATE INDEX IF NOT EXISTS idx_car_plate ON Car (license_plate);",
-            "CREATE INDEX IF NOT EXISTS idx_res_customer ON Reservation (customer_id);"
-        ]
-        for q in queries: 
-            self.execute_query(q, commit=True)
+
+    def migrate(self):
+        """
+        Applies pending schema migrations (indexes and schema changes).
+        Runs at startup; see migrations.py for the versioned steps.
+        """
+        try:
+            applied = apply_migrations(self.pool.acquire())
+            return True, applied
+        except sqlite3.Error as e:
+            return False, self._sanitize_error(e)
+
+    def _keyset_page(self, base_query, key_col, after_id=None, before_id=None, page_size=20):
+        """
+        Returns one page of base_query ordered by key_col (a primary key).
+        Pages continue from the last seen key instead of using OFFSET, so
+        every page costs the same no matter how deep into the table it is.
+        after_id moves forward, before_id moves backward; with neither the
+        first page is returned.
+        """
+        page_size = max(1, min(int(page_size), 500))
+        if before_id is not None:
+            query = f"{base_query} WHERE {key_col} < ? ORDER BY {key_col} DESC LIMIT ?"
+            success, rows = self.execute_query(query, (before_id, page_size), fetch_all=True, read_only=True)
+            if success:
+                rows.reverse()
+            return success, rows
+
+        query = f"{base_query} WHERE {key_col} > ? ORDER BY {key_col} ASC LIMIT ?"
+        start = after_id if after_id is not None else -1
+        return self.execute_query(query, (start, page_size), fetch_all=True, read_only=True)
 
     # -------------------------------------------------------------------------
     # CUSTOMER OPERATIONS
     # -------------------------------------------------------------------------
-    def get_all_customers(self):
+    def get_all_customers(self, stream=False):
         return self.execute_query(
             "SELECT customer_id, full_name, email, phone FROM Customer", 
-            fetch_all=True
+            fetch_all=not stream, fetch_iter=stream, read_only=True
+        )
+
+    def get_customers_page(self, after_id=None, before_id=None, page_size=20):
+        return self._keyset_page(
+            "SELECT customer_id, full_name, email, phone FROM Customer", 
+            "customer_id", after_id, before_id, page_size
         )
 
     def add_customer(self, data):
@@ -144,20 +399,115 @@ class RentalModel:
     # -------------------------------------------------------------------------
     # FLEET (CAR) OPERATIONS
     # -------------------------------------------------------------------------
-    def get_all_cars(self):
+    def get_all_cars(self, stream=False, compact=False):
         query = """
             SELECT car_id, brand, model, license_plate, price_per_day, availability, mileage 
             FROM Car
         """
-        return self.execute_query(query, fetch_all=True)
+        return self.execute_query(query, fetch_all=not stream, fetch_iter=stream, read_only=True, compact=compact)
 
-    def get_available_cars_for_booking(self, cat_id, loc_id):
+    def get_cars_page(self, after_id=None, before_id=None, page_size=20):
         query = """
-            SELECT car_id, brand, model, price_per_day, gearbox, fuel, seats, bags 
-            FROM Car 
-            WHERE category_id = ? AND location_id = ? AND availability = 1
+            SELECT car_id, brand, model, license_plate, price_per_day, availability, mileage 
+            FROM Car
+        """
+        return self._keyset_page(query, "car_id", after_id, before_id, page_size)
+
+    # Filter spec keys -> SQL condition on Car c (one parameter each)
+    CAR_FILTERS = {
+        'subcategory_id': "c.subcategory_id = ?",
+        'gearbox': "c.gearbox = ?",
+        'min_seats': "c.seats >= ?",
+        'min_bags': "c.bags >= ?",
+        'max_price': "c.price_per_day <= ?",
+    }
+
+    def _compile_car_filters(self, filters):
+        """
+        Turns a filter spec into a SQL fragment and params. Keys are those of
+        CAR_FILTERS plus 'fuel' (a set of fuels; an empty set matches nothing,
+        e.g. Diesel and Eco both ticked). Missing or None keys do not filter.
+        Raises ValueError on an unknown key.
         """
-        return self.execute_query(query, (cat_id, loc_id), fetch_all=True)
+        clauses, params = [], []
+        if not filters:
+            return "", params
+
+        unknown = set(filters) - set(self.CAR_FILTERS) - {'fuel'}
+        if unknown:
+            raise ValueError(f"Unknown car filter: {', '.join(sorted(unknown))}")
+        for key, clause in self.CAR_FILTERS.items():
+            if filters.get(key) not in (None, ""):
+                clauses.append(clause)
+                params.append(filters[key])
+        if filters.get('fuel') is not None:
+            fuels = sorted(filters['fuel'])
+            clauses.append(f"c.fuel IN ({', '.join('?' * len(fuels))})")
+            params.extend(fuels)
+
+        sql = "".join(f" AND {c}" for c in clauses)
+        return sql, params
+
+    # Car c has no confirmed reservation or live hold overlapping the dates
+    # (params: end, start, end, start, now)
+    _CAR_IS_FREE = """
+            AND NOT EXISTS (
+                SELECT 1 FROM Reservation r 
+                WHERE r.car_id = c.car_id 
+                AND r.status = 'Confirmed' 
+                AND r.pick_up_date <= ? AND r.drop_off_date >= ?
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM Hold h 
+                WHERE h.car_id = c.car_id 
+                AND h.pick_up_date <= ? AND h.drop_off_date >= ? AND h.expires_at >= ?
+            )
+    """
+
+    def search_available_cars(self, cat_id, loc_id, start_str, end_str, filters=None):
+        """
+        Returns the active cars of a category at a location that have no
+        confirmed reservation or live checkout hold overlapping
+        [start_str, end_str]. The overlap checks run inside SQLite as anti-joins.
+        filters is a spec for _compile_car_filters, applied in the same query;
+        with a subcategory_id the class comes back cheapest first.
+        """
+        try:
+            filter_sql, filter_params = self._compile_car_filters(filters)
+        except ValueError as e:
+            return False, str(e)
+        order_sql = " ORDER BY c.price_per_day" if filters and filters.get('subcategory_id') is not None else ""
+        query = f"""
+            SELECT c.car_id, c.brand, c.model, c.price_per_day, c.gearbox, c.fuel, c.seats, c.bags, c.subcategory_id 
+            FROM Car c 
+            WHERE c.category_id = ? AND c.location_id = ? AND c.availability = 1{filter_sql}{self._CAR_IS_FREE}{order_sql}
+        """
+        params = (cat_id, loc_id, *filter_params, end_str, start_str, end_str, start_str, time.time())
+        return self.execute_query(query, params, fetch_all=True)
+
+    def search_cheapest_by_subcategory(self, cat_id, loc_id, start_str, end_str, filters=None, variants=False):
+        """
+        The cheapest available car of each class (same availability rules as
+        search_available_cars), grouped inside SQLite so only one row per
+        class leaves the database. With variants, one row per class, gearbox
+        and fuel, which is enough to apply the kiosk filters without another query.
+        """
+        try:
+            filter_sql, filter_params = self._compile_car_filters(filters)
+        except ValueError as e:
+            return False, str(e)
+        group_sql = "c.subcategory_id, c.gearbox, c.fuel" if variants else "c.subcategory_id"
+        # SQLite takes the bare columns from the row that holds the MIN()
+        query = f"""
+            SELECT c.subcategory_id, s.name AS subcategory, MIN(c.price_per_day) AS price_per_day, 
+                   c.car_id, c.brand, c.model, c.gearbox, c.fuel, c.seats, c.bags 
+            FROM Car c 
+            JOIN Subcategory s ON s.subcategory_id = c.subcategory_id 
+            WHERE c.category_id = ? AND c.location_id = ? AND c.availability = 1{filter_sql}{self._CAR_IS_FREE}
+            GROUP BY {group_sql}
+        """
+        params = (cat_id, loc_id, *filter_params, end_str, start_str, end_str, start_str, time.time())
+        return self.execute_query(query, params, fetch_all=True)
 
     def add_car(self, d):
         query = """
@@ -212,25 +562,71 @@ class RentalModel:
     # -------------------------------------------------------------------------
     # RESERVATION OPERATIONS
     # -------------------------------------------------------------------------
-    def get_all_reservations(self):
+    def get_all_reservations(self, stream=False, compact=False):
         query = """
             SELECT r.reservation_id, c.full_name, car.brand, car.model, r.pick_up_date, r.drop_off_date, r.status 
             FROM Reservation r 
             JOIN Customer c ON r.customer_id = c.customer_id 
             JOIN Car car ON r.car_id = car.car_id
         """
-        return self.execute_query(query, fetch_all=True)
+        return self.execute_query(query, fetch_all=not stream, fetch_iter=stream, read_only=True, compact=compact)
 
-    def add_reservation(self, d):
+    def get_reservations_page(self, after_id=None, before_id=None, page_size=20):
         query = """
-            INSERT INTO Reservation (pick_up_date, drop_off_date, car_id, pick_up_location, drop_off_location, customer_id, insurance_preference, category_id) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            SELECT r.reservation_id, c.full_name, car.brand, car.model, r.pick_up_date, r.drop_off_date, r.status 
+            FROM Reservation r 
+            JOIN Customer c ON r.customer_id = c.customer_id 
+            JOIN Car car ON r.car_id = car.car_id
         """
-        params = (
+        return self._keyset_page(query, "r.reservation_id", after_id, before_id, page_size)
+
+    def _insert_reservation(self, cursor, d, cust_id, hold_id=None):
+        """
+        Inserts the reservation only if the car has no confirmed booking and
+        no other live hold overlapping its dates (hold_id is the caller's own
+        hold); the check and the insert are one statement.
+        Call inside a BEGIN IMMEDIATE transaction so no other writer can book
+        the car in between. Returns the new reservation_id, or None if taken.
+        """
+        cursor.execute("""
+            INSERT INTO Reservation (pick_up_date, drop_off_date, car_id, pick_up_location, drop_off_location, customer_id, insurance_preference, category_id) 
+            SELECT ?, ?, ?, ?, ?, ?, ?, ? 
+            WHERE NOT EXISTS (
+                SELECT 1 FROM Reservation 
+                WHERE car_id = ? AND status = 'Confirmed' 
+                AND pick_up_date <= ? AND drop_off_date >= ?
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM Hold 
+                WHERE car_id = ? AND hold_id IS NOT ? 
+                AND pick_up_date <= ? AND drop_off_date >= ? AND expires_at >= ?
+            )
+        """, (
             d['p_date'], d['d_date'], d['car_id'], d['p_loc'], 
-            d['d_loc'], d['cust_id'], d['ins_id'], d['cat_id']
-        )
-        return self.execute_query(query, params, commit=True)
+            d['d_loc'], cust_id, d['ins_id'], d['cat_id'], 
+            d['car_id'], d['d_date'], d['p_date'], 
+            d['car_id'], hold_id, d['d_date'], d['p_date'], time.time()
+        ))
+        return cursor.lastrowid if cursor.rowcount == 1 else None
+
+    def add_reservation(self, d):
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            res_id = self._insert_reservation(cursor, d, d['cust_id'])
+            if res_id is None:
+                conn.rollback()
+                return False, self.CAR_TAKEN
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            return False, self._sanitize_error(e)
+
+        self.reservation_index.add(res_id, int(d['car_id']), d['p_date'], d['d_date'])
+        return True, res_id
 
     def cancel_reservation(self, res_id):
         try:
@@ -241,20 +637,212 @@ class RentalModel:
             if not success or not row: 
                 return False, "Reservation ID not found."
             
-            return self.execute_query(
+            result = self.execute_query(
                 "UPDATE Reservation SET status = 'Cancelled' WHERE reservation_id = ?", 
                 (res_id,), commit=True
             )
+            if result[0]:
+                self.reservation_index.remove(row['reservation_id'])
+            return result
         except Exception as e:
             return False, str(e)
 
-    def get_conflicting_reservations(self, start_str, end_str):
+    # -------------------------------------------------------------------------
+    # CHECKOUT
+    # -------------------------------------------------------------------------
+    def book(self, customer, reservation, payment, hold_id=None):
+        """
+        Books a car as one unit of work: finds or creates the customer, then
+        inserts the reservation and its payment inside a single BEGIN IMMEDIATE
+        transaction with one commit. Either everything is stored or nothing is.
+
+        customer:    add_customer fields (matched on email)
+        reservation: add_reservation fields, without cust_id
+        payment:     {'amount', 'deposit', 'car_price'}
+        hold_id:     the checkout's hold on the car, released on success
+        Returns (True, {'customer_id', 'reservation_id', 'payment_number'}),
+        or (False, RentalModel.CAR_TAKEN) if the car is no longer free.
+        """
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            cursor = conn.cursor()
+            # Take the write lock up front so no other writer can slip in between steps
+            cursor.execute("BEGIN IMMEDIATE")
+
+            cursor.execute("SELECT customer_id FROM Customer WHERE email = ?", (customer['email'],))
+            row = cursor.fetchone()
+            if row:
+                cust_id = row['customer_id']
+            else:
+                cursor.execute("""
+                    INSERT INTO Customer (driver_license, full_name, birth_date, address, phone, email)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    customer.get('license'), customer['name'], customer['dob'],
+                    customer['address'], customer['phone'], customer['email']
+                ))
+                cust_id = cursor.lastrowid
+
+            d = reservation
+            res_id = self._insert_reservation(cursor, d, cust_id, hold_id)
+            if res_id is None:
+                # Another kiosk sold the car since this customer searched
+                conn.rollback()
+                return False, self.CAR_TAKEN
+
+            cursor.execute("""
+                INSERT INTO Payment (reservation_id, total_amount, customer_id, security_deposit, car_price)
+                VALUES (?, ?, ?, ?, ?)
+            """, (res_id, payment['amount'], cust_id, payment.get('deposit', 50), payment.get('car_price', 0)))
+            pay_id = cursor.lastrowid
+
+            if hold_id is not None:
+                cursor.execute("DELETE FROM Hold WHERE hold_id = ?", (hold_id,))
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            return False, self._sanitize_error(e)
+        except Exception:
+            # e.g. a missing field: never leave the pooled connection holding the lock
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            raise
+
+        self.reservation_index.add(res_id, int(d['car_id']), d['p_date'], d['d_date'])
+        return True, {'customer_id': cust_id, 'reservation_id': res_id, 'payment_number': pay_id}
+
+    # -------------------------------------------------------------------------
+    # CHECKOUT HOLDS
+    # -------------------------------------------------------------------------
+    def place_hold(self, car_id, start_str, end_str):
+        """
+        Holds a car for [start_str, end_str] while the customer checks out, so
+        searches stop offering it and other kiosks cannot book it.
+        The hold expires after hold_ttl seconds unless renewed.
+        Returns (True, hold_id) or (False, RentalModel.CAR_TAKEN).
+        """
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Expired holds are ignored everywhere already; clearing them here
+            # keeps the table small at the cost of one index range delete
+            cursor.execute("DELETE FROM Hold WHERE expires_at < ?", (now,))
+            cursor.execute("""
+                INSERT INTO Hold (car_id, pick_up_date, drop_off_date, expires_at) 
+                SELECT ?, ?, ?, ? 
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM Reservation 
+                    WHERE car_id = ? AND status = 'Confirmed' 
+                    AND pick_up_date <= ? AND drop_off_date >= ?
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM Hold 
+                    WHERE car_id = ? AND pick_up_date <= ? AND drop_off_date >= ?
+                )
+            """, (
+                car_id, start_str, end_str, now + self.hold_ttl, 
+                car_id, end_str, start_str, 
+                car_id, end_str, start_str
+            ))
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False, self.CAR_TAKEN
+            hold_id = cursor.lastrowid
+            conn.commit()
+            return True, hold_id
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            return False, self._sanitize_error(e)
+
+    def renew_hold(self, hold_id):
+        """Pushes a live hold's expiry hold_ttl seconds ahead. Fails if it already lapsed."""
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE Hold SET expires_at = ? WHERE hold_id = ? AND expires_at >= ?", 
+                (now + self.hold_ttl, hold_id, now)
+            )
+            conn.commit()
+            if cursor.rowcount != 1:
+                return False, "Hold has expired."
+            return True, now + self.hold_ttl
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            return False, self._sanitize_error(e)
+
+    def release_hold(self, hold_id):
+        return self.execute_query("DELETE FROM Hold WHERE hold_id = ?", (hold_id,), commit=True)
+
+    def sweep_holds(self):
+        """Deletes expired holds via the expiry index. Returns how many were removed."""
+        conn = None
+        try:
+            conn = self.pool.acquire()
+            cursor = conn.execute("DELETE FROM Hold WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            return True, cursor.rowcount
+        except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            return False, self._sanitize_error(e)
+
+    # -------------------------------------------------------------------------
+    # AVAILABILITY INDEX
+    # -------------------------------------------------------------------------
+    def _load_index_rows(self, horizon):
         query = """
-            SELECT car_id FROM Reservation 
-            WHERE (pick_up_date <= ? AND drop_off_date >= ?) 
-            AND status = 'Confirmed'
+            SELECT reservation_id, car_id, pick_up_date, drop_off_date FROM Reservation 
+            WHERE status = 'Confirmed' AND drop_off_date >= ?
         """
-        return self.execute_query(query, (end_str, start_str), fetch_all=True)
+        conn = self.pool.acquire()
+        return conn.execute(query, (horizon,)).fetchall()
+
+    def rebuild_reservation_index(self):
+        """Reloads the in-memory availability index from the Reservation table."""
+        try:
+            horizon = datetime.now().strftime("%Y-%m-%d")
+            count = self.reservation_index.load(self._load_index_rows(horizon), horizon)
+            return True, count
+        except sqlite3.Error as e:
+            return False, self._sanitize_error(e)
+
+    def verify_reservation_index(self):
+        """
+        Compares the in-memory index with the Reservation table.
+        Returns a report with reservations missing from the index, entries the
+        table no longer confirms, and entries whose car or dates differ.
+        """
+        try:
+            rows = self._load_index_rows(self.reservation_index.horizon)
+        except sqlite3.Error as e:
+            return False, self._sanitize_error(e)
+
+        expected = {r[0]: (r[1], r[2], r[3]) for r in rows}
+        actual = self.reservation_index.snapshot()
+        report = {
+            'checked': len(expected),
+            'missing': sorted(set(expected) - set(actual)),
+            'stale': sorted(set(actual) - set(expected)),
+            'mismatched': sorted(k for k in set(expected) & set(actual) if expected[k] != actual[k]),
+        }
+        report['consistent'] = not (report['missing'] or report['stale'] or report['mismatched'])
+        return True, report
+
+    def is_car_free(self, car_id, start_str, end_str):
+        """
+        In-memory overlap check against confirmed reservations. A pre-filter
+        only: the conditional INSERT in add_reservation/book has the final say.
+        """
+        return self.reservation_index.is_free(car_id, start_str, end_str)
 
     # -------------------------------------------------------------------------
     # EMPLOYEE OPERATIONS
@@ -262,7 +850,7 @@ class RentalModel:
     def get_all_employees(self):
         return self.execute_query(
             "SELECT employee_id, name, surname, email, phone FROM Employee", 
-            fetch_all=True
+            fetch_all=True, read_only=True
         )
 
     def add_employee(self, d):
@@ -292,6 +880,85 @@ class RentalModel:
         except Exception as e:
             return False, str(e)
 
+    # -------------------------------------------------------------------------
+    # VEHICLE CLASSES (SUBCATEGORY TAXONOMY)
+    # -------------------------------------------------------------------------
+    def get_taxonomy(self):
+        """Every class with its category and model/brand names, in display order."""
+        query = """
+            SELECT s.subcategory_id AS id, s.category_id, s.name, s.sort_order, m.name AS model 
+            FROM Subcategory s 
+            LEFT JOIN SubcategoryModel m ON m.subcategory_id = s.subcategory_id 
+            ORDER BY s.category_id, s.sort_order, s.subcategory_id, m.name
+        """
+        success, rows = self.execute_query(query, fetch_all=True)
+        if not success:
+            return success, rows
+        classes = {}
+        for r in rows:
+            entry = classes.setdefault(r['id'], {
+                'id': r['id'], 'category_id': r['category_id'], 'name': r['name'],
+                'sort_order': r['sort_order'], 'models': []
+            })
+            if r['model'] is not None:
+                entry['models'].append(r['model'])
+        return True, list(classes.values())
+
+    def _reclassify_cars(self, cat_id):
+        """Re-derives Car.subcategory_id for one category after its classes changed."""
+        return self.execute_query(f"{ASSIGN_SUBCATEGORY_SQL} WHERE category_id = ?", (cat_id,), commit=True)
+
+    def _subcategory_category(self, sub_id):
+        success, row = self.execute_query(
+            "SELECT category_id FROM Subcategory WHERE subcategory_id = ?", (sub_id,), fetch_one=True)
+        if not success:
+            return False, row
+        if not row:
+            return False, f"Vehicle class #{sub_id} does not exist."
+        return True, row['category_id']
+
+    def add_subcategory(self, cat_id, name, sort_order=None):
+        if sort_order is None:
+            success, row = self.execute_query(
+                "SELECT COALESCE(MAX(sort_order), -1) + 1 AS next FROM Subcategory WHERE category_id = ?",
+                (cat_id,), fetch_one=True)
+            sort_order = row['next'] if success else 0
+        return self.execute_query(
+            "INSERT INTO Subcategory (category_id, name, sort_order) VALUES (?, ?, ?)",
+            (cat_id, name, sort_order), commit=True)
+
+    def remove_subcategory(self, sub_id):
+        success, cat_id = self._subcategory_category(sub_id)
+        if not success:
+            return success, cat_id
+        success, msg = self.execute_query("DELETE FROM SubcategoryModel WHERE subcategory_id = ?", (sub_id,), commit=True)
+        if success:
+            success, msg = self.execute_query("DELETE FROM Subcategory WHERE subcategory_id = ?", (sub_id,), commit=True)
+        if not success:
+            return success, msg
+        return self._reclassify_cars(cat_id)
+
+    def add_subcategory_model(self, sub_id, name):
+        """Puts cars of this model (or brand) in the class; existing cars move at once."""
+        success, cat_id = self._subcategory_category(sub_id)
+        if not success:
+            return success, cat_id
+        success, msg = self.execute_query(
+            "INSERT INTO SubcategoryModel (subcategory_id, name) VALUES (?, ?)", (sub_id, name), commit=True)
+        if not success:
+            return success, msg
+        return self._reclassify_cars(cat_id)
+
+    def remove_subcategory_model(self, sub_id, name):
+        success, cat_id = self._subcategory_category(sub_id)
+        if not success:
+            return success, cat_id
+        success, msg = self.execute_query(
+            "DELETE FROM SubcategoryModel WHERE subcategory_id = ? AND name = ?", (sub_id, name), commit=True)
+        if not success:
+            return success, msg
+        return self._reclassify_cars(cat_id)
+
     # -------------------------------------------------------------------------
     # UTILITIES & REPORTING
     # -------------------------------------------------------------------------
@@ -300,6 +967,20 @@ class RentalModel:
     
     def get_categories(self): 
         return self.execute_query("SELECT category_id as id, category_name FROM Category", fetch_all=True)
+
+    def get_insurance_plans(self):
+        query = """
+            SELECT plan_id as id, name, insurance_price as price, description, is_offered 
+            FROM InsurancePlan ORDER BY insurance_price, plan_id
+        """
+        return self.execute_query(query, fetch_all=True)
+
+    def get_reference_version(self):
+        """Counter bumped by every change to locations, categories, plans or vehicle classes."""
+        success, row = self.execute_query("SELECT version FROM ReferenceVersion WHERE id = 1", fetch_one=True)
+        if not success:
+            return success, row
+        return True, row['version'] if row else 0
     
     def add_payment(self, res_id, amount, cust_id):
         query = """
@@ -308,13 +989,21 @@ class RentalModel:
         """
         return self.execute_query(query, (res_id, amount, cust_id), commit=True)
     
-    def get_all_payments(self):
+    def get_all_payments(self, stream=False, compact=False):
         query = """
             SELECT p.payment_number, p.total_amount, c.full_name, p.reservation_id 
             FROM Payment p 
             JOIN Customer c ON p.customer_id = c.customer_id
         """
-        return self.execute_query(query, fetch_all=True)
+        return self.execute_query(query, fetch_all=not stream, fetch_iter=stream, read_only=True, compact=compact)
+
+    def get_payments_page(self, after_id=None, before_id=None, page_size=20):
+        query = """
+            SELECT p.payment_number, p.total_amount, c.full_name, p.reservation_id 
+            FROM Payment p 
+            JOIN Customer c ON p.customer_id = c.customer_id
+        """
+        return self._keyset_page(query, "p.payment_number", after_id, before_id, page_size)
 
     def add_pickup_dropoff(self, table, d):
         state_col = "pick_up_state" if table == "PickUp" else "drop_off_state"
@@ -330,18 +1019,18 @@ class RentalModel:
             FROM {table} x 
             JOIN Employee e ON x.employee_id = e.employee_id
         """
-        return self.execute_query(query, fetch_all=True)
+        return self.execute_query(query, fetch_all=True, read_only=True)
     
     def get_stats(self):
         stats = {}
         
-        s, r = self.execute_query("SELECT SUM(total_amount) FROM Payment", fetch_one=True)
+        s, r = self.execute_query("SELECT SUM(total_amount) FROM Payment", fetch_one=True, read_only=True)
         stats['revenue'] = list(r.values())[0] if s and r else 0
         
-        s, r = self.execute_query("SELECT COUNT(*) FROM Car WHERE availability = 1", fetch_one=True)
+        s, r = self.execute_query("SELECT COUNT(*) FROM Car WHERE availability = 1", fetch_one=True, read_only=True)
         stats['avail'] = list(r.values())[0] if s and r else 0
         
-        s, r = self.execute_query("SELECT COUNT(*) FROM Car WHERE availability = 0", fetch_one=True)
+        s, r = self.execute_query("SELECT COUNT(*) FROM Car WHERE availability = 0", fetch_one=True, read_only=True)
         stats['rented'] = list(r.values())[0] if s and r else 0
         
         return stats
@@ -355,11 +1044,11 @@ class RentalModel:
             ORDER BY spent DESC 
             LIMIT 3
         """
-        return self.execute_query(query, fetch_all=True)
+        return self.execute_query(query, fetch_all=True, read_only=True)
 
     def get_avg_duration(self):
         query = "SELECT AVG(julianday(drop_off_date) - julianday(pick_up_date)) FROM Reservation"
-        success, row = self.execute_query(query, fetch_one=True)
+        success, row = self.execute_query(query, fetch_one=True, read_only=True)
         if success and row:
             val = list(row.values())[0]
             return round(val, 1) if val else 0
@@ -376,9 +1065,12 @@ class RentalModel:
             JOIN Customer c ON r.customer_id = c.customer_id 
             JOIN Car car ON r.car_id = car.car_id
             WHERE r.drop_off_date >= ? AND r.status = 'Confirmed'
-            ORDER BY r.pick_up_date ASC
+            ORDER BY +r.pick_up_date ASC
         """
-        return self.execute_query(query, (today,), fetch_all=True)
+        # The unary + stops SQLite from walking idx_res_dates in pick-up order
+        # (a full scan); the few future rows are found via idx_res_active_dropoff
+        # and sorted instead
+        return self.execute_query(query, (today,), fetch_all=True, read_only=True)
 
     def get_most_popular_store(self):
         query = """
@@ -389,7 +1081,7 @@ class RentalModel:
             ORDER BY usage_count DESC
             LIMIT 1
         """
-        return self.execute_query(query, fetch_one=True)
+        return self.execute_query(query, fetch_one=True, read_only=True)
 
     def get_employee_work_history(self, emp_id):
         query = """
@@ -406,4 +1098,4 @@ class RentalModel:
             WHERE d.employee_id = ?
             ORDER BY action_date DESC
         """
-        return self.execute_query(query, (emp_id, emp_id), fetch_all=True)
\ No newline at end of file
+        return self.execute_query(query, (emp_id, emp_id), fetch_all=True, read_only=True)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Payment requests over the bank's request/response message channel.
+
+Every request carries a correlation ID and gets its own Future, so any number
+of checkouts can wait on the same response topic without reading each
+other's answers. Responses resolve their Future as they arrive; requests the
+bank never answers fail with PaymentTimeout.
+
+An optional CircuitBreaker tracks channel health: once the bank stops
+answering (or the broker connection drops), requests fail at once with
+CircuitOpen instead of each waiting out the full timeout.
+"""
+import heapq
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+
+class PaymentTimeout(Exception):
+    """The bank did not answer a payment request in time."""
+
+
+class CircuitOpen(Exception):
+    """The payment channel is known to be down; the request was not sent."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, or at once on trip().
+    While open every request is refused; after reset_timeout one trial
+    request is let through (half-open) and its outcome closes or re-opens it.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_sent = False
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_sent = False
+            if self.state == self.HALF_OPEN and not self._trial_sent:
+                self._trial_sent = True
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        self.reset()
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self):
+        """Opens the circuit regardless of the failure count (e.g. the broker connection dropped)."""
+        with self._lock:
+            self._open()
+
+    def reset(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+
+
+class PaymentClient:
+    def __init__(self, publish, timeout=10.0, breaker=None):
+        """
+        publish: callable taking the JSON request string (e.g. a wrapper
+        around the MQTT client's publish to the request topic).
+        breaker: optional CircuitBreaker; fed with every answer, timeout and publish error.
+        """
+        self._publish = publish
+        self.timeout = timeout
+        self.breaker = breaker
+        self._pending = {}    # correlation id -> Future
+        self._deadlines = []  # heap of (deadline, correlation id)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._reaper = None
+        self._closed = False
+
+    def request(self, amount, card_last4):
+        """Sends a payment request and returns a Future for the bank's response dict."""
+        cid = uuid.uuid4().hex
+        future = Future()
+        if self.breaker is not None and not self.breaker.allow():
+            future.set_exception(CircuitOpen("Payment channel is down."))
+            return future
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Payment client is closed.")
+            self._pending[cid] = future
+            heapq.heappush(self._deadlines, (time.monotonic() + self.timeout, cid))
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, name="payment-timeouts", daemon=True)
+                self._reaper.start()
+        self._wake.set()
+
+        try:
+            self._publish(json.dumps({"correlation_id": cid, "amount": amount, "card": card_last4}))
+        except Exception as e:
+            self._resolve(cid, error=e)
+        return future
+
+    def handle_response(self, payload):
+        """
+        Resolves the request a bank response (bytes or str) belongs to.
+        Returns False for unknown, late or malformed responses, which are dropped.
+        """
+        try:
+            response = json.loads(payload)
+        except (TypeError, ValueError):
+            return False
+        if not isinstance(response, dict):
+            return False
+        return self._resolve(response.get("correlation_id"), result=response)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Fails every outstanding request and stops the timeout thread."""
+        with self._lock:
+            self._closed = True
+            waiting = list(self._pending.values())
+            self._pending.clear()
+            self._deadlines.clear()
+        self._wake.set()
+        for future in waiting:
+            future.set_exception(PaymentTimeout("Payment client closed."))
+
+    def _resolve(self, cid, result=None, error=None):
+        with self._lock:
+            future = self._pending.pop(cid, None)
+        if future is None:
+            return False
+        if error is not None:
+            self._record(False)
+            future.set_exception(error)
+        else:
+            self._record(True)
+            future.set_result(result)
+        return True
+
+    def _record(self, ok):
+        if self.breaker is None:
+            return
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _reap(self):
+        """Fails requests past their deadline; sleeps until the next deadline in between."""
+        while True:
+            expired = []
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, cid = heapq.heappop(self._deadlines)
+                    future = self._pending.pop(cid, None)
+                    if future is not None:
+                        expired.append(future)
+                wait = self._deadlines[0][0] - now if self._deadlines else None
+                self._wake.clear()
+            for future in expired:
+                self._record(False)
+                future.set_exception(PaymentTimeout("Bank did not respond in time."))
+            self._wake.wait(wait)
@@ -0,0 +1,133 @@
+"""
+Process-wide registry of reference data: locations, categories, insurance
+plans and the vehicle class taxonomy.
+
+The kiosk and the admin console used to query these tables separately and
+keep their own copies. ReferenceData loads them once into an immutable
+ReferenceSnapshot with dict lookups by id and by name. refresh() swaps in a
+new snapshot in one assignment, so readers always see one consistent
+version, never a half-updated mix. Every snapshot carries the database's
+ReferenceVersion counter, which triggers bump on any change to these tables.
+Caches built from a snapshot (the kiosk's maps, SearchIndex buckets) compare
+versions to know when to rebuild.
+"""
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+Location = namedtuple("Location", "id address")
+Category = namedtuple("Category", "id name")
+InsurancePlan = namedtuple("InsurancePlan", "id name price desc offered")
+Subcategory = namedtuple("Subcategory", "id category_id name sort_order models")
+
+ReferenceSnapshot = namedtuple("ReferenceSnapshot", [
+    "version",
+    "locations", "categories", "insurance_plans", "subcategories",  # tuples, display order
+    "location_by_id", "location_by_address",
+    "category_by_id", "category_by_name",
+    "plan_by_id", "offered_plans",
+    "subcategory_by_id", "classes_by_category",  # category_id -> {class name: Subcategory}
+])
+
+
+def build_snapshot(version, locations, categories, plans, classes):
+    """Builds a ReferenceSnapshot from the model's rows."""
+    locations = tuple(Location(r['id'], r['address']) for r in locations)
+    categories = tuple(Category(r['id'], r['category_name']) for r in categories)
+    plans = tuple(InsurancePlan(r['id'], r['name'], r['price'], r['description'] or "", bool(r['is_offered']))
+                  for r in plans)
+    classes = tuple(Subcategory(c['id'], c['category_id'], c['name'], c['sort_order'], tuple(c['models']))
+                    for c in classes)
+
+    by_category = {}
+    for sub in classes:
+        by_category.setdefault(sub.category_id, {})[sub.name] = sub
+
+    ro = MappingProxyType
+    return ReferenceSnapshot(
+        version=version,
+        locations=locations, categories=categories, insurance_plans=plans, subcategories=classes,
+        location_by_id=ro({l.id: l for l in locations}),
+        location_by_address=ro({l.address: l for l in locations}),
+        category_by_id=ro({c.id: c for c in categories}),
+        category_by_name=ro({c.name: c for c in categories}),
+        plan_by_id=ro({p.id: p for p in plans}),
+        offered_plans=tuple(p for p in plans if p.offered),
+        subcategory_by_id=ro({s.id: s for s in classes}),
+        classes_by_category=ro({cat: ro(subs) for cat, subs in by_category.items()}),
+    )
+
+
+class ReferenceData:
+    def __init__(self, model):
+        self.model = model
+        self._snapshot = None
+        self._lock = threading.Lock()  # one load at a time; readers never wait
+
+    @property
+    def snapshot(self):
+        """The current snapshot (None until the first successful refresh)."""
+        return self._snapshot
+
+    @property
+    def version(self):
+        snap = self._snapshot
+        return snap.version if snap else None
+
+    def _load(self):
+        # Re-read when the version moved while loading, so a snapshot never
+        # mixes rows from before and after a change
+        for _ in range(5):
+            ok, before = self.model.get_reference_version()
+            if not ok:
+                return ok, before
+            results = (self.model.get_locations(), self.model.get_categories(),
+                       self.model.get_insurance_plans(), self.model.get_taxonomy())
+            for success, rows in results:
+                if not success:
+                    return success, rows
+            ok, after = self.model.get_reference_version()
+            if not ok:
+                return ok, after
+            if before == after:
+                return True, build_snapshot(after, *(rows or [] for _, rows in results))
+        return False, "Reference data kept changing while loading."
+
+    def refresh(self, force=True):
+        """
+        (success, snapshot) after reloading the tables and swapping the new
+        snapshot in. With force=False the tables are only read again when the
+        database version differs from the current snapshot's.
+        """
+        with self._lock:
+            current = self._snapshot
+            if current is not None and not force:
+                ok, version = self.model.get_reference_version()
+                if ok and version == current.version:
+                    return True, current
+            success, snap = self._load()
+            if success:
+                self._snapshot = snap
+            return success, snap
+
+    def refresh_if_changed(self):
+        return self.refresh(force=False)
+
+    def current(self):
+        """(success, snapshot), loading it on first use."""
+        snap = self._snapshot
+        return (True, snap) if snap is not None else self.refresh(force=False)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def shared(model):
+    """The ReferenceData for model's database, shared by every caller in this process."""
+    key = model.db_path
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None or registry.model is not model:
+            registry = _registries[key] = ReferenceData(model)
+        return registry
@@ -0,0 +1,191 @@
+"""
+Per-search index of available cars for the class selection screen.
+
+A search result (the cheapest car per class, gearbox and fuel, see
+RentalModel.search_cheapest_by_subcategory) is split once into one bucket
+per subcategory, each sorted by daily price. Every bucket also keeps a
+bitset per filter checkbox (bit i set when the i-th cheapest car passes
+that filter), so a filter toggle is a few integer ANDs per subcategory and
+the cheapest matching car is the lowest set bit.
+
+The SQL side (sql_filters, search_available_cars) only runs when a card is
+clicked, to fetch that class's candidate cars. The bitsets cover what
+happens before that: redrawing every card's price and example car each
+time a checkbox changes, from the one grouped result, without a query.
+
+NarrowingCache keeps the rows of recent filtered searches, so a stricter
+filter on the same search is answered without going back to SQLite.
+"""
+import threading
+from collections import OrderedDict
+
+# filter_vars key -> predicate on a search result row
+FILTERS = {
+    "automatic_only": lambda car: car['gearbox'] == 'Automatic',
+    "diesel_only": lambda car: car['fuel'] == 'Diesel',
+    "hybrid_only": lambda car: car['fuel'] in ('Hybrid', 'Electric'),
+}
+
+
+class SearchIndex:
+    def __init__(self, cars=(), subcategories=()):
+        """
+        cars: rows carrying a 'subcategory' name, as the model returns them.
+        subcategories: the class names to index; cars of other classes are ignored.
+        """
+        self.buckets = {sub: [] for sub in subcategories}  # subcategory -> cars, cheapest first
+        self.masks = {}    # subcategory -> {filter name: bitset over the bucket}
+        self._all = {}     # subcategory -> bitset with every car set
+
+        for car in cars:
+            bucket = self.buckets.get(car['subcategory'])
+            if bucket is not None:
+                bucket.append(car)
+
+        for sub, bucket in self.buckets.items():
+            bucket.sort(key=lambda c: c['price_per_day'])
+            self._all[sub] = (1 << len(bucket)) - 1
+            self.masks[sub] = {
+                name: sum(1 << i for i, car in enumerate(bucket) if passes(car))
+                for name, passes in FILTERS.items()
+            }
+
+    def _mask(self, sub, active):
+        mask = self._all.get(sub, 0)
+        for name in active:
+            mask &= self.masks[sub][name]
+        return mask
+
+    def cheapest(self, sub, active=()):
+        """The cheapest car in sub passing every active filter, or None."""
+        mask = self._mask(sub, active)
+        if not mask:
+            return None
+        return self.buckets[sub][(mask & -mask).bit_length() - 1]
+
+    def matches(self, sub, active=()):
+        """Cars in sub passing every active filter, cheapest first."""
+        mask = self._mask(sub, active)
+        bucket = self.buckets.get(sub, [])
+        while mask:
+            low = mask & -mask
+            yield bucket[low.bit_length() - 1]
+            mask ^= low
+
+
+def sql_filters(active):
+    """The filter spec for RentalModel searches equivalent to the active checkboxes."""
+    spec = {}
+    if "automatic_only" in active:
+        spec['gearbox'] = 'Automatic'
+    fuels = None
+    if "diesel_only" in active:
+        fuels = {'Diesel'}
+    if "hybrid_only" in active:
+        fuels = {'Hybrid', 'Electric'} & fuels if fuels is not None else {'Hybrid', 'Electric'}
+    if fuels is not None:
+        spec['fuel'] = sorted(fuels)
+    return spec
+
+
+# -------------------------------------------------------------------------
+# INCREMENTAL NARROWING
+# -------------------------------------------------------------------------
+def _normalized(spec):
+    """Drops the keys that do not filter (None or ''), like RentalModel._compile_car_filters."""
+    spec = {k: v for k, v in (spec or {}).items() if v not in (None, "")}
+    if 'fuel' in spec:
+        spec['fuel'] = frozenset(spec['fuel'])
+    return spec
+
+
+def car_matches(spec, car):
+    """Python twin of the SQL a filter spec compiles to, for rows that were already fetched."""
+    return _matches(_normalized(spec), car)
+
+
+def _matches(spec, car):
+    for key, value in spec.items():
+        if key in ('subcategory_id', 'gearbox'):
+            if car[key] != value:
+                return False
+        elif key == 'fuel':
+            if car['fuel'] not in value:
+                return False
+        elif key in ('min_seats', 'min_bags'):
+            have = car['seats' if key == 'min_seats' else 'bags']
+            if have is None or have < value:
+                return False
+        elif key == 'max_price':
+            if car['price_per_day'] > value:
+                return False
+    return True
+
+
+def is_narrower(spec, base):
+    """True when every car matching spec also matches base, so spec can be answered from base's rows."""
+    spec, base = _normalized(spec), _normalized(base)
+    for key, value in base.items():
+        if key not in spec:
+            return False
+        mine = spec[key]
+        if key in ('subcategory_id', 'gearbox'):
+            ok = mine == value
+        elif key == 'fuel':
+            ok = mine <= value
+        elif key in ('min_seats', 'min_bags'):
+            ok = mine >= value
+        else:  # max_price
+            ok = mine <= value
+        if not ok:
+            return False
+    return True
+
+
+class NarrowingCache:
+    """
+    Results of one search (fixed category, location and dates) under
+    different filter specs. A spec that only tightens one already fetched is
+    answered by filtering those rows in memory; anything else is one
+    pushed-down query through fetch.
+    """
+
+    def __init__(self, fetch, max_entries=8):
+        """fetch: callable spec -> (success, rows), e.g. a bound RentalModel.search_available_cars."""
+        self._fetch = fetch
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # normalized spec (as a key) -> (spec, rows cheapest first)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _key(spec):
+        return tuple(sorted(spec.items(), key=lambda kv: kv[0]))
+
+    def get(self, spec=None):
+        """(success, rows) for spec, cheapest first."""
+        spec = _normalized(spec)
+        with self._lock:
+            base = None
+            for key, (cached_spec, rows) in self._entries.items():
+                # Fewest rows to filter wins
+                if is_narrower(spec, cached_spec) and (base is None or len(rows) < len(base[1])):
+                    base = key, rows
+            if base is not None:
+                self._entries.move_to_end(base[0])
+                self.hits += 1
+                return True, [car for car in base[1] if _matches(spec, car)]
+
+        sql_spec = dict(spec)
+        if 'fuel' in sql_spec:
+            sql_spec['fuel'] = sorted(sql_spec['fuel'])
+        success, rows = self._fetch(sql_spec)
+        if not success:
+            return success, rows
+        rows = sorted(rows or [], key=lambda c: c['price_per_day'])
+        with self._lock:
+            self.misses += 1
+            self._entries[self._key(spec)] = (spec, rows)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True, list(rows)
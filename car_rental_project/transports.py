@@ -0,0 +1,408 @@
+"""
+Message transports for the payment channel.
+
+The kiosk and the bank only need publish/subscribe on two topics, so the
+channel is pluggable:
+
+  inprocess  a queue inside this process (tests, benchmarks, offline kiosks)
+  local      a small TCP broker on this machine (LocalBroker), no internet needed
+  paho       a real MQTT broker through paho-mqtt
+
+Every transport has connect(), wait_connected(timeout), subscribe(topic,
+handler), publish(topic, payload) and close(). Handlers receive the payload as bytes on the
+transport's delivery thread. ConnectionSupervisor connects a transport in
+the background and reconnects it with backoff, so callers never block on a
+slow broker.
+"""
+import json
+import queue
+import random
+import socket
+import socketserver
+import threading
+
+try:
+    import paho.mqtt.client as mqtt
+    MQTT_AVAILABLE = True
+except ImportError:
+    MQTT_AVAILABLE = False
+
+
+class TransportError(Exception):
+    """The transport is not connected or could not deliver a message."""
+
+
+def _as_bytes(payload):
+    return payload if isinstance(payload, bytes) else str(payload).encode("utf-8")
+
+
+# -------------------------------------------------------------------------
+# IN-PROCESS
+# -------------------------------------------------------------------------
+class InProcessHub:
+    """Routes messages between InProcessTransports on one delivery thread, like a broker would."""
+
+    def __init__(self):
+        self._subs = {}  # topic -> list of handlers
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._deliver, name="inprocess-hub", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, topic, handler):
+        with self._lock:
+            self._subs.setdefault(topic, []).append(handler)
+
+    def unsubscribe_all(self, handlers):
+        with self._lock:
+            for topic, subs in self._subs.items():
+                self._subs[topic] = [h for h in subs if h not in handlers]
+
+    def publish(self, topic, payload):
+        self._queue.put((topic, payload))
+
+    def _deliver(self):
+        while True:
+            topic, payload = self._queue.get()
+            with self._lock:
+                handlers = list(self._subs.get(topic, ()))
+            for handler in handlers:
+                try:
+                    handler(payload)
+                except Exception:
+                    pass  # one bad subscriber must not stop delivery to the rest
+
+
+_default_hub = None
+_default_hub_lock = threading.Lock()
+
+
+def default_hub():
+    global _default_hub
+    with _default_hub_lock:
+        if _default_hub is None:
+            _default_hub = InProcessHub()
+        return _default_hub
+
+
+class InProcessTransport:
+    def __init__(self, hub=None):
+        self._hub = hub or default_hub()
+        self._handlers = []
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def wait_connected(self, timeout):
+        return self.connected
+
+    def subscribe(self, topic, handler):
+        self._handlers.append(handler)
+        self._hub.subscribe(topic, handler)
+
+    def publish(self, topic, payload):
+        if not self.connected:
+            raise TransportError("Not connected.")
+        self._hub.publish(topic, _as_bytes(payload))
+
+    def close(self):
+        self.connected = False
+        self._hub.unsubscribe_all(self._handlers)
+        self._handlers = []
+
+
+# -------------------------------------------------------------------------
+# LOCAL TCP BROKER
+# -------------------------------------------------------------------------
+class LocalBroker:
+    """
+    Minimal topic broker for machines without an MQTT server. Clients send
+    one JSON object per line: {"op": "sub", "topic": ...} or
+    {"op": "pub", "topic": ..., "payload": ...}; published messages are
+    forwarded to every subscriber of the topic as {"topic", "payload"} lines.
+    """
+
+    def __init__(self, host="127.0.0.1", port=18830):
+        broker = self
+        self._subs = {}  # topic -> set of handler instances
+        self._lock = threading.Lock()
+
+        class Handler(socketserver.StreamRequestHandler):
+            def setup(self):
+                super().setup()
+                self.write_lock = threading.Lock()
+
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        msg = json.loads(line)
+                    except ValueError:
+                        continue
+                    if msg.get("op") == "sub":
+                        with broker._lock:
+                            broker._subs.setdefault(msg.get("topic"), set()).add(self)
+                    elif msg.get("op") == "pub":
+                        broker._forward(msg.get("topic"), msg.get("payload"))
+
+            def finish(self):
+                with broker._lock:
+                    for subs in broker._subs.values():
+                        subs.discard(self)
+                super().finish()
+
+            def send(self, data):
+                with self.write_lock:
+                    self.wfile.write(data)
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, port), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _forward(self, topic, payload):
+        data = (json.dumps({"topic": topic, "payload": payload}) + "\n").encode("utf-8")
+        with self._lock:
+            targets = list(self._subs.get(topic, ()))
+        for client in targets:
+            try:
+                client.send(data)
+            except OSError:
+                pass
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def start_local_broker(host="127.0.0.1", port=18830):
+    """Starts a LocalBroker unless one is already listening on the port (another kiosk started it)."""
+    try:
+        return LocalBroker(host, port).start()
+    except OSError:
+        return None
+
+
+class LocalBrokerTransport:
+    def __init__(self, host="127.0.0.1", port=18830, timeout=5):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._sock = None
+        self._handlers = {}  # topic -> list of handlers
+        self._write_lock = threading.Lock()
+        self.connected = False
+
+    def connect(self):
+        self.close()
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise TransportError(f"Local broker unreachable at {self.host}:{self.port}: {e}") from e
+        self._sock.settimeout(None)
+        self.connected = True
+        for topic in self._handlers:
+            self._send({"op": "sub", "topic": topic})
+        threading.Thread(target=self._read, name="local-broker-client", daemon=True).start()
+
+    def wait_connected(self, timeout):
+        return self.connected
+
+    def _send(self, msg):
+        data = (json.dumps(msg) + "\n").encode("utf-8")
+        try:
+            with self._write_lock:
+                self._sock.sendall(data)
+        except (OSError, AttributeError) as e:
+            self.connected = False
+            raise TransportError(f"Send failed: {e}") from e
+
+    def _read(self):
+        sock = self._sock
+        try:
+            for line in sock.makefile("rb"):
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                for handler in self._handlers.get(msg.get("topic"), ()):
+                    try:
+                        handler(_as_bytes(msg.get("payload", "")))
+                    except Exception:
+                        pass
+        except OSError:
+            pass
+        if self._sock is sock:  # not replaced by a reconnect in the meantime
+            self.connected = False
+
+    def subscribe(self, topic, handler):
+        self._handlers.setdefault(topic, []).append(handler)
+        if self.connected:
+            self._send({"op": "sub", "topic": topic})
+
+    def publish(self, topic, payload):
+        if not self.connected:
+            raise TransportError("Not connected.")
+        payload = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+        self._send({"op": "pub", "topic": topic, "payload": payload})
+
+    def close(self):
+        self.connected = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+
+# -------------------------------------------------------------------------
+# PAHO MQTT
+# -------------------------------------------------------------------------
+class PahoTransport:
+    def __init__(self, host, port=1883, keepalive=60):
+        if not MQTT_AVAILABLE:
+            raise TransportError("paho-mqtt is not installed.")
+        self.host, self.port, self.keepalive = host, port, keepalive
+        self._handlers = {}
+        self._client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._started = False
+        self._up = threading.Event()
+        self.connected = False
+
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
+        if rc != 0:
+            return
+        self.connected = True
+        self._up.set()
+        # Re-subscribe after every (re)connect; the broker forgets clean sessions
+        for topic in self._handlers:
+            client.subscribe(topic)
+
+    def _on_disconnect(self, client, userdata, flags, rc, properties=None):
+        self.connected = False
+        self._up.clear()
+
+    def _on_message(self, client, userdata, msg):
+        for handler in self._handlers.get(msg.topic, ()):
+            try:
+                handler(msg.payload)
+            except Exception:
+                pass
+
+    def connect(self):
+        if self._started:
+            # paho's network loop reconnects on its own once it has been started
+            raise TransportError("Waiting for the MQTT client to reconnect.")
+        try:
+            self._client.connect(self.host, self.port, self.keepalive)
+        except (OSError, ValueError) as e:
+            raise TransportError(f"MQTT broker unreachable at {self.host}:{self.port}: {e}") from e
+        self._client.loop_start()
+        self._started = True
+
+    def wait_connected(self, timeout):
+        # connect() only opens the socket; the CONNACK arrives in _on_connect
+        return self._up.wait(timeout)
+
+    def subscribe(self, topic, handler):
+        self._handlers.setdefault(topic, []).append(handler)
+        if self.connected:
+            self._client.subscribe(topic)
+
+    def publish(self, topic, payload):
+        info = self._client.publish(topic, payload)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise TransportError(f"MQTT publish failed (rc={info.rc}).")
+
+    def close(self):
+        self.connected = False
+        self._up.clear()
+        if self._started:
+            self._client.disconnect()
+            self._client.loop_stop()
+            self._started = False
+
+
+# -------------------------------------------------------------------------
+# CONNECTION SUPERVISOR
+# -------------------------------------------------------------------------
+class ConnectionSupervisor:
+    """
+    Connects a transport on a background thread and keeps it connected.
+    Failed attempts are retried after initial_delay, doubling up to
+    max_delay (with +-20% jitter so kiosks do not reconnect in lockstep).
+    on_change(connected) is called from the supervisor thread whenever the
+    connection comes up or goes down. An attempt only counts as failed once
+    the transport has not confirmed it within connect_timeout.
+    """
+
+    def __init__(self, transport, on_change=None, initial_delay=0.5, max_delay=30.0, check_interval=1.0,
+                 connect_timeout=5.0):
+        self.transport = transport
+        self.on_change = on_change
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.check_interval = check_interval
+        self.connect_timeout = connect_timeout
+        self.attempts = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="transport-supervisor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay = self.initial_delay
+        was_up = None
+        while not self._stop.is_set():
+            if not self.transport.connected:
+                self.attempts += 1
+                try:
+                    self.transport.connect()
+                    self.transport.wait_connected(self.connect_timeout)
+                except Exception:
+                    pass
+            up = self.transport.connected
+            if up != was_up:
+                was_up = up
+                if self.on_change:
+                    try:
+                        self.on_change(up)
+                    except Exception:
+                        pass
+            if up:
+                delay = self.initial_delay
+                wait = self.check_interval
+            else:
+                wait = delay * random.uniform(0.8, 1.2)
+                delay = min(delay * 2, self.max_delay)
+            self._stop.wait(wait)
+
+
+def create_transport(kind, host="127.0.0.1", port=None):
+    """Builds a transport by name: 'inprocess', 'local' or 'paho'."""
+    if kind == "inprocess":
+        return InProcessTransport()
+    if kind == "local":
+        return LocalBrokerTransport(host, port or 18830)
+    if kind == "paho":
+        return PahoTransport(host, port or 1883)
+    raise ValueError(f"Unknown transport '{kind}' (use inprocess, local or paho)")
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, scrolledtext
-from PIL import Image, ImageTk
+from assets import ImageCache, BACKGROUNDS, CARD_FILES, CARD_SIZE, SUMMARY_CARD_SIZE, IMAGE_CACHE_BYTES, card_file
 import os
 import sys
 from datetime import datetime, date, timedelta
@@ -35,62 +35,111 @@ class RentalView(tk.Tk):
         y_pos = (screen_height - self.win_height) // 2
         self.geometry(f"{self.win_width}x{self.win_height}+{x_pos}+{y_pos}")
         
-        self.current_bg = None
         self.entries = {} 
         self.combos = {}
         self.filter_vars = {} 
         self.calendar_selection = {"start": None, "end": None}
-        self.card_images = {} 
         self.insurance_var = tk.IntVar(value=0) 
         self.payment_vars = {} 
-
-    def clear_screen(self):
-        for widget in self.winfo_children(): widget.destroy()
-
-    def set_background(self, image_filename):
-        image_path = get_resource_path(image_filename)
-        canvas = tk.Canvas(self, width=self.win_width, height=self.win_height, highlightthickness=0)
+        self.loading_overlay = None
+        self.screens = {}  # name -> built screen: frame, canvas, widgets and current commands
+        self.current_screen = None
+        
+        # Decode and scale every background and card image once, off the Tk thread
+        self.images = ImageCache(get_resource_path, max_bytes=IMAGE_CACHE_BYTES, cache_dir=get_resource_path(".image_cache"))
+        self.images.warm([(bg, (self.win_width, self.win_height)) for bg in BACKGROUNDS]
+                         + [(f, size) for f in CARD_FILES.values() for size in (CARD_SIZE, SUMMARY_CARD_SIZE)])
+
+    # --- SCREEN MANAGER: every screen is built once, then raised and refreshed with the new data ---
+    def _screen(self, name, title, background, build):
+        screen = self.screens.get(name)
+        if screen is None:
+            frame = tk.Frame(self); frame.place(x=0, y=0, relwidth=1, relheight=1)
+            screen = {'frame': frame, 'canvas': self.set_background(frame, background), 'commands': {}}
+            build(screen)
+            self.screens[name] = screen
+        if title: self.title(title)
+        screen['frame'].tkraise()
+        if self.loading_overlay is not None and self.loading_overlay.winfo_ismapped(): self.loading_overlay.tkraise()
+        self.current_screen = name
+        return screen
+
+    def _cmd(self, screen, key):
+        """Button command that calls whatever the controller passed in on the latest show_*."""
+        return lambda: screen['commands'][key]()
+
+    def widget_count(self, widget=None):
+        widget = widget or self
+        return sum(1 + self.widget_count(child) for child in widget.winfo_children())
+
+    # --- LOADING STATE: covers the screen (and blocks clicks) while a query runs in the background ---
+    def show_loading(self, message="Loading..."):
+        if self.loading_overlay is None:
+            self.loading_overlay = tk.Frame(self, bg="#1a1a1a")
+            self.loading_label = tk.Label(self.loading_overlay, font=("Arial", 18, "bold"), bg="#1a1a1a", fg="white"); self.loading_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.loading_label.config(text=message)
+        self.loading_overlay.place(x=0, y=0, relwidth=1, relheight=1); self.loading_overlay.tkraise()
+        self.config(cursor="watch")
+
+    def hide_loading(self):
+        if self.loading_overlay is not None: self.loading_overlay.place_forget()
+        self.config(cursor="")
+
+    def set_background(self, parent, image_filename):
+        canvas = tk.Canvas(parent, width=self.win_width, height=self.win_height, highlightthickness=0)
         canvas.pack(fill="both", expand=True)
         try:
-            img_open = Image.open(image_path)
-            img_resized = img_open.resize((self.win_width, self.win_height), Image.Resampling.LANCZOS)
-            self.current_bg = ImageTk.PhotoImage(img_resized)
-            canvas.create_image(0, 0, image=self.current_bg, anchor="nw")
+            canvas.bg_photo = self.images.photo(image_filename, (self.win_width, self.win_height))  # Tk blanks an image once Python drops it
+            canvas.create_image(0, 0, image=canvas.bg_photo, anchor="nw")
         except: canvas.configure(bg="#cccccc")
         return canvas
 
     # --- SCREEN: ROLE SELECTION ---
     def show_role_selection(self, admin_command, user_command):
-        self.clear_screen()
-        canvas = self.set_background("bmw_login.jpg")
-        
+        screen = self._screen("role", None, "bmw_login.jpg", self._build_role_selection)
+        screen['commands'].update(admin=admin_command, user=user_command)
+
+    def _build_role_selection(self, screen):
+        canvas = screen['canvas']
         canvas.create_text(self.win_width/2, 50, text="RENTAL AGENCY PORTAL", font=("Helvetica", 38, "bold"), fill="black")
         btn_frame = tk.Frame(canvas, bg="#cccccc")
         canvas.create_window(self.win_width/2, self.win_height - 150, window=btn_frame)
         
         tk.Button(btn_frame, text="ADMIN ACCESS", font=("Arial", 14, "bold"), 
                   bg="#333333", fg="white", width=20, pady=10, 
-                  cursor="hand2", command=admin_command).pack(side="left", padx=20)
+                  cursor="hand2", command=self._cmd(screen, 'admin')).pack(side="left", padx=20)
         
         tk.Button(btn_frame, text="USER / RENT A CAR", font=("Arial", 14, "bold"), 
                   bg="#2ecc71", fg="white", width=20, pady=10, 
-                  cursor="hand2", command=user_command).pack(side="right", padx=20)
+                  cursor="hand2", command=self._cmd(screen, 'user')).pack(side="right", padx=20)
 
     # --- SCREEN 1 & 2 ---
     def show_main_screen(self, rent_command):
-        self.clear_screen(); canvas = self.set_background("bmw_login.jpg")
+        screen = self._screen("main", None, "bmw_login.jpg", self._build_main_screen)
+        screen['commands']['rent'] = rent_command
+
+    def _build_main_screen(self, screen):
+        canvas = screen['canvas']
         canvas.create_text(self.win_width/2, 50, text="CAR RENTAL AGENCY", font=("Helvetica", 38, "bold"), fill="black")
-        btn = tk.Button(self, text="Rent now!", font=("Arial", 16), bg="green", fg="white", cursor="hand2", command=rent_command)
+        btn = tk.Button(canvas, text="Rent now!", font=("Arial", 16), bg="green", fg="white", cursor="hand2", command=self._cmd(screen, 'rent'))
         canvas.create_window(self.win_width/2, self.win_height - 100, window=btn)
 
     def show_customer_screen(self, submit_command):
-        self.clear_screen(); self.title("Customer Details"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("customer", "Customer Details", "blurry_car_bg.jpg", self._build_customer_screen)
+        screen['commands']['submit'] = submit_command
+        # A new customer: empty form, and no itinerary left over from the previous booking
+        for reset in screen['resets']: reset()
+        self._reset_reservation_inputs()
+
+    def _build_customer_screen(self, screen):
+        canvas = screen['canvas']; screen['resets'] = []
         form_frame = tk.Frame(canvas, bg="#222222", padx=40, pady=30); canvas.create_window(self.win_width/2, self.win_height/2, window=form_frame, anchor="center")
         tk.Label(form_frame, text="Customer Details", font=("Helvetica", 20, "bold"), bg="#222222", fg="white").pack(pady=(0, 20))
         entry_style = {"font": ("Arial", 11), "bg": "#333333", "fg": "white", "insertbackground": "white", "bd": 0, "highlightthickness": 1, "highlightcolor": "#C1E1C1", "highlightbackground": "#333333"}
         def create_field(key, label):
             tk.Label(form_frame, text=label, bg="#222222", fg="#aaaaaa", font=("Arial", 9)).pack(anchor="w")
             e = tk.Entry(form_frame, **entry_style); e.pack(fill="x", pady=(2, 10), ipady=5); self.entries[key] = e 
+            screen['resets'].append(lambda: e.delete(0, "end"))
         create_field("name", "Full Name")
         create_field("phone", "Phone Number")
         create_field("email", "Email Address")
@@ -101,7 +150,7 @@ class RentalView(tk.Tk):
             tk.Label(parent, text=label, bg="#222222", fg="#aaaaaa", font=("Arial", 9)).pack(anchor="w")
             entry = tk.Entry(parent, **entry_style)
             entry.pack(fill="x", pady=(2, 10), ipady=5)
-            entry.insert(0, "DD/MM/YYYY"); entry.config(fg="#aaaaaa")
+            def reset(): entry.delete(0, "end"); entry.insert(0, "DD/MM/YYYY"); entry.config(fg="#aaaaaa")
             def on_in(e): 
                 if entry.get() == "DD/MM/YYYY": entry.delete(0, "end"); entry.config(fg="white")
             def on_out(e): 
@@ -113,12 +162,12 @@ class RentalView(tk.Tk):
                 new_text = text[:2] + ("/" + text[2:4] if len(text)>2 else "") + ("/" + text[4:] if len(text)>4 else "")
                 entry.delete(0, "end"); entry.insert(0, new_text)
             entry.bind("<FocusIn>", on_in); entry.bind("<FocusOut>", on_out); entry.bind("<KeyRelease>", auto_format)
-            self.entries[key] = entry
+            self.entries[key] = entry; screen['resets'].append(reset)
         left_f = tk.Frame(date_frame, bg="#222222"); left_f.pack(side="left", fill="x", expand=True, padx=(0, 10))
         create_formatted_date(left_f, "dob", "Date of Birth")
         right_f = tk.Frame(date_frame, bg="#222222"); right_f.pack(side="right", fill="x", expand=True)
         create_formatted_date(right_f, "issue_date", "License Issue Date")
-        tk.Button(form_frame, text="Search for a car  ➜", font=("Arial", 12, "bold"), bg="#2ecc71", fg="white", bd=0, padx=30, pady=12, cursor="hand2", command=submit_command).pack(pady=(20, 0))
+        tk.Button(form_frame, text="Search for a car  ➜", font=("Arial", 12, "bold"), bg="#2ecc71", fg="white", bd=0, padx=30, pady=12, cursor="hand2", command=self._cmd(screen, 'submit')).pack(pady=(20, 0))
     
     def get_customer_data(self): return {k: v.get().strip() for k, v in self.entries.items()}
     def show_error(self, message): messagebox.showwarning("Error", message)
@@ -126,17 +175,34 @@ class RentalView(tk.Tk):
 
     # --- SCREEN 3: RESERVATION ---
     def show_reservation_screen(self, search_command, car_types, locations, time_slots):
-        self.clear_screen(); self.title("Reservation Details"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("reservation", "Reservation Details", "blurry_car_bg.jpg", self._build_reservation_screen)
+        screen['commands']['search'] = search_command
+        # Choices and dates survive a return to this screen (e.g. after losing a car to another kiosk)
+        for key, vals in (("car_type", car_types), ("pickup_loc", locations), ("dropoff_loc", locations), ("pickup_time", time_slots), ("dropoff_time", time_slots)):
+            cb = self.combos[key]
+            if tuple(cb['values']) != tuple(str(v) for v in vals): cb['values'] = vals
+            if cb.get() not in vals: cb.current(0) if vals else cb.set("")
+        if screen['cal'].cget('mindate') != date.today(): screen['cal'].config(mindate=date.today())
+
+    def _reset_reservation_inputs(self):
+        self.calendar_selection["start"] = self.calendar_selection["end"] = None
+        screen = self.screens.get("reservation")
+        if screen is None: return
+        screen['cal'].calevent_remove()
+        for cb in self.combos.values(): cb.current(0) if cb['values'] else cb.set("")
+
+    def _build_reservation_screen(self, screen):
+        canvas = screen['canvas']
         main_frame = tk.Frame(canvas, bg="#222222", padx=20, pady=20); canvas.create_window(self.win_width/2, self.win_height/2, window=main_frame, anchor="center")
         tk.Label(main_frame, text="Select Your Itinerary", font=("Helvetica", 18, "bold"), bg="#222222", fg="white").pack(pady=(0, 20))
         input_frame = tk.Frame(main_frame, bg="#222222"); input_frame.pack(fill="x", pady=(0, 10))
         self.option_add('*TCombobox*Listbox.background', '#2b2b2b'); self.option_add('*TCombobox*Listbox.foreground', 'white'); self.option_add('*TCombobox*Listbox.selectBackground', '#C1E1C1'); self.option_add('*TCombobox*Listbox.selectForeground', 'black')
         style = ttk.Style(); style.theme_use('clam'); style.configure("Details.TCombobox", fieldbackground="#2b2b2b", background="#444444", foreground="white", arrowcolor="white", borderwidth=0); style.map('Details.TCombobox', fieldbackground=[('readonly', '#C1E1C1')], foreground=[('readonly', 'black')])
-        def create_combo(key, label, vals, r, c, w=25):
+        def create_combo(key, label, r, c, w=25):
             tk.Label(input_frame, text=label, bg="#222222", fg="#aaaaaa", font=("Arial", 9)).grid(row=r, column=c, sticky="w", padx=5)
-            cb = ttk.Combobox(input_frame, values=vals, style="Details.TCombobox", font=("Arial", 10), state="readonly", width=w); cb.grid(row=r+1, column=c, padx=5, pady=(0, 10), sticky="ew"); cb.current(0) if vals else None
+            cb = ttk.Combobox(input_frame, values=(), style="Details.TCombobox", font=("Arial", 10), state="readonly", width=w); cb.grid(row=r+1, column=c, padx=5, pady=(0, 10), sticky="ew")
             self.combos[key] = cb
-        create_combo("car_type", "Choose Category", car_types, 0, 0, 30); create_combo("pickup_loc", "Pick-up Location", locations, 2, 0, 58); create_combo("dropoff_loc", "Drop-off Location", locations, 2, 1, 58); create_combo("pickup_time", "Pick-up Time", time_slots, 4, 0, 15); create_combo("dropoff_time", "Drop-off Time", time_slots, 4, 1, 15)
+        create_combo("car_type", "Choose Category", 0, 0, 30); create_combo("pickup_loc", "Pick-up Location", 2, 0, 58); create_combo("dropoff_loc", "Drop-off Location", 2, 1, 58); create_combo("pickup_time", "Pick-up Time", 4, 0, 15); create_combo("dropoff_time", "Drop-off Time", 4, 1, 15)
         cal_frame = tk.Frame(main_frame, bg="#222222"); cal_frame.pack(pady=10)
         today = date.today()
         cal = Calendar(cal_frame, selectmode='day', mindate=today, background="#222222", disabledbackground="#222222", bordercolor="#222222", headersbackground="#333333", normalbackground="#444444", foreground='white', normalforeground='white', headersforeground='white'); cal.pack(pady=5)
@@ -153,121 +219,182 @@ class RentalView(tk.Tk):
                 elif clicked > sel["start"]: sel["end"] = clicked; cal.calevent_create(clicked, 'End', 'highlight_edge'); delta = sel["end"] - sel["start"]
                 for i in range(1, delta.days): cal.calevent_create(sel["start"] + timedelta(days=i), 'Range', 'highlight_range')
         cal.bind("<<CalendarSelected>>", on_date)
-        tk.Button(main_frame, text="Find Vehicles", font=("Arial", 14, "bold"), bg="#218838", fg="white", bd=0, padx=40, pady=10, cursor="hand2", command=search_command).pack(pady=20)
+        screen['cal'] = cal
+        tk.Button(main_frame, text="Find Vehicles", font=("Arial", 14, "bold"), bg="#218838", fg="white", bd=0, padx=40, pady=10, cursor="hand2", command=self._cmd(screen, 'search')).pack(pady=20)
 
     # --- SCREEN 4: SUBCATEGORY SELECTION ---
     def show_subcategory_screen(self, subcats_status, on_subcat_click, on_filter_change, on_home_click):
-        self.clear_screen(); self.title("Select Class"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("subcategory", "Select Class", "blurry_car_bg.jpg", self._build_subcategory_screen)
+        screen['commands'].update(subcat=on_subcat_click, filter=on_filter_change, home=on_home_click)
+        cards = screen['cards']
+        while len(cards) < len(subcats_status): cards.append(self._create_subcategory_card(screen))
+        for card, (sub_name, status_info) in zip(cards, subcats_status.items()):
+            self._update_subcategory_card(card, sub_name, status_info['car'], status_info['available'], status_info.get('min_price', 0))
+        for card in cards[len(subcats_status):]: card['frame'].pack_forget()
+
+    def _build_subcategory_screen(self, screen):
+        canvas = screen['canvas']
         filter_frame = tk.Frame(canvas, bg="#333333", pady=10); canvas.create_window(self.win_width/2, 40, window=filter_frame, width=self.win_width, anchor="center")
-        tk.Button(filter_frame, text="⟲ New Search", font=("Arial", 9, "bold"), bg="#555555", fg="white", bd=0, command=on_home_click).pack(side="right", padx=20)
+        tk.Button(filter_frame, text="⟲ New Search", font=("Arial", 9, "bold"), bg="#555555", fg="white", bd=0, command=self._cmd(screen, 'home')).pack(side="right", padx=20)
         tk.Label(filter_frame, text="Filters:", font=("Arial", 10, "bold"), bg="#333333", fg="white").pack(side="left", padx=20)
         if "automatic_only" not in self.filter_vars: self.filter_vars["automatic_only"] = tk.IntVar()
         if "diesel_only" not in self.filter_vars: self.filter_vars["diesel_only"] = tk.IntVar()
         if "hybrid_only" not in self.filter_vars: self.filter_vars["hybrid_only"] = tk.IntVar()
         cb_style = {"bg": "#333333", "fg": "white", "selectcolor": "#222222", "activebackground": "#333333", "font": ("Arial", 10)}
-        tk.Checkbutton(filter_frame, text="Automatic Only", variable=self.filter_vars["automatic_only"], command=on_filter_change, **cb_style).pack(side="left", padx=10)
-        tk.Checkbutton(filter_frame, text="Diesel Only", variable=self.filter_vars["diesel_only"], command=on_filter_change, **cb_style).pack(side="left", padx=10)
-        tk.Checkbutton(filter_frame, text="Eco (Hybrid/EV)", variable=self.filter_vars["hybrid_only"], command=on_filter_change, **cb_style).pack(side="left", padx=10)
-        cards_container = tk.Frame(canvas, bg="#222222"); canvas.create_window(self.win_width/2, self.win_height/2 + 20, window=cards_container, anchor="center")
-        for sub_name, status_info in subcats_status.items():
-            self._create_subcategory_card(cards_container, sub_name, status_info['car'], status_info['available'], status_info.get('min_price', 0), on_subcat_click)
-
-    def _create_subcategory_card(self, parent, sub_name, car, is_available, min_price, callback):
+        tk.Checkbutton(filter_frame, text="Automatic Only", variable=self.filter_vars["automatic_only"], command=self._cmd(screen, 'filter'), **cb_style).pack(side="left", padx=10)
+        tk.Checkbutton(filter_frame, text="Diesel Only", variable=self.filter_vars["diesel_only"], command=self._cmd(screen, 'filter'), **cb_style).pack(side="left", padx=10)
+        tk.Checkbutton(filter_frame, text="Eco (Hybrid/EV)", variable=self.filter_vars["hybrid_only"], command=self._cmd(screen, 'filter'), **cb_style).pack(side="left", padx=10)
+        screen['cards_container'] = tk.Frame(canvas, bg="#222222"); canvas.create_window(self.win_width/2, self.win_height/2 + 20, window=screen['cards_container'], anchor="center")
+        screen['cards'] = []
+
+    def _create_subcategory_card(self, screen):
+        """One card slot; its widgets are reused for whichever subcategory it shows next."""
+        card = {'sub_name': None, 'available': False}
+        card['frame'] = tk.Frame(screen['cards_container'], bd=0, padx=2, pady=2)
+        card['inner'] = inner = tk.Frame(card['frame'], width=250, height=390); inner.pack(); inner.pack_propagate(False)
+        card['img'] = tk.Label(inner, font=("Arial", 50), fg="#aaaaaa")
+        card['name'] = tk.Label(inner, font=("Helvetica", 16, "bold"))
+        card['price'] = tk.Label(inner, font=("Arial", 12, "bold"), fg="#2ecc71")
+        card['example'] = tk.Label(inner, font=("Arial", 10, "italic"))
+        card['specs'] = tk.Frame(inner)
+        card['spec_labels'] = [tk.Label(card['specs'], font=("Arial", 9), fg="white", padx=5) for _ in range(4)]
+        for lbl in card['spec_labels']: lbl.pack(side="left")
+        card['button'] = tk.Label(inner, text="Select Class", font=("Arial", 11, "bold"), bg="#2ecc71", fg="white", padx=20, pady=8)
+        card['no_match'] = tk.Label(inner, text="No cars match filters", font=("Arial", 10), fg="#555555")
+        def on_click(e):
+            if card['available']: screen['commands']['subcat'](card['sub_name'])
+        for w in [card['frame'], inner, card['img'], card['button']]: w.bind("<Button-1>", on_click)
+        return card
+
+    def _update_subcategory_card(self, card, sub_name, car, is_available, min_price):
         bg_color = "#333333" if is_available else "#222222"
         inner_bg = "#444444" if is_available else "#2b2b2b"
         text_color = "white" if is_available else "#555555"
-        card = tk.Frame(parent, bg=bg_color, bd=0, padx=2, pady=2); card.pack(side="left", padx=20, pady=20)
-        inner = tk.Frame(card, bg=inner_bg, width=250, height=390); inner.pack(); inner.pack_propagate(False)
-        file_map = {"City Car": "city_car.png", "Compact Hatch": "compact.png", "Crossover": "crossover.png", "Full SUV": "suv.png", "Luxury Compact": "luxury_compact.png", "Executive": "executive.png", "MPV": "mpv.png", "Passenger Van": "van.png"}
-        filename = file_map.get(sub_name, "default.png")
+        card['sub_name'], card['available'] = sub_name, is_available
+        card['frame'].config(bg=bg_color); card['inner'].config(bg=inner_bg); card['specs'].config(bg=inner_bg)
+        for w in [card['img'], card['name'], card['price'], card['example'], card['no_match']] + card['spec_labels']: w.config(bg=inner_bg)
+        filename = card_file(sub_name, get_resource_path)
         try:
-            if filename not in self.card_images:
-                img = Image.open(get_resource_path(filename)).resize((220, 140), Image.Resampling.LANCZOS)
-                self.card_images[filename] = ImageTk.PhotoImage(img)
-            img_label = tk.Label(inner, image=self.card_images[filename], bg=inner_bg)
-        except: img_label = tk.Label(inner, text="🚗", font=("Arial", 50), bg=inner_bg, fg="#aaaaaa")
-        img_label.pack(pady=(30, 10))
-        tk.Label(inner, text=sub_name, font=("Helvetica", 16, "bold"), bg=inner_bg, fg=text_color).pack()
+            if filename is None: raise FileNotFoundError(sub_name)
+            card['photo'] = self.images.photo(filename, CARD_SIZE)
+            card['img'].config(image=card['photo'], text="")
+        except: card['photo'] = None; card['img'].config(image="", text="🚗")
+        card['name'].config(text=sub_name, fg=text_color)
+        card['price'].config(text=f"From €{min_price:.0f} / day")
+        card['example'].config(text=f"e.g. {car['make']} {car['model']}" if is_available else "Unavailable", fg="#cccccc" if is_available else "#444444")
         if is_available:
-            tk.Label(inner, text=f"From €{min_price:.0f} / day", font=("Arial", 12, "bold"), bg=inner_bg, fg="#2ecc71").pack(pady=(0, 5))
-            ex_text = f"e.g. {car['make']} {car['model']}"
-        else: ex_text = "Unavailable"
-        tk.Label(inner, text=ex_text, font=("Arial", 10, "italic"), bg=inner_bg, fg="#cccccc" if is_available else "#444444").pack(pady=(0, 10))
+            for lbl, txt in zip(card['spec_labels'], (f"⚙️ {car['trans']}", f"⛽ {car['fuel']}", f"👤 x{car['seats']}", f"🧳 x{car['bags']}")): lbl.config(text=txt)
+        # Re-pack in display order; widgets this state does not use stay unpacked
+        for w in [card['frame'], card['img'], card['name'], card['price'], card['example'], card['specs'], card['button'], card['no_match']]: w.pack_forget()
+        card['img'].pack(pady=(30, 10)); card['name'].pack()
         if is_available:
-            specs = tk.Frame(inner, bg=inner_bg); specs.pack(pady=5)
-            def spec(txt): tk.Label(specs, text=txt, font=("Arial", 9), bg=inner_bg, fg="white", padx=5).pack(side="left")
-            spec(f"⚙️ {car['trans']}"); spec(f"⛽ {car['fuel']}"); spec(f"👤 x{car['seats']}"); spec(f"🧳 x{car['bags']}")
-            btn_fake = tk.Label(inner, text="Select Class", font=("Arial", 11, "bold"), bg="#2ecc71", fg="white", padx=20, pady=8); btn_fake.pack(side="bottom", pady=20)
-            def on_click(e): callback(sub_name)
-            for w in [card, inner, img_label, btn_fake]: w.bind("<Button-1>", on_click); w.config(cursor="hand2")
-        else: tk.Label(inner, text="No cars match filters", font=("Arial", 10), bg=inner_bg, fg="#555555").pack(pady=20)
+            card['price'].pack(pady=(0, 5)); card['example'].pack(pady=(0, 10)); card['specs'].pack(pady=5); card['button'].pack(side="bottom", pady=20)
+        else: card['example'].pack(pady=(0, 10)); card['no_match'].pack(pady=20)
+        for w in [card['frame'], card['inner'], card['img'], card['button']]: w.config(cursor="hand2" if is_available else "")
+        card['frame'].pack(side="left", padx=20, pady=20)
 
     # --- SCREEN 5: BOOKING OVERVIEW ---
     def show_booking_overview(self, summary, insurance_options, late_policy, on_back_click, on_next_click, on_home_click):
-        self.clear_screen(); self.title("Booking Summary"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("overview", "Booking Summary", "blurry_car_bg.jpg", self._build_booking_overview)
+        screen['commands'].update(back=on_back_click, next=on_next_click, home=on_home_click)
+        screen['title'].config(text=f"{summary['subcat']} Class")
+        fname = card_file(summary['subcat'], get_resource_path)
+        try:
+            if fname is None: raise FileNotFoundError(summary['subcat'])
+            screen['photo'] = self.images.photo(fname, SUMMARY_CARD_SIZE)
+            screen['img'].config(image=screen['photo'], text="")
+        except: screen['photo'] = None; screen['img'].config(image="", text="🚗")
+        for lbl, txt in zip(screen['spec_labels'], (f"⚙️ {summary['trans']}", f"⛽ {summary['fuel']}", f"👤 x{summary['seats']}", f"🧳 x{summary['bags']}")): lbl.config(text=txt)
+        if screen['plans'] != insurance_options:
+            # Plans rarely change; rebuild just the radio list when they do
+            for w in screen['plan_frame'].winfo_children(): w.destroy()
+            for plan in insurance_options:
+                r = ttk.Radiobutton(screen['plan_frame'], text=f"{plan['name']} (+€{plan['price']}/day)", variable=self.insurance_var, value=plan['id'], style="TRadiobutton")
+                r.pack(anchor="w", pady=2)
+                tk.Label(screen['plan_frame'], text=f"   {plan['desc']}", font=("Arial", 8), bg="#2b2b2b", fg="#aaaaaa").pack(anchor="w", pady=(0, 5))
+            screen['plans'] = [dict(p) for p in insurance_options]
+        screen['policy'].config(text=late_policy)
+        screen['price'].config(text=f"€{summary['price']}")
+
+    def _build_booking_overview(self, screen):
+        canvas = screen['canvas']
         header = tk.Frame(canvas, bg="#222222"); canvas.create_window(self.win_width/2, 40, window=header, width=self.win_width, anchor="center")
-        tk.Button(header, text="< Back", font=("Arial", 10, "bold"), bg="#444444", fg="white", bd=0, command=on_back_click).pack(side="left", padx=20)
-        tk.Button(header, text="⟲ New Search", font=("Arial", 10, "bold"), bg="#555555", fg="white", bd=0, command=on_home_click).pack(side="right", padx=20)
+        tk.Button(header, text="< Back", font=("Arial", 10, "bold"), bg="#444444", fg="white", bd=0, command=self._cmd(screen, 'back')).pack(side="left", padx=20)
+        tk.Button(header, text="⟲ New Search", font=("Arial", 10, "bold"), bg="#555555", fg="white", bd=0, command=self._cmd(screen, 'home')).pack(side="right", padx=20)
         tk.Label(header, text="Review Selection", font=("Helvetica", 18, "bold"), bg="#222222", fg="white").pack(side="left", padx=10)
         container = tk.Frame(canvas, bg="#222222", pady=10, padx=20); canvas.create_window(self.win_width/2, self.win_height/2 + 20, window=container, anchor="center")
         card = tk.Frame(container, bg="#333333", width=500); card.pack()
-        tk.Label(card, text=f"{summary['subcat']} Class", font=("Helvetica", 20, "bold"), bg="#333333", fg="white").pack(pady=(15, 5))
-        file_map = {"City Car": "city_car.png", "Compact Hatch": "compact.png", "Crossover": "crossover.png", "Full SUV": "suv.png", "Luxury Compact": "luxury_compact.png", "Executive": "executive.png", "MPV": "mpv.png", "Passenger Van": "van.png"}
-        fname = file_map.get(summary['subcat'], "default.png")
-        try:
-            if fname not in self.card_images:
-                img = Image.open(get_resource_path(fname)).resize((180, 110), Image.Resampling.LANCZOS)
-                self.card_images[fname] = ImageTk.PhotoImage(img)
-            tk.Label(card, image=self.card_images[fname], bg="#333333").pack(pady=5)
-        except: tk.Label(card, text="🚗", font=("Arial", 60), bg="#333333", fg="white").pack(pady=5)
+        screen['title'] = tk.Label(card, font=("Helvetica", 20, "bold"), bg="#333333", fg="white"); screen['title'].pack(pady=(15, 5))
+        screen['img'] = tk.Label(card, font=("Arial", 60), bg="#333333", fg="white"); screen['img'].pack(pady=5)
         specs_frame = tk.Frame(card, bg="#333333"); specs_frame.pack(pady=5)
-        def spec(txt): tk.Label(specs_frame, text=txt, font=("Arial", 11), bg="#333333", fg="white", padx=10).pack(side="left")
-        spec(f"⚙️ {summary['trans']}"); spec(f"⛽ {summary['fuel']}"); spec(f"👤 x{summary['seats']}"); spec(f"🧳 x{summary['bags']}")
+        screen['spec_labels'] = [tk.Label(specs_frame, font=("Arial", 11), bg="#333333", fg="white", padx=10) for _ in range(4)]
+        for lbl in screen['spec_labels']: lbl.pack(side="left")
         ins_frame = tk.Frame(card, bg="#2b2b2b", padx=10, pady=10); ins_frame.pack(fill="x", pady=10, padx=20)
         tk.Label(ins_frame, text="Choose Insurance:", font=("Arial", 10, "bold"), bg="#2b2b2b", fg="white").pack(anchor="w")
         style = ttk.Style(); style.configure("TRadiobutton", background="#2b2b2b", foreground="white", font=("Arial", 10))
-        for plan in insurance_options:
-            r = ttk.Radiobutton(ins_frame, text=f"{plan['name']} (+€{plan['price']}/day)", variable=self.insurance_var, value=plan['id'], style="TRadiobutton")
-            r.pack(anchor="w", pady=2)
-            tk.Label(ins_frame, text=f"   {plan['desc']}", font=("Arial", 8), bg="#2b2b2b", fg="#aaaaaa").pack(anchor="w", pady=(0, 5))
-        tk.Label(card, text=late_policy, font=("Arial", 8, "bold"), bg="#333333", fg="#ff6b6b", wraplength=450, justify="center").pack(pady=(0, 10))
+        screen['plan_frame'] = tk.Frame(ins_frame, bg="#2b2b2b"); screen['plan_frame'].pack(fill="x")
+        screen['plans'] = None
+        screen['policy'] = tk.Label(card, font=("Arial", 8, "bold"), bg="#333333", fg="#ff6b6b", wraplength=450, justify="center"); screen['policy'].pack(pady=(0, 10))
         bottom_frame = tk.Frame(card, bg="#333333", pady=15); bottom_frame.pack(side="bottom", fill="x")
-        tk.Label(bottom_frame, text=f"€{summary['price']}", font=("Helvetica", 22, "bold"), bg="#333333", fg="#2ecc71").pack(side="left", padx=30)
+        screen['price'] = tk.Label(bottom_frame, font=("Helvetica", 22, "bold"), bg="#333333", fg="#2ecc71"); screen['price'].pack(side="left", padx=30)
         tk.Label(bottom_frame, text="/ day", font=("Arial", 10), bg="#333333", fg="#aaaaaa").pack(side="left")
-        tk.Button(bottom_frame, text="Next Step ➜", bg="#2ecc71", fg="white", font=("Arial", 12, "bold"), bd=0, padx=25, pady=10, cursor="hand2", command=on_next_click).pack(side="right", padx=30)
+        tk.Button(bottom_frame, text="Next Step ➜", bg="#2ecc71", fg="white", font=("Arial", 12, "bold"), bd=0, padx=25, pady=10, cursor="hand2", command=self._cmd(screen, 'next')).pack(side="right", padx=30)
 
     # --- SCREEN 6: FINAL INVOICE ---
     def show_invoice_screen(self, invoice_data, on_back_click, on_checkout_click):
-        self.clear_screen(); self.title("Final Invoice"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("invoice", "Final Invoice", "blurry_car_bg.jpg", self._build_invoice_screen)
+        screen['commands'].update(back=on_back_click, checkout=on_checkout_click)
+        lbl = screen['labels']
+        lbl['date'].config(text=f"Date: {datetime.now().strftime('%d/%m/%Y')}")
+        lbl['category'].config(text=f"{invoice_data['category']} Class")
+        lbl['days'].config(text=f"{invoice_data['days']} Days")
+        lbl['rental'].config(text=f"€{invoice_data['rental_total']:.2f}")
+        lbl['rate'].config(text=f"   ({invoice_data['days']} days x €{invoice_data['daily_rate']})")
+        lbl['ins_name'].config(text=f"Insurance ({invoice_data['ins_name']})")
+        lbl['ins'].config(text=f"€{invoice_data['ins_total']:.2f}")
+        lbl['deposit'].config(text=f"€{invoice_data['deposit']:.2f}")
+        lbl['total'].config(text=f"€{invoice_data['grand_total']:.2f}")
+
+    def _build_invoice_screen(self, screen):
+        canvas = screen['canvas']; lbl = screen['labels'] = {}
         outer = tk.Frame(canvas, bg="#222222", padx=2, pady=2); canvas.create_window(self.win_width/2, self.win_height/2, window=outer, anchor="center")
         invoice = tk.Frame(outer, bg="black", padx=30, pady=30, width=500); invoice.pack()
         tk.Label(invoice, text="INVOICE", font=("Helvetica", 24, "bold"), bg="black", fg="white").pack(anchor="w")
-        tk.Label(invoice, text=f"Date: {datetime.now().strftime('%d/%m/%Y')}", font=("Arial", 10), bg="black", fg="#aaaaaa").pack(anchor="w", pady=(0, 20))
+        lbl['date'] = tk.Label(invoice, font=("Arial", 10), bg="black", fg="#aaaaaa"); lbl['date'].pack(anchor="w", pady=(0, 20))
         car_row = tk.Frame(invoice, bg="#111111", pady=10, padx=10); car_row.pack(fill="x", pady=10)
         tk.Label(car_row, text="🚙", font=("Arial", 20), bg="#111111", fg="white").pack(side="left", padx=10)
-        tk.Label(car_row, text=f"{invoice_data['category']} Class", font=("Helvetica", 12, "bold"), bg="#111111", fg="white").pack(side="left")
-        tk.Label(car_row, text=f"{invoice_data['days']} Days", font=("Arial", 12, "bold"), bg="#111111", fg="#2ecc71").pack(side="right", padx=10)
-        def line_item(txt, price, is_bold=False):
+        lbl['category'] = tk.Label(car_row, font=("Helvetica", 12, "bold"), bg="#111111", fg="white"); lbl['category'].pack(side="left")
+        lbl['days'] = tk.Label(car_row, font=("Arial", 12, "bold"), bg="#111111", fg="#2ecc71"); lbl['days'].pack(side="right", padx=10)
+        def line_item(key, txt, is_bold=False):
             row = tk.Frame(invoice, bg="black"); row.pack(fill="x", pady=2)
             font = ("Arial", 11, "bold") if is_bold else ("Arial", 11); color = "white" if is_bold else "#cccccc"
-            tk.Label(row, text=txt, font=font, bg="black", fg=color).pack(side="left")
-            tk.Label(row, text=f"€{price:.2f}", font=font, bg="black", fg=color).pack(side="right")
+            name = tk.Label(row, text=txt, font=font, bg="black", fg=color); name.pack(side="left")
+            lbl[key] = tk.Label(row, font=font, bg="black", fg=color); lbl[key].pack(side="right")
+            return name
         tk.Frame(invoice, bg="#444444", height=1).pack(fill="x", pady=10)
-        line_item("Rental Rate", invoice_data['rental_total']); tk.Label(invoice, text=f"   ({invoice_data['days']} days x €{invoice_data['daily_rate']})", font=("Arial", 9), bg="black", fg="#666666").pack(anchor="w")
-        line_item(f"Insurance ({invoice_data['ins_name']})", invoice_data['ins_total'])
-        line_item("Security Deposit (Refundable)", invoice_data['deposit']); tk.Label(invoice, text="   *Returned upon on-time drop-off", font=("Arial", 9), bg="black", fg="orange").pack(anchor="w")
+        line_item('rental', "Rental Rate"); lbl['rate'] = tk.Label(invoice, font=("Arial", 9), bg="black", fg="#666666"); lbl['rate'].pack(anchor="w")
+        lbl['ins_name'] = line_item('ins', "Insurance")
+        line_item('deposit', "Security Deposit (Refundable)"); tk.Label(invoice, text="   *Returned upon on-time drop-off", font=("Arial", 9), bg="black", fg="orange").pack(anchor="w")
         tk.Frame(invoice, bg="#444444", height=1).pack(fill="x", pady=15)
         total_row = tk.Frame(invoice, bg="black"); total_row.pack(fill="x")
         tk.Label(total_row, text="TOTAL TO PAY", font=("Helvetica", 14, "bold"), bg="black", fg="white").pack(side="left")
-        tk.Label(total_row, text=f"€{invoice_data['grand_total']:.2f}", font=("Helvetica", 18, "bold"), bg="black", fg="#2ecc71").pack(side="right")
+        lbl['total'] = tk.Label(total_row, font=("Helvetica", 18, "bold"), bg="black", fg="#2ecc71"); lbl['total'].pack(side="right")
         btn_frame = tk.Frame(invoice, bg="black"); btn_frame.pack(fill="x", pady=(30, 0))
-        tk.Button(btn_frame, text="< Back", font=("Arial", 10), bg="#333333", fg="white", bd=0, padx=15, pady=8, cursor="hand2", command=on_back_click).pack(side="left")
+        tk.Button(btn_frame, text="< Back", font=("Arial", 10), bg="#333333", fg="white", bd=0, padx=15, pady=8, cursor="hand2", command=self._cmd(screen, 'back')).pack(side="left")
         
-        tk.Button(btn_frame, text="Proceed to Checkout ➜", font=("Arial", 11, "bold"), bg="#2ecc71", fg="white", bd=0, padx=20, pady=8, cursor="hand2", command=on_checkout_click).pack(side="right")
+        tk.Button(btn_frame, text="Proceed to Checkout ➜", font=("Arial", 11, "bold"), bg="#2ecc71", fg="white", bd=0, padx=20, pady=8, cursor="hand2", command=self._cmd(screen, 'checkout')).pack(side="right")
 
     # --- SCREEN 7: SECURE PAYMENT ---
     def show_payment_screen(self, amount, on_pay_click, on_back_click):
-        self.clear_screen(); self.title("Secure Checkout"); canvas = self.set_background("blurry_car_bg.jpg")
+        screen = self._screen("payment", "Secure Checkout", "blurry_car_bg.jpg", self._build_payment_screen)
+        screen['commands'].update(pay=on_pay_click, back=on_back_click)
+        screen['amount'].config(text=f"Total to Pay: €{amount:.2f}")
+        # Never show the previous customer's card
+        for key in ("card_num", "holder", "cvv"): self.payment_vars[key].set("")
+        self.payment_vars["expiry"].set("MM/YY"); screen['expiry'].config(fg="#aaaaaa")
+
+    def _build_payment_screen(self, screen):
+        canvas = screen['canvas']
         
         outer = tk.Frame(canvas, bg="#222222", padx=2, pady=2)
         canvas.create_window(self.win_width/2, self.win_height/2, window=outer, anchor="center")
@@ -277,7 +404,7 @@ class RentalView(tk.Tk):
 
         tk.Label(main_frame, text="SECURE CHECKOUT", font=("Helvetica", 20, "bold"), bg="#222222", fg="white").pack(pady=(0, 5))
         tk.Label(main_frame, text="🔒 256-bit Encrypted Connection", font=("Arial", 10), bg="#222222", fg="#2ecc71").pack(pady=(0, 20))
-        tk.Label(main_frame, text=f"Total to Pay: €{amount:.2f}", font=("Arial", 18, "bold"), bg="#222222", fg="white").pack(pady=10)
+        screen['amount'] = tk.Label(main_frame, font=("Arial", 18, "bold"), bg="#222222", fg="white"); screen['amount'].pack(pady=10)
 
         form_frame = tk.Frame(main_frame, bg="#222222", pady=10); form_frame.pack(fill="x")
         entry_style = {"font": ("Arial", 11), "bg": "#333333", "fg": "white", "insertbackground": "white", "bd": 0, "highlightthickness": 1, "highlightcolor": "#C1E1C1", "highlightbackground": "#333333"}
@@ -316,8 +443,8 @@ class RentalView(tk.Tk):
         ex_var = tk.StringVar(); self.payment_vars["expiry"] = ex_var
         ex_entry = tk.Entry(ex_frame, textvariable=ex_var, **entry_style)
         ex_entry.pack(fill="x", pady=(2, 10), ipady=5)
+        screen['expiry'] = ex_entry
         
-        ex_entry.insert(0, "MM/YY"); ex_entry.config(fg="#aaaaaa")
         def on_ex_in(e): 
             if ex_entry.get() == "MM/YY": ex_entry.delete(0, "end"); ex_entry.config(fg="white")
         def on_ex_out(e): 
@@ -347,13 +474,15 @@ class RentalView(tk.Tk):
         tk.Entry(cv_frame, textvariable=cv_var, show="*", **entry_style).pack(fill="x", pady=(2, 10), ipady=5)
 
         btn_frame = tk.Frame(main_frame, bg="#222222"); btn_frame.pack(fill="x", pady=(20, 0))
-        tk.Button(btn_frame, text="Cancel", font=("Arial", 10), bg="#333333", fg="white", bd=0, padx=15, pady=10, cursor="hand2", command=on_back_click).pack(side="left")
-        tk.Button(btn_frame, text="CONFIRM PAYMENT", font=("Arial", 12, "bold"), bg="#2ecc71", fg="white", bd=0, padx=30, pady=10, cursor="hand2", command=on_pay_click).pack(side="right")
+        tk.Button(btn_frame, text="Cancel", font=("Arial", 10), bg="#333333", fg="white", bd=0, padx=15, pady=10, cursor="hand2", command=self._cmd(screen, 'back')).pack(side="left")
+        tk.Button(btn_frame, text="CONFIRM PAYMENT", font=("Arial", 12, "bold"), bg="#2ecc71", fg="white", bd=0, padx=30, pady=10, cursor="hand2", command=self._cmd(screen, 'pay')).pack(side="right")
 
     def get_payment_data(self): return {k: v.get() for k, v in self.payment_vars.items()}
 
 # --- PSEUDO-CONSOLE 
 class PseudoConsole(tk.Toplevel):
+    MAX_LINES = 5000  # older output is dropped so long listings keep memory flat
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("ADMIN TERMINAL")
@@ -383,6 +512,8 @@ class PseudoConsole(tk.Toplevel):
         if not self.is_active: return
         self.text_area.config(state='normal')
         self.text_area.insert(tk.END, text)
+        overflow = int(self.text_area.index('end-1c').split('.')[0]) - self.MAX_LINES
+        if overflow > 0: self.text_area.delete('1.0', f'{overflow + 1}.0')
         self.text_area.see(tk.END)
         self.text_area.config(state='disabled')
 
@@ -0,0 +1,70 @@
+"""
+Background execution of model calls for the kiosk.
+
+A query can take seconds when the database is busy, and while a Tk callback
+is running the window does not repaint. ModelWorker runs model calls on a
+worker thread and hands each result back to the Tk thread through the
+view's after(), where the callback may touch widgets. InlineWorker has the
+same interface but runs everything at once on the caller's thread (headless
+controllers, benchmarks).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ModelWorker:
+    def __init__(self, schedule, on_error=None):
+        """
+        schedule: the view's after(); results are posted with schedule(0, callback).
+        on_error: default handler for calls that raise, gets the exception.
+        Calls run one at a time in submission order, so a hold release queued
+        after a booking never overtakes it.
+        """
+        self._schedule = schedule
+        self._on_error = on_error
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+
+    def submit(self, call, on_done=None, on_error=None):
+        """Runs call() on the worker, then on_done(result) or on_error(exc) on the Tk thread."""
+        future = self._pool.submit(call)
+        future.add_done_callback(lambda f: self._post(f, on_done, on_error))
+        return future
+
+    def _post(self, future, on_done, on_error):
+        try:
+            self._schedule(0, lambda: self._deliver(future, on_done, on_error))
+        except Exception:
+            pass  # window already destroyed (app shutting down)
+
+    def _deliver(self, future, on_done, on_error):
+        error = future.exception()
+        if error is not None:
+            handler = on_error or self._on_error
+            if handler:
+                handler(error)
+        elif on_done:
+            on_done(future.result())
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class InlineWorker:
+    """Runs each call immediately on the caller's thread; same interface as ModelWorker."""
+
+    def __init__(self, on_error=None):
+        self._on_error = on_error
+
+    def submit(self, call, on_done=None, on_error=None):
+        try:
+            result = call()
+        except Exception as e:
+            handler = on_error or self._on_error
+            if handler is None:
+                raise
+            handler(e)
+            return
+        if on_done:
+            on_done(result)
+
+    def shutdown(self):
+        pass